@@ -0,0 +1,31 @@
+'use strict';
+
+const utils = require('../utils/writer.js');
+const Batch = require('../service/batch.js');
+
+/**
+ * Generic error handler for all controller methods
+ */
+const handleError = (error, res) => {
+  console.error('Controller error:', error);
+  const status = error.status || 500;
+  const errorResponse = {
+    status: 'error',
+    error: error.message || 'Internal Server Error',
+    timestamp: new Date().toISOString()
+  };
+  return utils.writeJson(res, errorResponse, status);
+};
+
+/**
+ * Controller for the batch POST endpoint
+ * Evaluates an array of parameter sets for one model kind and returns columnar results
+ */
+module.exports.runBatch = async function runBatch(req, res, next) {
+  console.log('Processing batch request');
+  try {
+    await Batch.runBatch(req, res);
+  } catch (error) {
+    return handleError(error, res);
+  }
+};
@@ -4,6 +4,7 @@ const utils = require('../utils/writer.js');
 const AnalyticalSigmaVolatilityCalibration = require('../service/AnalyticalSigmaVolatilityCalibration.js');
 const AnalyticalSigmaVolatility = require('../service/AnalyticalSigmaVolatility.js');
 const VolatilityAsv = require('../service/volatility_asv.js');
+const AnalyticalSigmaVolatilitySurface = require('../service/AnalyticalSigmaVolatilitySurface.js');
 
 /**
  * Generic error handler for all controller methods
@@ -84,4 +85,17 @@ module.exports.volatility_densityPOST = async function volatility_densityPOST(re
   } catch (error) {
     return handleError(error, res);
   }
-};
\ No newline at end of file
+};
+
+/**
+ * Controller for the ASV surface calibration POST endpoint
+ * Calibrates every expiry of a strike x expiry quote matrix in parallel
+ */
+module.exports.calibrateAsvSurface = async function calibrateAsvSurface(req, res, next) {
+  console.log('Processing ASV surface calibration request');
+  try {
+    await AnalyticalSigmaVolatilitySurface.calibrateSurface(req, res);
+  } catch (error) {
+    return handleError(error, res);
+  }
+};
@@ -5,6 +5,7 @@ const http = require('http');
 const express = require('express');
 const oas3Tools = require('oas3-tools');
 const { CONFIG } = require('./service/config');
+const { pool } = require('./service/pythonWorkerPool');
 const setupMiddleware = require('./middleware');
 const uiRoutes = require('./routes');
 
@@ -35,6 +36,10 @@ console.log(' - Site Packages:', CONFIG.PYTHON.SITE_PACKAGES);
 console.log(' - Service Path:', CONFIG.PYTHON.PYTHON_SERVICE_PATH);
 console.log(' - Common Path:', CONFIG.PYTHON.PYTHON_COMMON_PATH);
 console.log(' - Module Path:', CONFIG.PYTHON.XSIGMA_MODULE_PATH);
+console.log(' - Worker Pool Size:', CONFIG.PYTHON.WORKER_POOL.SIZE);
+
+// Pre-fork the Python workers so the first requests do not pay for imports
+pool.start();
 
 // Register UI routes
 app.use(uiRoutes);
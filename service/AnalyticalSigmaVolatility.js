@@ -1,11 +1,7 @@
 'use strict';
 
-const path = require('path');
-const { spawn } = require('child_process');
-
-const XSIGMA_PYTHON = process.env.XSIGMA_PYTHON || 'C:/dev/build_ninja_avx2_python_sphinx/bin/xsigmapython.exe';
-const PYTHONPATH = process.env.PYTHONPATH || 'C:/dev/build_ninja_avx2_python/lib/python3.12/site-packages';
-const XSIGMA_DATA_ROOT = process.env.XSIGMA_DATA_ROOT || 'C:/dev/build_ninja_avx2_python/ExternalData/Testing';
+const { runTask } = require('./pythonWorkerPool');
+const { wantsColumnar, sendColumnar } = require('./columnarFormat');
 
 const DEFAULT_PARAMS = {
   1: {
@@ -55,43 +51,17 @@ exports.getAnalyticalSigmaVolatility = async function(req, res) {
       if (isNaN(value)) throw new Error(`Invalid value for ${key}`);
     });
 
-    const pythonScriptPath = path.join(__dirname, './Python/AnalyticalSigmaVolatility.py');
-    const env = { ...process.env, PYTHONPATH, XSIGMA_DATA_ROOT, PYTHONUNBUFFERED: '1' };
-    const args = Object.values(params).map(String);
-
-    const pythonProcess = spawn(XSIGMA_PYTHON, [pythonScriptPath, ...args], {
-      env,
-      stdio: ['pipe', 'pipe', 'pipe']
-    });
-
-    let [dataString, errorString] = ['', ''];
-    pythonProcess.stdout.on('data', (data) => dataString += data.toString());
-    pythonProcess.stderr.on('data', (data) => errorString += data.toString());
-
-    const processPromise = new Promise((resolve, reject) => {
-      const timeout = setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error('Process timeout after 30s'));
-      }, 30000);
-
-      pythonProcess.on('close', (code) => {
-        clearTimeout(timeout);
-        if (code !== 0) reject(new Error(`Process exited ${code}: ${errorString}`));
-        else resolve();
-      });
-
-      pythonProcess.on('error', (error) => {
-        clearTimeout(timeout);
-        reject(new Error(`Failed to start: ${error.message}`));
-      });
-    });
+    if (wantsColumnar(req)) {
+      const payload = await runTask('analytical_sigma_volatility', params, { format: 'columnar' });
+      return sendColumnar(res, payload);
+    }
 
-    await processPromise;
-    res.json(JSON.parse(dataString));
+    const result = await runTask('analytical_sigma_volatility', params);
+    res.json({ status: 'success', data: result, error: null });
 
   } catch (error) {
     console.error('Error:', error);
-    res.status(500).json({
+    res.status(error.status || 500).json({
       status: 'error',
       error: error.toString()
     });
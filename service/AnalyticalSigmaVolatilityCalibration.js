@@ -1,8 +1,7 @@
 'use strict';
 
-const path = require('path');
-const { spawn } = require('child_process');
-const { CONFIG, validateParams, getPythonEnv } = require('./config');
+const { CONFIG, validateParams } = require('./config');
+const { runTask } = require('./pythonWorkerPool');
 const { LRUCache } = require('lru-cache'); // Updated import syntax for lru-cache v7+
 
 /**
@@ -67,8 +66,20 @@ exports.volatility_densityPOST = async function(req, res) {
       throw new ValidationError(error.message);
     }
 
+    // Only the required parameters reach Python; building the key from them in
+    // CONFIG.REQUIRED_PARAMS order makes it independent of the body's key order
+    const workerParams = {};
+    for (const param of CONFIG.REQUIRED_PARAMS) {
+      workerParams[param] = params[param];
+    }
+    for (const param of CONFIG.OPTIONAL_PARAMS) {
+      if (params[param] !== undefined) {
+        workerParams[param] = params[param];
+      }
+    }
+
     // Generate cache key based on input parameters
-    const cacheKey = JSON.stringify(params);
+    const cacheKey = JSON.stringify(workerParams);
     
     // Check if result is in cache
     const cachedResult = resultCache.get(cacheKey);
@@ -89,103 +100,35 @@ exports.volatility_densityPOST = async function(req, res) {
     
     console.log('🔍 Cache miss. Computing result...');
 
-    // Set up paths
-    const pythonScriptPath = path.join(__dirname, 'Python', 'AnalyticalSigmaVolatilityCalibration.py');
-
-    // Prepare command line arguments
-    const args = [
-      pythonScriptPath,
-      ...CONFIG.REQUIRED_PARAMS.map(param => params[param].toString())
-    ];
-
-    // Log execution details
     console.log('📊 Computing Analytical Sigma Volatility with params:', params);
-    console.log('[Configuration]', {
-      pythonExecutable: CONFIG.PYTHON.EXECUTABLE,
-      scriptPath: pythonScriptPath,
-      arguments: args,
-      workingDirectory: path.dirname(pythonScriptPath)
-    });
-
-    // Execute Python process
-    const pythonProcess = spawn(CONFIG.PYTHON.EXECUTABLE, args, {
-      env: getPythonEnv()
-    });
-
-    let dataString = '';
-    let errorString = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      const str = data.toString();
-      console.log('[Python stdout]:', str);
-      dataString += str;
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      const str = data.toString();
-      console.error('[Python stderr]:', str);
-      errorString += str;
-    });
-
-    // Wait for process completion with timeout
-    await new Promise((resolve, reject) => {
-      const timeout = setTimeout(() => {
-        pythonProcess.kill();
-        reject(new TimeoutError(`Python process timed out after ${CONFIG.PYTHON.TIMEOUT_MS}ms`));
-      }, CONFIG.PYTHON.TIMEOUT_MS);
-
-      pythonProcess.on('close', (code) => {
-        clearTimeout(timeout);
-        console.log('[Python process] exited with code:', code);
-        
-        if (code !== 0) {
-          reject(new PythonProcessError(
-            `Python process exited with code ${code}`,
-            code,
-            errorString
-          ));
-        } else {
-          resolve();
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        clearTimeout(timeout);
-        console.error('[Python process] failed to start:', error);
-        reject(new PythonProcessError(`Failed to start Python process: ${error.message}`, -1, ''));
-      });
-    });
 
+    let result;
     try {
-      // Find and parse JSON output
-      const jsonMatch = dataString.match(/\{[\s\S]*\}/);
-      if (!jsonMatch) {
-        throw new Error('No valid JSON found in Python output');
+      result = await runTask('asv_calibration', workerParams);
+    } catch (error) {
+      if (error.name === 'TimeoutError') {
+        throw new TimeoutError(error.message);
       }
-
-      const result = JSON.parse(jsonMatch[0]);
-      
-      if (result.error) {
-        throw new Error(result.error);
+      if (error.status === 429) {
+        throw error;
       }
+      throw new PythonProcessError(error.message, error.code, error.stderr);
+    }
 
-      // Add performance metadata
-      const processingTime = Date.now() - startTime;
-      result.meta = {
-        processingTime: `${processingTime}ms`,
-        timestamp: new Date().toISOString(),
-        computationType: params.computationType,
-        cached: false
-      };
+    // Add performance metadata
+    const processingTime = Date.now() - startTime;
+    result.meta = {
+      processingTime: `${processingTime}ms`,
+      timestamp: new Date().toISOString(),
+      computationType: params.computationType,
+      cached: false
+    };
 
-      // Store result in cache
-      resultCache.set(cacheKey, result);
-      console.log(`✅ Calculation completed in ${processingTime}ms`);
+    // Store result in cache
+    resultCache.set(cacheKey, result);
+    console.log(`✅ Calculation completed in ${processingTime}ms`);
 
-      return res.json(result);
-    } catch (e) {
-      throw new Error('Failed to parse Python output: ' + e.toString());
-    }
+    return res.json(result);
   } catch (error) {
     console.error('❌ [Error]', error);
     
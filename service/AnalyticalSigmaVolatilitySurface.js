@@ -0,0 +1,72 @@
+'use strict';
+
+const { validateSolver } = require('./config');
+const { runTask } = require('./pythonWorkerPool');
+
+// A surface is 20-40 slice calibrations, so allow more than a single request
+const SURFACE_TIMEOUT_MS = 300000;
+
+function badRequest(message) {
+  const error = new Error(message);
+  error.status = 400;
+  return error;
+}
+
+function validateSurfaceParams(params) {
+  const { spot, strikes, expiries, quotes } = params;
+
+  if (typeof spot !== 'number' || !(spot > 0)) {
+    throw badRequest('spot must be a positive number');
+  }
+  if (!Array.isArray(strikes) || strikes.length < 3) {
+    throw badRequest('strikes must be an array of at least 3 numbers');
+  }
+  if (!Array.isArray(expiries) || expiries.length < 1) {
+    throw badRequest('expiries must be a non-empty array');
+  }
+  if (expiries.some((t) => typeof t !== 'number' || !(t > 0))) {
+    throw badRequest('expiries must be positive numbers');
+  }
+  if (!Array.isArray(quotes) || quotes.length !== strikes.length) {
+    throw badRequest(`quotes must have one row per strike (${strikes.length})`);
+  }
+  quotes.forEach((row, i) => {
+    if (!Array.isArray(row) || row.length !== expiries.length) {
+      throw badRequest(`quotes row ${i} must have one vol per expiry (${expiries.length})`);
+    }
+  });
+  try {
+    validateSolver(params.solver);
+  } catch (error) {
+    throw badRequest(error.message);
+  }
+}
+
+/**
+ * Calibrate an ASV surface from a strike x expiry quote matrix
+ */
+exports.calibrateSurface = async function(req, res) {
+  try {
+    const params = req.body || {};
+    validateSurfaceParams(params);
+
+    console.log(`Calibrating ASV surface: ${params.strikes.length} strikes x ${params.expiries.length} expiries`);
+
+    const result = await runTask('asv_surface_calibration', params, { timeoutMs: SURFACE_TIMEOUT_MS });
+    return res.json({
+      status: 'success',
+      data: result,
+      error: null
+    });
+  } catch (error) {
+    if (!error.status) {
+      error.status = 500;
+    }
+    console.error('[Error]', error);
+    res.status(error.status).json({
+      status: 'error',
+      data: null,
+      error: error.message
+    });
+  }
+};
@@ -1,21 +1,6 @@
 'use strict';
 
-const path = require('path');
-const { spawn } = require('child_process');
-
-// Configuration for Python environment
-const PYTHON_CONFIG = {
-  EXECUTABLE: process.platform === 'win32' 
-    ? 'C:/dev/build_ninja_avx2_python/bin/xsigmapython.exe'
-    : '/usr/local/bin/xsigmapython',
-  SITE_PACKAGES: process.platform === 'win32'
-    ? 'C:/dev/build_ninja_avx2_python/lib/python3.12/site-packages'
-    : '/usr/local/lib/python3.12/site-packages',
-  DATA_ROOT: process.platform === 'win32'
-    ? 'C:/dev/build_ninja_avx2_python/ExternalData/Testing'
-    : '/usr/local/share/xsigma/data',
-  TIMEOUT_MS: 30000
-};
+const { runTask } = require('./pythonWorkerPool');
 
 exports.getHartmanWatsonDistribution = async function(req, res) {
   try {
@@ -61,89 +46,12 @@ exports.getHartmanWatsonDistribution = async function(req, res) {
       throw error;
     }
 
-    // Set up paths
-    const pythonScriptPath = path.join(__dirname, './Python/HW_distribution.py');
-    
-    // Prepare the arguments array
-    const args = [
-      pythonScriptPath,
-      params.n.toString(),
-      params.t.toString(),
-      params.size_roots.toString(),
-      params.x_0.toString(),
-      params.x_n.toString()
-    ];
-
-    // Log execution details
-    console.log('[Configuration]', {
-      pythonExecutable: PYTHON_CONFIG.EXECUTABLE,
-      scriptPath: pythonScriptPath,
-      arguments: args,
-      workingDirectory: path.dirname(pythonScriptPath)
-    });
-
-    // Create Python process
-    const pythonProcess = spawn(PYTHON_CONFIG.EXECUTABLE, args, {
-      env: {
-        ...process.env,
-        PYTHONPATH: PYTHON_CONFIG.SITE_PACKAGES,
-        XSIGMA_DATA_ROOT: PYTHON_CONFIG.DATA_ROOT,
-        PYTHONUNBUFFERED: '1'
-      }
-    });
-
-    let dataString = '';
-    let errorString = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      const str = data.toString();
-      console.log('[Python stdout]:', str);
-      dataString += str;
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      const str = data.toString();
-      console.error('[Python stderr]:', str);
-      errorString += str;
+    const result = await runTask('hw_distribution', params);
+    return res.json({
+      status: 'success',
+      data: result,
+      error: null
     });
-
-    await new Promise((resolve, reject) => {
-      const timeout = setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error(`Python process timed out after ${PYTHON_CONFIG.TIMEOUT_MS}ms`));
-      }, PYTHON_CONFIG.TIMEOUT_MS);
-
-      pythonProcess.on('close', (code) => {
-        clearTimeout(timeout);
-        console.log('[Python process] exited with code:', code);
-        
-        if (code !== 0) {
-          reject(new Error(`Python process exited with code ${code}\nError: ${errorString}`));
-        } else {
-          resolve();
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        clearTimeout(timeout);
-        console.error('[Python process] failed to start:', error);
-        reject(new Error(`Failed to start Python process: ${error.message}`));
-      });
-    });
-
-    try {
-      const result = JSON.parse(dataString);
-      if (result.status === 'error') {
-        const error = new Error(result.error);
-        error.status = 500;
-        throw error;
-      }
-      return res.json(result);
-    } catch (e) {
-      const error = new Error('Invalid Python output: ' + e.toString());
-      error.status = 500;
-      throw error;
-    }
   } catch (error) {
     if (!error.status) {
       error.status = 500;
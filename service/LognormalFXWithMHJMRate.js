@@ -4,6 +4,7 @@ const path = require('path');
 const fs = require('fs');
 const { spawn } = require('child_process');
 const { CONFIG, getPythonEnv } = require('./config');
+const { limitConcurrency } = require('./pythonWorkerPool');
 
 /**
  * Handle requests for the LognormalFXWithMHJMRates service
@@ -15,6 +16,12 @@ exports.LognormalFXWithMHJMRates = async function(req, res) {
     // Extract parameters from request
     const num_paths = req.query.num_paths || '524288';
     const volatility = req.query.volatility || '0.15';
+    const block_size = req.query.block_size;
+    const target_error = req.query.target_error;
+    const control_variates = String(req.query.control_variates) === 'true';
+    const smile_moneyness = req.query.smile_moneyness;
+    const volatilities = req.query.volatilities;
+    const resume = String(req.query.resume) === 'true';
 
     // Get absolute paths
     const projectRoot = path.resolve(__dirname, '..');
@@ -32,7 +39,7 @@ exports.LognormalFXWithMHJMRates = async function(req, res) {
     console.log('XSigma Python Path:', CONFIG.PYTHON.EXECUTABLE);
     console.log('Script Path:', pythonScriptPath);
     console.log('Working Directory:', path.dirname(pythonScriptPath));
-    console.log('Parameters:', { num_paths, volatility });
+    console.log('Parameters:', { num_paths, volatility, block_size, target_error, control_variates, smile_moneyness, volatilities, resume });
 
     // Prepare command line arguments
     const args = [pythonScriptPath];
@@ -42,58 +49,45 @@ exports.LognormalFXWithMHJMRates = async function(req, res) {
     if (volatility) {
       args.push('--volatility', volatility);
     }
-
-    // Create Python process using centralized configuration
-    const pythonProcess = spawn(CONFIG.PYTHON.EXECUTABLE, args, {
-      env: getPythonEnv(),
-      cwd: path.dirname(pythonScriptPath),
-      stdio: ['pipe', 'pipe', 'pipe']
-    });
-
-    let dataString = '';
-    let errorString = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      const output = data.toString();
-      console.log('Python stdout:', output);
-      dataString += output;
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      const error = data.toString();
-      console.error('Python stderr:', error);
-      errorString += error;
-    });
+    if (block_size !== undefined) {
+      args.push('--block-size', String(block_size));
+    }
+    if (target_error !== undefined) {
+      args.push('--target-error', String(target_error));
+    }
+    if (control_variates) {
+      args.push('--control-variates');
+    }
+    if (smile_moneyness !== undefined) {
+      const moneyness = String(smile_moneyness);
+      if (!/^\d+(\.\d+)?(,\d+(\.\d+)?)*$/.test(moneyness)) {
+        const error = new Error('smile_moneyness must be comma-separated positive numbers, e.g. 0.8,0.9,1,1.1,1.2');
+        error.status = 400;
+        throw error;
+      }
+      args.push('--smile-moneyness', moneyness);
+    }
+    if (volatilities !== undefined) {
+      const sweep = String(volatilities);
+      if (!/^\d+(\.\d+)?(,\d+(\.\d+)?)*$/.test(sweep)) {
+        const error = new Error('volatilities must be comma-separated positive numbers, e.g. 0.1,0.15,0.2');
+        error.status = 400;
+        throw error;
+      }
+      args.push('--volatilities', sweep);
+    }
+    // Continue from the checkpoint of an identical request that timed out
+    if (resume) {
+      args.push('--resume');
+    }
 
     // Use a longer timeout for this computation
     const timeout = 1200000; // 20 minutes
 
-    await new Promise((resolve, reject) => {
-      pythonProcess.on('close', (code) => {
-        console.log('Python process exited with code:', code);
-        if (code !== 0) {
-          const error = new Error(
-            `Python process exited with code ${code}\n` +
-            `Error: ${errorString}`
-          );
-          error.status = 500;
-          reject(error);
-        } else {
-          resolve();
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        console.error('Failed to start Python process:', error);
-        error.status = 500;
-        reject(new Error(`Failed to start XSigma Python process: ${error.message}`));
-      });
-
-      setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error(`Python process timed out after ${timeout/1000} seconds`));
-      }, timeout);
-    });
+    // Queue behind other simulations so bursts do not fork unbounded processes
+    const dataString = await limitConcurrency('fx_mhjm', () =>
+      runFxScript(args, timeout)
+    );
 
     try {
       // Find the last valid JSON in the output
@@ -120,4 +114,65 @@ exports.LognormalFXWithMHJMRates = async function(req, res) {
       error: error.message
     });
   }
-};
\ No newline at end of file
+};
+
+/**
+ * Run LognormalFXWithMHJMRates.py and resolve with its stdout once it exits successfully
+ */
+function runFxScript(args, timeout) {
+  const pythonScriptPath = args[0];
+
+  // Create Python process using centralized configuration
+  const pythonProcess = spawn(CONFIG.PYTHON.EXECUTABLE, args, {
+    env: getPythonEnv(),
+    cwd: path.dirname(pythonScriptPath),
+    stdio: ['pipe', 'pipe', 'pipe']
+  });
+
+  let dataString = '';
+  let errorString = '';
+
+  pythonProcess.stdout.on('data', (data) => {
+    const output = data.toString();
+    console.log('Python stdout:', output);
+    dataString += output;
+  });
+
+  pythonProcess.stderr.on('data', (data) => {
+    const error = data.toString();
+    console.error('Python stderr:', error);
+    errorString += error;
+  });
+
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      pythonProcess.kill();
+      const error = new Error(`Python process timed out after ${timeout/1000} seconds`);
+      error.status = 504;
+      reject(error);
+    }, timeout);
+
+    pythonProcess.on('close', (code) => {
+      clearTimeout(timer);
+      console.log('Python process exited with code:', code);
+      if (code !== 0) {
+        const error = new Error(
+          `Python process exited with code ${code}\n` +
+          `Error: ${errorString}`
+        );
+        error.status = 500;
+        reject(error);
+      } else {
+        resolve(dataString);
+      }
+    });
+
+    pythonProcess.on('error', (error) => {
+      clearTimeout(timer);
+      console.error('Failed to start Python process:', error);
+      const startError = new Error(`Failed to start XSigma Python process: ${error.message}`);
+      startError.status = 500;
+      reject(startError);
+    });
+  });
+}
@@ -4,9 +4,15 @@ import numpy as np
 from typing import Dict, List, Union, Tuple
 from dataclasses import dataclass
 from xsigmamodules.Market import volatilityModelExtendedSvi
-from xsigmamodules.Util import blackScholes, volatility_type
+from xsigmamodules.Util import volatility_type
 from xsigmamodules.Vectorization import vector
 from xsigmamodules.util.numpy_support import xsigmaToNumpy, numpyToXsigma
+from common.vectorizedPricing import (
+    black_scholes_price,
+    black_scholes_density,
+    black_scholes_probability,
+)
+from common.columnarFormat import to_json_compatible
 
 @dataclass
 class VolatilityParams:
@@ -43,9 +49,16 @@ class VolatilityParams:
         except ValueError as e:
             raise ValueError(f"Error parsing argument {param_names[i]}: {e}")
 
+    @classmethod
+    def from_dict(cls, values: Dict[str, Union[int, float]]) -> 'VolatilityParams':
+        # The Node service sends the test case as "Test"
+        values = {**values, 'test': values.get('test', values.get('Test'))}
+        return cls.from_argv([None] + [values[name] for name in cls.__dataclass_fields__])
+
 class VolatilitySurfaceCalculator:
     def __init__(self, params: VolatilityParams):
         self.params = params
+        self._density_cache = {}
 
     def create_svi_model(self, ctrl_c: float = None) -> volatilityModelExtendedSvi:
         ctrl_c = ctrl_c if ctrl_c is not None else self.params.ctrl_c
@@ -55,7 +68,7 @@ class VolatilitySurfaceCalculator:
             self.params.put, self.params.call
         )
 
-    def calculate_test1_volatility(self) -> Dict[str, List[float]]:
+    def calculate_test1_volatility(self) -> Dict[str, np.ndarray]:
         strikes = np.linspace(0.25 * self.params.fwd, 2.0 * self.params.fwd, self.params.n)
         vols = np.zeros(self.params.n)
         vols0 = np.full(self.params.n, self.params.atm)
@@ -65,12 +78,12 @@ class VolatilitySurfaceCalculator:
                              self.params.time, volatility_type.LOG_NORMAL)
         
         return {
-            "strikes": strikes.tolist(),
-            "Tab_1": vols.tolist(),
-            "Tab_2": vols0.tolist()
+            "strikes": strikes,
+            "Tab_1": vols,
+            "Tab_2": vols0
         }
 
-    def calculate_test2_volatility(self) -> Dict[str, List[float]]:
+    def calculate_test2_volatility(self) -> Dict[str, np.ndarray]:
         strikes = np.linspace(0.3, 2.0, self.params.n)
         vols_minus = np.zeros(self.params.n)
         vols_plus = np.zeros(self.params.n)
@@ -88,9 +101,9 @@ class VolatilitySurfaceCalculator:
         )
 
         return {
-            "strikes": strikes.tolist(),
-            "Tab_1": vols_minus.tolist(),
-            "Tab_2": vols_plus.tolist()
+            "strikes": strikes,
+            "Tab_1": vols_minus,
+            "Tab_2": vols_plus
         }
 
     def calculate_sensitivities(self, strikes: np.ndarray) -> Tuple[np.ndarray, ...]:
@@ -106,55 +119,58 @@ class VolatilitySurfaceCalculator:
         
         return (vols, *sensitivities)
 
-    def calculate_density_and_probability(self, strikes: np.ndarray) -> Dict[str, List[float]]:
-        bump = 1e-6
-        density = []
-        density_bump = []
-        probability = []
-        probability_bump = []
-        
+    def calculate_smile(self, strikes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vols, density and probability on strikes (len(strikes) == n)."""
         vols, *sensitivities = self.calculate_sensitivities(strikes)
-        strike_sensitivity = sensitivities[5]
-        strike2_sensitivity = sensitivities[9]
+        density = black_scholes_density(
+            self.params.fwd, strikes, self.params.time,
+            vols, sensitivities[5], sensitivities[9]
+        )
+        probability = black_scholes_probability(
+            self.params.fwd, strikes, self.params.time,
+            vols, sensitivities[5]
+        )
+        return vols, density, probability
+
+    def calculate_density_and_probability(self, strikes: np.ndarray) -> Dict[str, np.ndarray]:
+        # Tests 3 and 4 use the same strike grid; compute both once per calculator
+        key = strikes.tobytes()
+        if key not in self._density_cache:
+            self._density_cache[key] = self._density_and_probability(strikes)
+        return self._density_cache[key]
+
+    def _density_and_probability(self, strikes: np.ndarray) -> Dict[str, np.ndarray]:
+        bump = 1e-6
 
         # Calculate analytical values
-        for i, strike in enumerate(strikes):
-            density.append(blackScholes.density(
-                self.params.fwd, strike, self.params.time,
-                vols[i], strike_sensitivity[i], strike2_sensitivity[i]
-            ))
-            probability.append(blackScholes.probability(
-                self.params.fwd, strike, self.params.time,
-                vols[i], strike_sensitivity[i]
-            ))
-
-        # Calculate bumped values
-        for strike in strikes:
-            strikes_tmp = np.array([strike - bump, strike, strike + bump])
-            vols_tmp = np.zeros(3)
-            
-            self.create_svi_model().implied_volatility(
-                numpyToXsigma(vols_tmp), numpyToXsigma(strikes_tmp), 1.0,
-                self.params.time, volatility_type.LOG_NORMAL
-            )
+        _, density, probability = self.calculate_smile(strikes)
+
+        # Calculate bumped values: rows are (K - h, K, K + h) for each strike,
+        # evaluated with one model and one implied_volatility call
+        strikes_bumped = (strikes[:, None] + np.array([-bump, 0.0, bump])).ravel()
+        vols_bumped = np.zeros(strikes_bumped.size)
 
-            prices = [
-                blackScholes.price(self.params.fwd, k, self.params.time, v, 1.0, 1.0)
-                for k, v in zip(strikes_tmp, vols_tmp)
-            ]
-            
-            density_bump.append((prices[2] + prices[0] - 2 * prices[1]) / (bump * bump))
-            probability_bump.append(1 + (prices[2] - prices[0]) / (2.0 * bump))
+        self.create_svi_model().implied_volatility(
+            numpyToXsigma(vols_bumped), numpyToXsigma(strikes_bumped), 1.0,
+            self.params.time, volatility_type.LOG_NORMAL
+        )
+
+        prices = black_scholes_price(
+            self.params.fwd, strikes_bumped, self.params.time, vols_bumped, 1.0, 1.0
+        ).reshape(-1, 3)
+
+        density_bump = (prices[:, 2] + prices[:, 0] - 2 * prices[:, 1]) / (bump * bump)
+        probability_bump = 1 + (prices[:, 2] - prices[:, 0]) / (2.0 * bump)
 
         return {
-            "strikes": strikes.tolist(),
+            "strikes": strikes,
             "density": density,
             "density_bump": density_bump,
             "probability": probability,
             "probability_bump": probability_bump
         }
 
-    def calculate_test3_density(self) -> Dict[str, List[float]]:
+    def calculate_test3_density(self) -> Dict[str, np.ndarray]:
         strikes = np.linspace(0.3, 2.0, self.params.n)
         result = self.calculate_density_and_probability(strikes)
         return {
@@ -163,7 +179,7 @@ class VolatilitySurfaceCalculator:
             "Tab_2": result["density_bump"]
         }
 
-    def calculate_test4_probability(self) -> Dict[str, List[float]]:
+    def calculate_test4_probability(self) -> Dict[str, np.ndarray]:
         strikes = np.linspace(0.3, 2.0, self.params.n)
         result = self.calculate_density_and_probability(strikes)
         return {
@@ -172,23 +188,42 @@ class VolatilitySurfaceCalculator:
             "Tab_2": result["probability_bump"]
         }
 
+# Calculators kept by the compute worker between requests, keyed by every
+# parameter except the test case, so tests 3 and 4 on the same surface share
+# one sensitivities pass
+_CALCULATOR_CACHE_SIZE = 8
+_calculators: Dict[Tuple, VolatilitySurfaceCalculator] = {}
+
+def get_calculator(params: VolatilityParams) -> VolatilitySurfaceCalculator:
+    key = tuple(getattr(params, name) for name in params.__dataclass_fields__ if name != 'test')
+    calculator = _calculators.pop(key, None)
+    if calculator is None:
+        calculator = VolatilitySurfaceCalculator(params)
+    while len(_calculators) >= _CALCULATOR_CACHE_SIZE:
+        _calculators.pop(next(iter(_calculators)))
+    _calculators[key] = calculator
+    return calculator
+
+def run_test(params: VolatilityParams) -> Dict[str, np.ndarray]:
+    calculator = get_calculator(params)
+
+    test_functions = {
+        1: calculator.calculate_test1_volatility,
+        2: calculator.calculate_test2_volatility,
+        3: calculator.calculate_test3_density,
+        4: calculator.calculate_test4_probability
+    }
+
+    if params.test not in test_functions:
+        raise ValueError(f"Invalid test case: {params.test}. Must be between 1 and 4.")
+
+    return test_functions[params.test]()
+
 def main() -> None:
     try:
         params = VolatilityParams.from_argv(sys.argv)
-        calculator = VolatilitySurfaceCalculator(params)
-        
-        test_functions = {
-            1: calculator.calculate_test1_volatility,
-            2: calculator.calculate_test2_volatility,
-            3: calculator.calculate_test3_density,
-            4: calculator.calculate_test4_probability
-        }
-        
-        if params.test not in test_functions:
-            raise ValueError(f"Invalid test case: {params.test}. Must be between 1 and 4.")
-            
-        result = test_functions[params.test]()
-        print(json.dumps({"status": "success", "data": result, "error": None}))
+        result = run_test(params)
+        print(json.dumps({"status": "success", "data": result, "error": None}, default=to_json_compatible))
 
     except Exception as e:
         print(json.dumps({"status": "error", "data": None, "error": str(e)}))
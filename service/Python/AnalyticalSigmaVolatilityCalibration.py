@@ -5,28 +5,23 @@ import json
 import time
 import numpy as np
 from xsigmamodules.Util import (
-    blackScholes,
     sigmaVolatilityInspired,
     volatility_type
 )
 from xsigmamodules.util.numpy_support import xsigmaToNumpy, numpyToXsigma
 from xsigmamodules.Market import volatilityModelExtendedSvi
-from xsigmamodules.Math import (
-    solverOptionsCeres,
-    solverOptionsLm,
-    solverOptionsNlopt,
-    nlopt_algo_name
-)
-from common.volatilityDensityModel import (
-    create_interactive_model,
-    plot_density,
-    generate_sample_data,
-    plot_volatility_smile
-)
+from common.volatilityCompute import generate_sample_data
+from common.vectorizedPricing import black_scholes_density
+from common.calibrationCache import calibration_cache, solver_key
+from common.warmStart import warm_start_store
+from common.solverOptions import DEFAULT_SOLVER, solver_settings, build_solver_options
 
 # Cache for sample data to avoid regenerating for repeated calls
 _sample_data_cache = None
 
+# Warm-start seeds are looked up per instrument; requests without one share this
+DEFAULT_INSTRUMENT = "default"
+
 def get_sample_data():
     """
     Get or generate sample market data with caching
@@ -96,17 +91,16 @@ def density_new(obj, strikes, spot, expiry):
         expiry, numpyToXsigma(strikes), *[numpyToXsigma(arr) for arr in arrays.values()]
     )
 
-    density = [
-        blackScholes.density(spot, strike, expiry, vol, strike_sens, strike2_sens)
-        for strike, vol, strike_sens, strike2_sens in zip(
-            strikes,
-            arrays["vols"],
-            arrays["strike_sensitivity"],
-            arrays["strike2_sensitivity"],
-        )
-    ]
+    density = black_scholes_density(
+        spot,
+        strikes,
+        expiry,
+        arrays["vols"],
+        arrays["strike_sensitivity"],
+        arrays["strike2_sensitivity"],
+    )
 
-    return density
+    return density.tolist()
 
 def calculate_vols_and_density(params, computation_type):
     """
@@ -129,9 +123,18 @@ def calculate_vols_and_density(params, computation_type):
         # Get sample data (using cache)
         calibration_strikes, bid_values, ask_values, mid_values = get_sample_data()
         
-        # Create initial guess for model parameters
+        # Seed from the previous calibration of the same instrument at the same
+        # expiry, spot and rates if asked to (the seed object carries them into
+        # the calibration), otherwise from the fixed initial guess
+        instrument = params.get('instrument', DEFAULT_INSTRUMENT)
+        seed = None
+        seed_context = {name: float(params[name]) for name in ("spot", "r", "q")}
+        if params.get('warm_start'):
+            seed = warm_start_store.lookup(
+                "asv", instrument, params['expiry'], volatilityModelExtendedSvi, seed_context
+            )
         try:
-            initial_guess_obj = volatilityModelExtendedSvi(
+            initial_guess_obj = seed.model if seed else volatilityModelExtendedSvi(
                 params['spot'], 0.2, params['volvol'], params['beta'], 
                 params['rho'], params['r'], params['q'], 0.00006
             )
@@ -141,18 +144,43 @@ def calculate_vols_and_density(params, computation_type):
                 "error": f"Failed to create initial model: {str(e)}"
             }
 
-        # Calibrate with Ceres solver
+        # Calibrate with the requested solver (Ceres by default)
         try:
-            options_ceres = solverOptionsCeres(500, 1e-14, 1e-14, 1e-14)
-            calibrated_obj_ceres = volatilityModelExtendedSvi.calibrate(
-                numpyToXsigma(calibration_strikes),
-                numpyToXsigma(mid_values),
-                params['spot'],
-                params['expiry'],
-                options_ceres,
-                1,
-                1,
-                initial_guess_obj
+            solver = params.get('solver', DEFAULT_SOLVER)
+            settings = solver_settings(solver, params.get('solver_settings'))
+            solver_options = build_solver_options(solver, settings)
+            calibration_inputs = {
+                "strikes": calibration_strikes,
+                "mid_values": mid_values,
+                "spot": params['spot'],
+                "expiry": params['expiry'],
+                "solver": solver_key(solver, settings),
+                "initial_guess": {"warm_start": seed.key} if seed else [
+                    params['spot'], 0.2, params['volvol'], params['beta'],
+                    params['rho'], params['r'], params['q'], 0.00006
+                ],
+            }
+            calibration_report = {"warm_start": seed is not None}
+            calibrated_obj_ceres = calibration_cache.get_or_calibrate(
+                "asv",
+                calibration_inputs,
+                lambda: warm_start_store.run("asv", seed, lambda: volatilityModelExtendedSvi.calibrate(
+                    numpyToXsigma(calibration_strikes),
+                    numpyToXsigma(mid_values),
+                    params['spot'],
+                    params['expiry'],
+                    solver_options,
+                    1,
+                    1,
+                    initial_guess_obj
+                ), calibration_report),
+                volatilityModelExtendedSvi
+            )
+            # warm_start_store.run only fills in timings on a cache miss
+            calibration_report["cached"] = "calibration_ms" not in calibration_report
+            warm_start_store.record(
+                "asv", instrument, params['expiry'], calibrated_obj_ceres, volatilityModelExtendedSvi,
+                calibration_cache.key("asv", calibration_inputs), seed_context
             )
         except Exception as e:
             return {
@@ -188,7 +216,8 @@ def calculate_vols_and_density(params, computation_type):
                         "vols": vols.tolist()
                     },
                     "performance": {
-                        "execution_time_ms": round(execution_time * 1000, 2)
+                        "execution_time_ms": round(execution_time * 1000, 2),
+                        "calibration": calibration_report
                     }
                 }
             except Exception as e:
@@ -212,7 +241,8 @@ def calculate_vols_and_density(params, computation_type):
                         "density": density
                     },
                     "performance": {
-                        "execution_time_ms": round(execution_time * 1000, 2)
+                        "execution_time_ms": round(execution_time * 1000, 2),
+                        "calibration": calibration_report
                     }
                 }
             except Exception as e:
@@ -280,6 +310,31 @@ def calculate_vols_and_density(params, computation_type):
             "error": str(e)
         }
 
+def parse_params(values):
+    """
+    Convert raw request values (strings or numbers) to typed parameters
+    
+    Args:
+        values (dict): Raw values keyed by parameter name
+        
+    Returns:
+        dict: Typed parameters for calculate_vols_and_density
+    """
+    return {
+        'n': int(values['n']),
+        'spot': float(values['spot']),
+        'expiry': float(values['expiry']),
+        'r': float(values['r']),
+        'q': float(values['q']),
+        'beta': float(values['beta']),
+        'rho': float(values['rho']),
+        'volvol': float(values['volvol']),
+        'warm_start': str(values.get('warm_start', False)).lower() in ('true', '1'),
+        'instrument': str(values.get('instrument', DEFAULT_INSTRUMENT)),
+        'solver': str(values.get('solver', DEFAULT_SOLVER)),
+        'solver_settings': values.get('solver_settings') or {}
+    }
+
 def main():
     """
     Main entry point for the script
@@ -290,16 +345,8 @@ def main():
             raise ValueError("Insufficient arguments")
 
         # Parse command line arguments
-        params = {
-            'n': int(sys.argv[1]),
-            'spot': float(sys.argv[2]),
-            'expiry': float(sys.argv[3]),
-            'r': float(sys.argv[4]),
-            'q': float(sys.argv[5]),
-            'beta': float(sys.argv[6]),
-            'rho': float(sys.argv[7]),
-            'volvol': float(sys.argv[8])
-        }
+        names = ['n', 'spot', 'expiry', 'r', 'q', 'beta', 'rho', 'volvol']
+        params = parse_params(dict(zip(names, sys.argv[1:9])))
         computation_type = sys.argv[9]
 
         # Perform calculation and print result as JSON
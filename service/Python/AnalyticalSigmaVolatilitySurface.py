@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Multi-expiry ASV surface calibration.
+
+Each expiry slice of a strike x expiry quote matrix is calibrated with
+volatilityModelExtendedSvi.calibrate in a process pool, so wall time grows
+with slices / cores rather than with the slice count. Slices are handed to
+the pool as plain arrays and come back as plain dicts; calibrated models
+never cross the process boundary.
+
+The calibrated slices are then checked for calendar arbitrage: at every
+strike of a common check grid, total implied variance vol^2 * T must not
+decrease with expiry. Violations are reported and an arbitrage-free set of
+vols is returned by taking the running maximum of total variance across
+expiries.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xsigmamodules.Market import volatilityModelExtendedSvi
+from xsigmamodules.Util import volatility_type
+from xsigmamodules.util.numpy_support import numpyToXsigma
+from common.calibrationCache import calibration_cache, solver_key
+from common.solverOptions import DEFAULT_SOLVER, solver_settings, build_solver_options
+
+# Initial guess inputs, as in AnalyticalSigmaVolatilityCalibration
+DEFAULT_INITIAL_GUESS = {
+    "volvol": 0.2256,
+    "beta": 0.4158,
+    "rho": 0.2256,
+    "r": 0.003,
+    "q": 0.0022,
+}
+
+CHECK_POINTS = 50
+# Total variance may decrease by this much before it counts as arbitrage
+CALENDAR_TOLERANCE = 1e-10
+
+# Reused across requests in the compute worker
+_executor = None
+_executor_workers = 0
+
+
+def _get_executor(max_workers):
+    global _executor, _executor_workers
+    # A pool whose process died (e.g. a crash in the native calibration)
+    # rejects all further work, so it is replaced as well
+    if _executor is None or _executor_workers < max_workers or _executor._broken:
+        _discard_executor()
+        _executor = ProcessPoolExecutor(max_workers=max_workers)
+        _executor_workers = max_workers
+    return _executor
+
+
+def _discard_executor():
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor, _executor_workers = None, 0
+
+
+def _calibrate_slices(tasks, max_workers):
+    """calibrate_slice over tasks in the shared pool, retried once in a fresh pool if it breaks."""
+    try:
+        return list(_get_executor(max_workers).map(calibrate_slice, tasks))
+    except BrokenProcessPool:
+        _discard_executor()
+        return list(_get_executor(max_workers).map(calibrate_slice, tasks))
+
+
+def model_parameters(model):
+    """Calibrated parameters as a dict, read back from the model's JSON form."""
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        volatilityModelExtendedSvi.write_to_json(path, model)
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return None
+    finally:
+        os.unlink(path)
+
+
+def calibrate_slice(task):
+    """Calibrate one expiry; task and result only hold plain Python values."""
+    start = time.perf_counter()
+    strikes = np.asarray(task["strikes"], dtype=float)
+    vols = np.asarray(task["vols"], dtype=float)
+    quoted = np.isfinite(vols)
+    strikes, vols = strikes[quoted], vols[quoted]
+    spot, expiry = task["spot"], task["expiry"]
+    guess = task["initial_guess"]
+    initial_guess = [spot, 0.2, guess["volvol"], guess["beta"], guess["rho"], guess["r"], guess["q"], 0.00006]
+
+    try:
+        if len(strikes) < 3:
+            raise ValueError(f"Need at least 3 quotes, got {len(strikes)}")
+
+        model = calibration_cache.get_or_calibrate(
+            "asv",
+            {
+                "strikes": strikes,
+                "mid_values": vols,
+                "spot": spot,
+                "expiry": expiry,
+                "solver": solver_key(task["solver"], task["solver_settings"]),
+                "initial_guess": initial_guess,
+            },
+            lambda: volatilityModelExtendedSvi.calibrate(
+                numpyToXsigma(strikes),
+                numpyToXsigma(vols),
+                spot,
+                expiry,
+                build_solver_options(task["solver"], task["solver_settings"]),
+                1,
+                1,
+                volatilityModelExtendedSvi(*initial_guess)
+            ),
+            volatilityModelExtendedSvi
+        )
+
+        fitted = np.zeros(len(strikes))
+        model.implied_volatility(
+            numpyToXsigma(fitted), numpyToXsigma(strikes), 1.0, expiry, volatility_type.LOG_NORMAL
+        )
+        check_strikes = np.asarray(task["check_strikes"], dtype=float)
+        check_vols = np.zeros(len(check_strikes))
+        model.implied_volatility(
+            numpyToXsigma(check_vols), numpyToXsigma(check_strikes), 1.0, expiry, volatility_type.LOG_NORMAL
+        )
+
+        return {
+            "expiry": expiry,
+            "quotes": int(len(strikes)),
+            "rmse": float(np.sqrt(np.mean((fitted - vols) ** 2))),
+            "parameters": model_parameters(model),
+            "check_vols": check_vols.tolist(),
+            "calibration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "expiry": expiry,
+            "quotes": int(len(strikes)),
+            "rmse": None,
+            "parameters": None,
+            "check_vols": None,
+            "calibration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "error": str(e),
+        }
+
+
+def calendar_arbitrage(expiries, check_vols):
+    """
+    Violations of non-decreasing total variance between consecutive expiries,
+    and the vols after replacing total variance by its running maximum.
+    """
+    expiries = np.asarray(expiries, dtype=float)
+    total_variance = np.asarray(check_vols) ** 2 * expiries[:, None]
+    gaps = total_variance[:-1] - total_variance[1:]
+
+    violations = []
+    for i, gap in enumerate(gaps):
+        bad = gap > CALENDAR_TOLERANCE
+        if np.any(bad):
+            violations.append({
+                "from_expiry": float(expiries[i]),
+                "to_expiry": float(expiries[i + 1]),
+                "strikes_affected": int(np.sum(bad)),
+                "max_total_variance_gap": float(np.max(gap[bad])),
+            })
+
+    repaired = np.maximum.accumulate(total_variance, axis=0)
+    return violations, np.sqrt(repaired / expiries[:, None])
+
+
+def calibrate_surface(params):
+    """
+    Calibrate every expiry of a quote matrix.
+
+    params:
+        spot: float
+        strikes: list of n_k strikes
+        expiries: list of n_t expiries in years
+        quotes: n_k x n_t implied vols (null for missing quotes)
+        initial_guess: optional overrides of DEFAULT_INITIAL_GUESS
+        solver, solver_settings: optional backend and settings (see common.solverOptions)
+        max_workers: optional cap on pool processes (default: CPU count)
+    """
+    spot = float(params["spot"])
+    strikes = np.asarray(params["strikes"], dtype=float)
+    expiries = np.asarray(params["expiries"], dtype=float)
+    quotes = np.array(params["quotes"], dtype=float)
+
+    if quotes.shape != (len(strikes), len(expiries)):
+        raise ValueError(
+            f"quotes must be {len(strikes)} x {len(expiries)} (strikes x expiries), got "
+            f"{' x '.join(str(n) for n in quotes.shape)}"
+        )
+    if np.any(expiries <= 0):
+        raise ValueError("expiries must be positive")
+
+    order = np.argsort(expiries)
+    expiries, quotes = expiries[order], quotes[:, order]
+    initial_guess = {**DEFAULT_INITIAL_GUESS, **(params.get("initial_guess") or {})}
+    check_strikes = np.linspace(strikes.min(), strikes.max(), int(params.get("check_points", CHECK_POINTS)))
+    solver = params.get("solver", DEFAULT_SOLVER)
+    settings = solver_settings(solver, params.get("solver_settings"))
+
+    tasks = [
+        {
+            "strikes": strikes.tolist(),
+            "vols": quotes[:, j].tolist(),
+            "spot": spot,
+            "expiry": float(expiry),
+            "initial_guess": initial_guess,
+            "solver": solver,
+            "solver_settings": settings,
+            "check_strikes": check_strikes.tolist(),
+        }
+        for j, expiry in enumerate(expiries)
+    ]
+
+    start = time.perf_counter()
+    max_workers = min(len(tasks), int(params.get("max_workers") or os.cpu_count() or 1))
+    if max_workers <= 1:
+        slices = [calibrate_slice(task) for task in tasks]
+    else:
+        slices = _calibrate_slices(tasks, max_workers)
+    wall_time = time.perf_counter() - start
+
+    calibrated = [i for i, s in enumerate(slices) if s["error"] is None]
+    violations, repaired = [], None
+    if len(calibrated) > 1:
+        violations, repaired = calendar_arbitrage(
+            expiries[calibrated], [slices[i]["check_vols"] for i in calibrated]
+        )
+
+    return {
+        "parameters": [
+            {key: s[key] for key in ("expiry", "quotes", "rmse", "parameters", "calibration_ms", "error")}
+            for s in slices
+        ],
+        "check_strikes": check_strikes.tolist(),
+        "vols": [s["check_vols"] for s in slices],
+        "calendar_arbitrage": {
+            "expiries": expiries[calibrated].tolist(),
+            "violations": violations,
+            "arbitrage_free_vols": repaired.tolist() if repaired is not None else None,
+        },
+        "performance": {
+            "wall_time_ms": round(wall_time * 1000, 2),
+            "slice_time_ms": round(sum(s["calibration_ms"] for s in slices), 2),
+            "workers": max_workers,
+        },
+    }
+
+
+if __name__ == "__main__":
+    try:
+        params = json.loads(sys.argv[1])
+        print(json.dumps({"status": "success", "data": calibrate_surface(params), "error": None}))
+    except Exception as e:
+        print(json.dumps({"status": "error", "data": None, "error": str(e)}))
+        sys.exit(1)
@@ -1,6 +1,9 @@
+import os
 import json
 import sys
 import time
+import argparse
+from concurrent.futures import as_completed
 import numpy as np
 from itertools import chain
 from xsigmamodules.Random import random_type
@@ -42,59 +45,116 @@ from xsigmamodules.market import market_data
 from xsigmamodules.simulation import simulation
 from xsigmamodules.util.misc import xsigmaGetDataRoot, xsigmaGetTempDir
 from xsigmamodules.util.numpy_support import xsigmaToNumpy, numpyToXsigma
+from common.diskCache import canonical_key
+from common.hjmParameterStore import hjm_parameter_store
+from common.marketData import load_snapshot, digest
+from common.simulationCheckpoint import SimulationCheckpoint
+from common.processPools import default_workers, terminating_pool
+from common.progressEvents import EventStream
+
+# Market and static data read by load_market_data, relative to the data root
+MARKET_DATA_FILES = {
+    "target_config": (calibrationIrTargetsConfiguration, "Data/staticData/calibration_ir_targets_configuration.json"),
+    "discount_curve": (discountCurvePiecewiseConstant, "Data/marketData/discount_curve_piecewise_constant.json"),
+    "ir_volatility_surface": (irVolatilitySurface, "Data/marketData/ir_volatility_surface.json"),
+    "correlation_mgr": (correlationManager, "Data/marketData/correlation_manager.json"),
+    "convention": (dayCountConvention, "Data/staticData/day_count_convention_360.json"),
+}
+
+# calibrationHjmSettings arguments after the factor count; the parameter
+# type is kept by name so the tuple can be part of a cache key
+CALIBRATION_SETTINGS = (
+    [0.0001, 1],    # volatility bounds
+    [0.0001, 1.0],  # decay bounds
+    "PICEWISE_CONSTANT",
+    True,
+    200,
+    True,
+    False,
+    1.0,
+)
+
+# Expected share of the run per stage, for the percent-complete events
+STAGE_WEIGHTS = {
+    1: {"market_data": 5, "calibration": 35, "cms_pricing": 60},
+    2: {"market_data": 2, "calibration": 15, "simulation_setup": 3, "simulation": 75, "results": 5},
+}
 
 def load_market_data(data_root: str) -> tuple:
-    """Load all required market data files."""
+    """Load all required market data files as a shared snapshot."""
     try:
         # Create discount_id and diffusion_id
         discount_id = discountId("LIBOR.3M.USD", "USD")
         diffusion_id = simulatedMarketDataIrId(discount_id)
 
-        target_config = calibrationIrTargetsConfiguration.read_from_json(
-            f"{data_root}/Data/staticData/calibration_ir_targets_configuration.json"
-        )
-        discount_curve = discountCurvePiecewiseConstant.read_from_json(
-            f"{data_root}/Data/marketData/discount_curve_piecewise_constant.json"
-        )
-        ir_volatility_surface = irVolatilitySurface.read_from_json(
-            f"{data_root}/Data/marketData/ir_volatility_surface.json"
-        )
-        correlation_mgr = correlationManager.read_from_json(
-            f"{data_root}/Data/marketData/correlation_manager.json"
-        )
-        convention = dayCountConvention.read_from_json(
-            f"{data_root}/Data/staticData/day_count_convention_360.json"
-        )
+        snapshot = load_snapshot(MARKET_DATA_FILES, data_root)
 
-        return target_config, discount_curve, ir_volatility_surface, correlation_mgr, convention, discount_id, diffusion_id
+        return snapshot, discount_id, diffusion_id
         
     except Exception as e:
         raise ConfigurationError(f"Error loading market data: {str(e)}")
 
+def market_data_hash(snapshot) -> str:
+    """Key of everything the calibration depends on besides the valuation date."""
+    return canonical_key({
+        "market_data": snapshot.digests(),
+        "diffusion": "LIBOR.3M.USD/USD",
+        "settings": CALIBRATION_SETTINGS,
+    })
+
 def setup_calibration(diffusion_id, correlation_mgr: correlationManager) -> tuple:
     """Setup calibration parameters."""
     diffusion_ids = [diffusion_id]
     correlation = correlation_mgr.pair_correlation_matrix(diffusion_ids, diffusion_ids)
     
-    volatility_bounds = [0.0001, 1]
-    decay_bounds = [0.0001, 1.0]
+    volatility_bounds, decay_bounds, parameter_type, *settings = CALIBRATION_SETTINGS
     
     calibration_settings_aad = calibrationHjmSettings(
         correlation.rows(),
         volatility_bounds,
         decay_bounds,
-        parameter_markovian_hjm_type.PICEWISE_CONSTANT,
-        True,
-        200,
-        True,
-        False,
-        1.0,
+        getattr(parameter_markovian_hjm_type, parameter_type),
+        *settings,
     )
     
     return diffusion_ids, correlation, calibration_settings_aad
 
-def process_test_one(calibrator, parameter, valuation_date, convention, discount_curve):
-    """Process test case 1: Calculate CMS spread pricing."""
+# Per-process state of the CMS pricing pool, set by _init_pricing_process
+_pricing_state = {}
+
+def _init_pricing_process(data_root, parameter_path):
+    """Load the market data and calibrated parameters once per pool process."""
+    # Keep library output off the parent's event stream
+    sys.stdout = sys.stderr
+    snapshot, _, _ = load_market_data(data_root)
+    discount_curve = snapshot["discount_curve"]
+    valuation_date = discount_curve.valuation_date()
+    parameter = parameterMarkovianHjm.read_from_json(parameter_path)
+    _pricing_state.update(
+        calibrator=calibrationIrHjm(valuation_date, snapshot["target_config"]),
+        parameter=parameter,
+        discount_curve=discount_curve,
+        valuation_date=valuation_date,
+        expiry=parameter.volatilities_dates(),
+    )
+
+def _price_expiry(index):
+    state = _pricing_state
+    return index, state["calibrator"].cms_spread_pricing_experimental(
+        state["valuation_date"], state["expiry"][index], state["parameter"], state["discount_curve"]
+    )
+
+def process_test_one(calibrator, parameter, valuation_date, convention, discount_curve, events,
+                     expiry_indices=None, workers=1, pool_setup=None, checkpoint=None, resume=False):
+    """
+    Process test case 1: Calculate CMS spread pricing.
+
+    expiry_indices selects a subset of parameter.volatilities_dates() (all by
+    default). With workers > 1 and pool_setup = (data_root, parameter_path),
+    the expiries are priced in a process pool whose processes reload the
+    market data and the stored parameters. Priced expiries are saved to
+    checkpoint; with resume, those already saved are not priced again.
+    """
     expiry = parameter.volatilities_dates()
     expiry_fraction = helper.convert_dates_to_fraction(
         valuation_date,
@@ -102,18 +162,57 @@ def process_test_one(calibrator, parameter, valuation_date, convention, discount
         convention,
     )
     
-    calls = [
-        calibrator.cms_spread_pricing_experimental(
-            valuation_date, exp_date, parameter, discount_curve
-        )
-        for exp_date in expiry
-    ]
+    if expiry_indices is None:
+        expiry_indices = list(range(len(expiry)))
+    invalid = [i for i in expiry_indices if not 0 <= i < len(expiry)]
+    if invalid:
+        raise ValueError(f"Expiry indices out of range 0-{len(expiry) - 1}: {invalid}")
+    expiry_indices = sorted(set(expiry_indices))
+
+    # Checkpointed calls of every expiry priced so far, keyed by index
+    saved = {}
+    if checkpoint is not None and resume:
+        saved = {int(i): call for i, call in (checkpoint.load() or {}).get("calls", {}).items()}
+
+    calls = {}
+    def record(i, call):
+        calls[i] = call
+        saved[i] = call
+        if checkpoint is not None:
+            checkpoint.save({"calls": saved})
+        events.partial(index=i, expiry_fraction=float(expiry_fraction[i]), call=call)
+        events.progress(len(calls) / len(expiry_indices), f"priced expiry {len(calls)} of {len(expiry_indices)}")
+
+    with events.stage("cms_pricing"):
+        for i in expiry_indices:
+            if i in saved:
+                record(i, saved[i])
+        remaining = [i for i in expiry_indices if i not in calls]
+        workers = min(workers, len(remaining)) or 1
+        if workers > 1 and pool_setup is not None:
+            # Pricing processes are terminated with the script (timeouts and
+            # stream disconnects send SIGTERM to this process only)
+            with terminating_pool(
+                workers, initializer=_init_pricing_process, initargs=pool_setup
+            ) as pool:
+                for future in as_completed([pool.submit(_price_expiry, i) for i in remaining]):
+                    record(*future.result())
+        else:
+            for i in remaining:
+                record(i, calibrator.cms_spread_pricing_experimental(
+                    valuation_date, expiry[i], parameter, discount_curve
+                ))
+        if checkpoint is not None:
+            checkpoint.save({"calls": saved}, force=True)
     
     response = {
         "status": "success",
         "data": {
-            "expiry_fraction": expiry_fraction.tolist(),
-            "calls": calls
+            "expiry_fraction": [float(expiry_fraction[i]) for i in expiry_indices],
+            "calls": [calls[i] for i in expiry_indices],
+            "expiry_indices": expiry_indices,
+            "workers": workers if workers > 1 and pool_setup is not None else 1,
+            "resumed_expiries": len(expiry_indices) - len(remaining),
         },
         "error": None
     }
@@ -121,9 +220,33 @@ def process_test_one(calibrator, parameter, valuation_date, convention, discount
     return response
 
 def process_test_two(parameter, valuation_date, target_config, data_root, 
-                    diffusion_ids, correlation_mgr, convention, discount_id):
+                    diffusion_ids, correlation_mgr, convention, discount_id, events):
     """Process test case 2: Run simulation with market container."""
-    print("PROGRESS: Starting simulation setup")
+    with events.stage("simulation_setup"):
+        mkt_data_obj, market, sim, simulation_dates = setup_simulation(
+            parameter, valuation_date, target_config, data_root,
+            diffusion_ids, correlation_mgr, discount_id
+        )
+
+    with events.stage("simulation"):
+        sim.run_simulation(diffusion_ids, market, simulation_dates)
+
+    with events.stage("results"):
+        # Per-expiry model and market vols, before they are stacked by tenor
+        for i, key in enumerate(sim.results.model_swaption_implied):
+            events.partial(
+                index=i,
+                key=key if isinstance(key, (int, float, str)) else str(key),
+                model=(np.asarray(sim.results.model_swaption_implied[key]) * 10000).tolist(),
+                market=(np.asarray(sim.results.market_swaption_implied[key]) * 10000).tolist(),
+            )
+        response = simulation_response(sim, parameter, valuation_date, convention)
+
+    return response
+
+def setup_simulation(parameter, valuation_date, target_config, data_root,
+                     diffusion_ids, correlation_mgr, discount_id):
+    """Market container and simulation object for test case 2."""
     mkt_data_obj = market_data.market_data(data_root)
     
     # Setup market container
@@ -162,10 +285,10 @@ def process_test_two(parameter, valuation_date, target_config, data_root,
         maturity,
         simulation_dates,
     )
-    print("PROGRESS: Running simulation")
-    sim.run_simulation(diffusion_ids, market, simulation_dates)
-    
-    # Process results
+    return mkt_data_obj, market, sim, simulation_dates
+
+def simulation_response(sim, parameter, valuation_date, convention):
+    """Model/market swaption vols and their error in bps."""
     x = list(sim.results.model_swaption_implied.keys())
     model_vols = np.array(list(sim.results.model_swaption_implied.values())).T * 10000
     market_vols = np.array(list(sim.results.market_swaption_implied.values())).T * 10000
@@ -194,7 +317,6 @@ def process_test_two(parameter, valuation_date, target_config, data_root,
         expiry,
         convention,
     )
-    print("PROGRESS: Processing results")
     response = {
         "status": "success",
         "data": {
@@ -207,39 +329,90 @@ def process_test_two(parameter, valuation_date, target_config, data_root,
 
     return response
 
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='HJM calibration and simulation')
+    parser.add_argument('test', type=int, nargs='?', default=1,
+                      help='1: CMS spread pricing, 2: swaption simulation')
+    parser.add_argument('--recalibrate', action='store_true',
+                      help='Calibrate even if stored parameters exist for the valuation date')
+    parser.add_argument('--expiries', type=lambda s: [int(i) for i in s.split(',') if i],
+                      help='Test 1: comma-separated indices of the expiries to price (default: all)')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                      help='Test 1: pricing processes (1 prices in this process)')
+    parser.add_argument('--resume', action='store_true',
+                      help='Test 1: reuse the expiries priced by an identical run that did not finish')
+    return parser.parse_args()
+
 def main():
+    events = EventStream.protocol_stdout()
     try:
-        test = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+        args = parse_arguments()
+        test = args.test
+        if test not in STAGE_WEIGHTS:
+            raise ValueError(f"Invalid test value: {test}. Must be 1 or 2.")
+        events = EventStream(events.stream, STAGE_WEIGHTS[test])
         data_root = xsigmaGetDataRoot()
         
-        # Load market data with additional IDs
-        target_config, discount_curve, ir_volatility_surface, correlation_mgr, convention, discount_id, diffusion_id = load_market_data(data_root)
-        valuation_date = discount_curve.valuation_date()
-        
-        # Setup calibration with diffusion_id
-        diffusion_ids, correlation, calibration_settings_aad = setup_calibration(diffusion_id, correlation_mgr)
+        with events.stage("market_data"):
+            # Load market data with additional IDs
+            snapshot, discount_id, diffusion_id = load_market_data(data_root)
+            target_config = snapshot["target_config"]
+            discount_curve = snapshot["discount_curve"]
+            ir_volatility_surface = snapshot["ir_volatility_surface"]
+            correlation_mgr = snapshot["correlation_mgr"]
+            convention = snapshot["convention"]
+            valuation_date = discount_curve.valuation_date()
         
-        # Create calibrator with target_config
-        calibrator = calibrationIrHjm(valuation_date, target_config)
-        
-        # Calibrate with proper IDs
-        parameter = calibrator.calibrate(
-            parameterMarkovianHjmId(diffusion_id),
-            calibration_settings_aad,
-            discount_curve,
-            ir_volatility_surface,
-            correlation_mgr,
-        )
+        with events.stage("calibration"):
+            # Setup calibration with diffusion_id
+            diffusion_ids, correlation, calibration_settings_aad = setup_calibration(diffusion_id, correlation_mgr)
+            
+            # Create calibrator with target_config
+            calibrator = calibrationIrHjm(valuation_date, target_config)
+            
+            # Calibrate with proper IDs; the result only depends on the
+            # valuation date, data files and settings, so stored parameters
+            # are reused unless a recalibration is requested
+            market_hash = market_data_hash(snapshot)
+            parameter, calibration_info = hjm_parameter_store.get_or_calibrate(
+                valuation_date,
+                market_hash,
+                lambda: calibrator.calibrate(
+                    parameterMarkovianHjmId(diffusion_id),
+                    calibration_settings_aad,
+                    discount_curve,
+                    ir_volatility_surface,
+                    correlation_mgr,
+                ),
+                parameterMarkovianHjm,
+                recalibrate=args.recalibrate,
+            )
         
         if test == 1:
-            data = process_test_one(calibrator, parameter, valuation_date, convention, discount_curve)
-        elif test == 2:
-            data = process_test_two(parameter, valuation_date, target_config, data_root,
-                                  diffusion_ids, correlation_mgr, convention, discount_id)
+            # Pool processes reload the parameters from the store
+            parameter_path = hjm_parameter_store.path_for(valuation_date, market_hash)
+            stored = os.path.exists(parameter_path)
+            # Only checkpoint prices of parameters that can be identified
+            checkpoint = SimulationCheckpoint("hjm_cms", {
+                "market_hash": market_hash,
+                "parameters": digest(parameter_path),
+            }) if stored else None
+            data = process_test_one(
+                calibrator, parameter, valuation_date, convention, discount_curve, events,
+                expiry_indices=args.expiries,
+                workers=args.workers,
+                pool_setup=(data_root, parameter_path) if stored else None,
+                checkpoint=checkpoint,
+                resume=args.resume,
+            )
         else:
-            raise ValueError(f"Invalid test value: {test}. Must be 1 or 2.")
+            data = process_test_two(parameter, valuation_date, target_config, data_root,
+                                  diffusion_ids, correlation_mgr, convention, discount_id, events)
+        data["data"]["calibration"] = calibration_info
             
-        print(json.dumps(data))
+        events.result(data)
+        if test == 1 and checkpoint is not None:
+            checkpoint.clear()
         
     except Exception as e:
         error_response = {
@@ -247,7 +420,7 @@ def main():
             "data": None,
             "error": str(e)
         }
-        print(json.dumps(error_response))
+        events.result(error_response)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
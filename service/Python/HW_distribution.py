@@ -61,6 +61,16 @@ def calculate_hw_distribution(n, t, size_roots, x_0, x_n):
             "error": str(e)
         }
 
+def validate_inputs(n, t, size_roots, x_0, x_n):
+    if n <= 0:
+        raise ValueError("n must be positive")
+    if t <= 0:
+        raise ValueError("t must be positive")
+    if size_roots <= 0:
+        raise ValueError("size_roots must be positive")
+    if x_0 >= x_n:
+        raise ValueError("x_0 must be less than x_n")
+
 def main():
     try:
         # Get command line arguments
@@ -74,14 +84,7 @@ def main():
         x_n = float(sys.argv[5])
 
         # Validate inputs
-        if n <= 0:
-            raise ValueError("n must be positive")
-        if t <= 0:
-            raise ValueError("t must be positive")
-        if size_roots <= 0:
-            raise ValueError("size_roots must be positive")
-        if x_0 >= x_n:
-            raise ValueError("x_0 must be less than x_n")
+        validate_inputs(n, t, size_roots, x_0, x_n)
 
         # Calculate distribution
         result = calculate_hw_distribution(n, t, size_roots, x_0, x_n)
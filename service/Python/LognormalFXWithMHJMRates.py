@@ -1,6 +1,8 @@
+import sys
 import time
 import json
 import argparse
+from contextlib import nullcontext
 import numpy as np
 from itertools import chain
 from xsigmamodules.common import helper
@@ -48,6 +50,65 @@ from xsigmamodules.Util import dayCountConvention, blackScholes
 from xsigmamodules.Random import random_type
 from xsigmamodules.util.numpy_support import xsigmaToNumpy, numpyToXsigma
 from xsigmamodules.Vectorization import vector, matrix, tensor
+from common.marketData import load_snapshot
+from common.simulationCheckpoint import SimulationCheckpoint
+from common.processPools import default_workers, terminating_pool
+from common.pathStatistics import (
+    BlockReplicates, PathStatistics, StrikeLadder, block_seed, block_sizes,
+)
+
+# Parameters and market data read at start-up, relative to the data root
+MARKET_DATA_FILES = {
+    "params_dom": (parameterMarkovianHjm, "Data/calibratedParameters/calibrated_mhjm_parameter_LIBOR.3M.USD_USD_3f.json"),
+    "params_for": (parameterMarkovianHjm, "Data/calibratedParameters/calibrated_mhjm_parameter_LIBOR.3M.USD_EUR_2f.json"),
+    "discount_curve": (discountCurvePiecewiseConstant, "Data/marketData/discount_curve_piecewise_constant.json"),
+    "correlation_mgr": (correlationManager, "Data/marketData/correlation_manager.json"),
+    "convention": (dayCountConvention, "Data/staticData/day_count_convention_360.json"),
+}
+
+RANDOM_SEED = 542897
+# Without --block-size, runs of at least 2 * MIN_AUTO_BLOCK_SIZE paths are
+# split into blocks of at most MAX_AUTO_BLOCK_SIZE paths, halved (down to
+# MIN_AUTO_BLOCK_SIZE) until there are AUTO_BLOCKS of them; smaller runs are
+# a single block. Memory use scales with the block size, not --num-paths
+MAX_AUTO_BLOCK_SIZE = 131072
+MIN_AUTO_BLOCK_SIZE = 16384
+AUTO_BLOCKS = 8
+
+# Per-path quantities accumulated for every simulation date
+QUANTITIES = (
+    "money_market_fx",  # mm_dom * spot / mm_for
+    "discounted_fx",  # mm_dom * df_for(t, maturity) * spot
+    "domestic_fx",  # mm_dom * spot
+    "domestic",  # mm_dom
+    "straddle",  # mm_dom * (spot - fwd)
+    "call",  # mm_dom * max(spot - fwd, 0)
+    "put",  # mm_dom * max(fwd - spot, 0)
+)
+# Controls with known expectations: the FX forward martingale (discounted_fx,
+# expectation df_for(maturity)) and the domestic bond (domestic, df_dom(t))
+CONTROLS = ("discounted_fx", "domestic")
+# Pairs whose covariance enters the control variate regression, and the
+# per-path errors of a single block: the strike ratio and the straddle
+# price call + put behind the model volatility
+PRODUCTS = (
+    ("domestic_fx", "domestic"),
+    ("call", "put"),
+    ("discounted_fx", "domestic"),
+    ("call", "discounted_fx"),
+    ("call", "domestic"),
+    ("put", "discounted_fx"),
+    ("put", "domestic"),
+)
+# Estimators whose standard errors are reported and bound by --target-error
+ESTIMATORS = (
+    "strikes",
+    "model_volatility",
+    "results_money_market",
+    "results_discount_factors",
+)
+# Blocks needed before the replicate errors can stop the simulation
+MIN_REPLICATES = 4
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='LognormalFXWithMHJMRates Calculator')
@@ -55,202 +116,579 @@ def parse_arguments():
                       help='Number of simulation paths')
     parser.add_argument('--volatility', type=float, default=0.3,
                       help='Initial volatility parameter')
+    parser.add_argument('--volatilities', type=lambda s: [float(v) for v in s.split(',') if v],
+                      help='Comma-separated FX volatilities to sweep (overrides --volatility)')
+    parser.add_argument('--block-size', type=int, default=None,
+                      help='Paths simulated per block (0 for a single block; '
+                           'default: chosen from --num-paths, see default_block_size)')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                      help='Simulation processes (1 simulates in this process); '
+                           'at most one per block')
+    parser.add_argument('--target-error', type=float, default=None,
+                      help='Stop adding blocks once every standard error is below this '
+                           '(--num-paths is then the maximum)')
+    parser.add_argument('--control-variates', action='store_true',
+                      help='Adjust the option prices with the FX forward and domestic bond controls')
+    parser.add_argument('--resume', action='store_true',
+                      help='Continue from the checkpoint of an identical run that did not finish')
+    parser.add_argument('--smile-moneyness', type=lambda s: [float(m) for m in s.split(',') if m],
+                      help='Comma-separated strikes relative to the forward for a model smile per date')
     return parser.parse_args()
 
+def default_block_size(num_paths):
+    """Block size used without --block-size; it only depends on num_paths."""
+    if num_paths < 2 * MIN_AUTO_BLOCK_SIZE:
+        return 0
+    size = MAX_AUTO_BLOCK_SIZE
+    while size > MIN_AUTO_BLOCK_SIZE and num_paths < AUTO_BLOCKS * size:
+        size //= 2
+    return size
+
+def build_base(snapshot, smile_moneyness=None):
+    """
+    Everything that does not depend on the FX volatility: ids, market
+    container contents, the FX calibrator, dates and the strike ladder of the
+    smile (if any). calibrate_scenario completes it for one volatility.
+    """
+    # Setup IDs
+    dom_ir_id = discountId("LIBOR.3M.USD", "USD")
+    diffusion_dom_id = simulatedMarketDataIrId(dom_ir_id)
+    for_ir_id = discountId("LIBOR.3M.USD", "EUR")
+    diffusion_for_id = simulatedMarketDataIrId(for_ir_id)
+    fx_forward_id = fxForwardId(dom_ir_id, for_ir_id)
+    diffusion_fx_id = simulatedMarketDataFxId(fx_forward_id)
+    simulated_ids = [diffusion_dom_id, diffusion_for_id, diffusion_fx_id]
+
+    # Setup instructions
+    anyids = [anyId(dynamicInstructionIrId(diffusion_dom_id))]
+    anyobject = [anyObject(dynamicInstructionIrMarkovianHjm())]
+    anyids.append(anyId(dynamicInstructionIrId(diffusion_for_id)))
+    anyobject.append(anyObject(dynamicInstructionIrMarkovianHjm()))
+    anyids.append(anyId(dynamicInstructionFxId(diffusion_fx_id)))
+    anyobject.append(anyObject(dynamicInstructionFxLognormal()))
+
+    # Load parameters
+    params_dom = snapshot["params_dom"]
+    anyids.append(anyId(parameterMarkovianHjmId(diffusion_dom_id)))
+    anyobject.append(anyObject(params_dom))
+
+    params_for = snapshot["params_for"]
+    anyids.append(anyId(parameterMarkovianHjmId(diffusion_for_id)))
+    anyobject.append(anyObject(params_for))
+
+    # Load market data
+    discount_curve = snapshot["discount_curve"]
+    anyids.append(anyId(dom_ir_id))
+    anyobject.append(anyObject(discount_curve))
+    anyids.append(anyId(for_ir_id))
+    anyobject.append(anyObject(discount_curve))
+
+    # Setup FX forward
+    valuation_date = discount_curve.valuation_date()
+    fx_forward = fxForward(valuation_date, 1, discount_curve, discount_curve)
+    anyids.append(anyId(fx_forward_id))
+    anyobject.append(anyObject(fx_forward))
+
+    # Setup correlation
+    correlation_mgr = snapshot["correlation_mgr"]
+    anyids.append(anyId(correlationManagerId()))
+    anyobject.append(anyObject(correlation_mgr))
+
+    correlation = correlation_mgr.pair_correlation_matrix(simulated_ids, simulated_ids)
+    valuation_date = correlation_mgr.valuation_date()
+    calibrator = lognormalFxWithMhjmIr(valuation_date, correlation, params_dom, params_for)
+
+    # Setup convention and dates
+    convention = snapshot["convention"]
+    calibration_dates = helper.simulation_dates(valuation_date, "3M", 120)
+    expiry_fraction = helper.convert_dates_to_fraction(
+        valuation_date, calibration_dates, convention
+    )
+
+    # Setup measure; the FX parameters are added per scenario and the random
+    # config per block
+    anyids.append(anyId(measureId()))
+    anyobject.append(anyObject(measure(dom_ir_id)))
+
+    maturity = max(calibration_dates)
+    dates = calibration_dates[1:]
+    return {
+        "ids": (diffusion_dom_id, diffusion_for_id, diffusion_fx_id),
+        "simulated_ids": simulated_ids,
+        "anyids": anyids,
+        "anyobject": anyobject,
+        "discount_curve": discount_curve,
+        "fx_forward": fx_forward,
+        "valuation_date": valuation_date,
+        "convention": convention,
+        "calibration_dates": calibration_dates,
+        "expiry_fraction": expiry_fraction,
+        "calibrator": calibrator,
+        "maturity": maturity,
+        "df_for_maturity": discount_curve.df(valuation_date, maturity),
+        # Per simulation date (after the valuation date)
+        "forwards": np.array([fx_forward.forward(d) for d in dates]),
+        "df_domestic": np.array([discount_curve.df(valuation_date, d) for d in dates]),
+        "expiries": np.array([convention.fraction(valuation_date, d) for d in dates]),
+        "smile_moneyness": smile_moneyness,
+    }
+
+def calibrate_scenario(base, volatility):
+    """Setup for one FX volatility: the base plus its calibrated parameterLognormal."""
+    _, _, diffusion_fx_id = base["ids"]
+    calibration_dates = base["calibration_dates"]
+    expiry_fraction = base["expiry_fraction"]
+
+    # Calculate market variance
+    market_variance = []
+    for i in range(0, len(calibration_dates)):
+        market_variance.append(volatility * volatility * expiry_fraction[i])
+
+    # Calibrate FX
+    params_fx = base["calibrator"].calibrate(calibration_dates, market_variance, base["convention"])
+
+    return dict(
+        base,
+        volatility=volatility,
+        market_variance=market_variance,
+        anyids=base["anyids"] + [anyId(parameterLognormalId(diffusion_fx_id))],
+        anyobject=base["anyobject"] + [anyObject(params_fx)],
+    )
+
+def accumulate_date(statistics, date_index, fwd, mm_dom, mm_for, spot_fx_fwd, log_discount_factor, rows):
+    """
+    Fill rows, a preallocated (len(QUANTITIES), paths) scratch array, with the
+    per-path quantities of one date and add them to statistics. All
+    arithmetic is in place, so no temporaries are allocated per date.
+    """
+    money_market_fx, discounted_fx, domestic_fx, domestic, straddle, call, put = rows
+    np.multiply(mm_dom, spot_fx_fwd, out=domestic_fx)
+    np.divide(domestic_fx, mm_for, out=money_market_fx)
+    np.exp(log_discount_factor, out=discounted_fx)
+    np.multiply(discounted_fx, domestic_fx, out=discounted_fx)
+    np.copyto(domestic, mm_dom)
+    np.multiply(mm_dom, fwd, out=straddle)
+    np.subtract(domestic_fx, straddle, out=straddle)
+    np.maximum(straddle, 0.0, out=call)
+    # max(fwd - spot, 0) = max(spot - fwd, 0) - (spot - fwd), exactly
+    np.subtract(call, straddle, out=put)
+    statistics.add_rows(date_index, rows)
+
+def simulate_block(setup, num_paths, seed):
+    """Simulate num_paths paths and return their per-date PathStatistics."""
+    diffusion_dom_id, diffusion_for_id, diffusion_fx_id = setup["ids"]
+    calibration_dates = setup["calibration_dates"]
+    maturity = setup["maturity"]
+
+    # Setup simulation
+    config = randomConfig(random_type.SOBOL_BROWNIAN_BRIDGE, seed, num_paths)
+    market = anyContainer(
+        setup["anyids"] + [anyId(randomConfigId())],
+        setup["anyobject"] + [anyObject(config)],
+    )
+    simulation_mgr = simulationManager(setup["simulated_ids"], market, calibration_dates)
+
+    # Setup curves
+    diffusion_curve_domestic = simulation_mgr.discount_curve(diffusion_dom_id)
+    diffusion_curve_foreign = simulation_mgr.discount_curve(diffusion_for_id)
+    diffusion_fx = simulation_mgr.fx_forward(diffusion_fx_id)
+
+    # Initialize arrays
+    mm_dom = np.zeros(num_paths)
+    mm_for = np.zeros(num_paths)
+    spot_fx_fwd = np.zeros(num_paths)
+    log_discount_factor = np.zeros(num_paths)
+
+    mm_dom_ = numpyToXsigma(mm_dom)
+    mm_for_ = numpyToXsigma(mm_for)
+    spot_fx_fwd_ = numpyToXsigma(spot_fx_fwd)
+    log_discount_factor_ = numpyToXsigma(log_discount_factor)
+
+    rows = np.empty((len(QUANTITIES), num_paths))
+    ladder = None
+    if setup["smile_moneyness"]:
+        ladder = StrikeLadder(len(calibration_dates) - 1, setup["smile_moneyness"])
+    statistics = PathStatistics(len(calibration_dates) - 1, QUANTITIES, PRODUCTS, ladder)
+    simulation_mgr.states_initialize()
+
+    # Run simulation
+    for t in range(1, len(calibration_dates)):
+        conditional_date = calibration_dates[t]
+        simulation_mgr.propagate(t)
+
+        # Calculate discounting
+        diffusion_curve_domestic.discounting(mm_dom_, conditional_date)
+        diffusion_curve_foreign.discounting(mm_for_, conditional_date)
+        diffusion_curve_foreign.log_df(log_discount_factor_, conditional_date, maturity)
+        diffusion_fx.forward(spot_fx_fwd_, conditional_date)
+
+        # The xsigma vectors write straight into the numpy buffers
+        accumulate_date(
+            statistics, t - 1, setup["forwards"][t - 1],
+            mm_dom, mm_for, spot_fx_fwd, log_discount_factor, rows,
+        )
+        if ladder is not None:
+            # rows still hold this date's quantities; straddle is free scratch
+            ladder.add(
+                t - 1, setup["forwards"][t - 1], spot_fx_fwd, mm_dom,
+                rows[QUANTITIES.index("domestic_fx")], rows[QUANTITIES.index("straddle")],
+            )
+
+    statistics.add_paths(num_paths)
+    return statistics
+
+# Per-process state of the simulation pool, set by _init_simulation_process
+_simulation_state = {}
+
+def _init_simulation_process(data_root, smile_moneyness):
+    """Build the volatility-independent setup once per pool process."""
+    # Keep library output off the parent's stdout
+    sys.stdout = sys.stderr
+    snapshot = load_snapshot(MARKET_DATA_FILES, data_root)
+    _simulation_state["base"] = build_base(snapshot, smile_moneyness)
+    _simulation_state["scenarios"] = {}
+
+def _simulate_block(volatility, index, num_paths, seed):
+    scenarios = _simulation_state["scenarios"]
+    if volatility not in scenarios:
+        scenarios[volatility] = calibrate_scenario(_simulation_state["base"], volatility)
+    return index, simulate_block(scenarios[volatility], num_paths, seed)
+
+def simulation_pool(workers, data_root, smile_moneyness):
+    """
+    Process pool for simulate, shared by all scenarios of a run (a context
+    manager). Its processes are terminated if the script gets SIGTERM.
+    """
+    return terminating_pool(
+        workers, initializer=_init_simulation_process, initargs=(data_root, smile_moneyness),
+    )
+
+def simulate(setup, num_paths, block_size, seed=RANDOM_SEED, pool=None, workers=1,
+             target_error=None, control_variates=False, checkpoint=None, resume=False):
+    """
+    Run the simulation block by block and merge the block statistics.
+
+    The blocks and their seeds only depend on num_paths, block_size and seed.
+    With a pool (simulation_pool) they are simulated in its processes, at most
+    workers blocks ahead of the merge. Either way the statistics are merged in
+    block order. Each block's own estimates are kept as a replicate (see
+    BlockReplicates); from the second block on, the worst standard error of
+    every estimator is added to the convergence trace. With target_error
+    set, blocks stop being added once at least MIN_REPLICATES blocks are in
+    and all errors are below it. The result and the stopping point do not
+    depend on the number of workers.
+
+    The merged statistics, the replicates, the trace and the next block are
+    saved to checkpoint (a SimulationCheckpoint) periodically and when the run
+    ends; with resume, the run continues from the saved state.
+
+    Returns (statistics, replicates, trace).
+    """
+    sizes = block_sizes(num_paths, block_size)
+    statistics, replicates, trace, pending, start = None, BlockReplicates(), [], {}, 0
+    state = checkpoint.load() if checkpoint is not None and resume else None
+    if state is not None:
+        statistics = PathStatistics.from_state(state["statistics"])
+        replicates = BlockReplicates.from_state(state["replicates"])
+        trace, start = state["trace"], state["next_block"]
+        if state["complete"]:
+            return statistics, replicates, trace
+
+    def save(next_block, complete=False):
+        if checkpoint is not None:
+            checkpoint.save({
+                "statistics": statistics.to_state(),
+                "replicates": replicates.to_state(),
+                "trace": trace,
+                "next_block": next_block,
+                "complete": complete,
+            }, force=complete)
+
+    try:
+        for index in range(start, len(sizes)):
+            size = sizes[index]
+            if pool is not None:
+                for ahead in range(index, min(index + workers, len(sizes))):
+                    if ahead not in pending:
+                        pending[ahead] = pool.submit(
+                            _simulate_block, setup["volatility"], ahead, sizes[ahead],
+                            block_seed(seed, ahead),
+                        )
+                _, block = pending.pop(index).result()
+            else:
+                block = simulate_block(setup, size, block_seed(seed, index))
+            # Before merging: the merge accumulates into the first block
+            values = estimates(setup, block, control_variates)
+            if (len(replicates) and block.count == replicates.counts[0] and np.array_equal(
+                    values["results_money_market"], replicates.values["results_money_market"][0])):
+                # Identical paths would make the errors meaningless
+                raise RuntimeError(f"Block {index} repeats block 0: the random generator ignored its seed")
+            replicates.add(block.count, values)
+            statistics = block if statistics is None else statistics.merge(block)
+
+            worst = worst_errors(replicates)
+            trace.append({"paths": statistics.count, "max_standard_error": worst})
+            if (target_error is not None and worst is not None and len(replicates) >= MIN_REPLICATES
+                    and all(error is not None and error <= target_error for error in worst.values())):
+                break
+            save(index + 1)
+        save(len(sizes), complete=True)
+    finally:
+        # Blocks past the stopping point are not needed
+        for future in pending.values():
+            future.cancel()
+    return statistics, replicates, trace
+
+def estimates(setup, statistics, control_variates=False):
+    """
+    Per-date estimates from statistics, keyed by name: the ESTIMATORS, the
+    option prices behind the model volatility, and with control_variates the
+    plain (unadjusted) prices as well, for the variance reduction.
+    """
+    forwards = setup["forwards"]
+    df_dom = setup["df_domestic"]
+    expiries = setup["expiries"]
+    call_prices = statistics.mean("call")
+    put_prices = statistics.mean("put")
+    values = {}
+    if control_variates:
+        values["call_price_plain"] = call_prices
+        values["put_price_plain"] = put_prices
+        values["straddle_price_plain"] = call_prices + put_prices
+        expectations = (setup["df_for_maturity"], df_dom)
+        call_prices = statistics.control_variate("call", CONTROLS, expectations)
+        put_prices = statistics.control_variate("put", CONTROLS, expectations)
+
+    model_vol = np.array([
+        0.5
+        * (
+            blackScholes.implied_volatility(
+                fwd, fwd, expiry, call, df, 1.0
+            )
+            + blackScholes.implied_volatility(
+                fwd, fwd, expiry, put, df, -1.0
+            )
+        )
+        for fwd, expiry, call, put, df in zip(forwards, expiries, call_prices, put_prices, df_dom)
+    ])
+
+    values.update({
+        "strikes": statistics.mean("domestic_fx") / statistics.mean("domestic") - 1.0,
+        "model_volatility": model_vol,
+        "results_money_market": statistics.mean("money_market_fx") - 1.0,
+        "results_discount_factors": statistics.mean("discounted_fx") / setup["df_for_maturity"] - 1.0,
+        "call_price": call_prices,
+        "put_price": put_prices,
+        "straddle_price": call_prices + put_prices,
+    })
+    if statistics.ladder is not None:
+        values["smile_call_prices"] = statistics.ladder.call_prices()
+    return values
+
+def worst_errors(replicates):
+    """Largest standard error of each reported estimator, or None below 2 blocks."""
+    if len(replicates) < 2:
+        return None
+    worst = {}
+    for name in ESTIMATORS:
+        error = replicates.standard_error(name)
+        worst[name] = float(np.nanmax(error)) if np.isfinite(error).any() else None
+    return worst
+
+def _json_floats(values):
+    # NaN and infinity are not valid JSON
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+def path_errors(setup, statistics, values, control_variates=False):
+    """
+    Per-path (iid) standard errors of the estimates in values, and with
+    control_variates the per-path variance reductions of the option prices.
+    Only used for a single block, where there is no spread across blocks;
+    they ignore the correlation of the Sobol paths.
+    """
+    straddle = {"call": 1.0, "put": 1.0}
+    controls = CONTROLS if control_variates else ()
+    # At the money the call and put share the vega, so the vol error is that
+    # of (call + put) / (2 * vega)
+    model_vol = values["model_volatility"]
+    vega = setup["df_domestic"] * setup["forwards"] * np.sqrt(setup["expiries"]) * np.exp(
+        -0.125 * model_vol * model_vol * setup["expiries"]
+    ) / np.sqrt(2.0 * np.pi)
+
+    errors = {
+        "strikes": statistics.ratio_standard_error("domestic_fx", "domestic"),
+        "model_volatility": 0.5 * np.sqrt(statistics.combination_variance(straddle, controls) / statistics.count) / vega,
+        "results_money_market": statistics.standard_error("money_market_fx"),
+        "results_discount_factors": statistics.standard_error("discounted_fx") / setup["df_for_maturity"],
+    }
+    if statistics.ladder is not None:
+        errors["smile_call_prices"] = statistics.ladder.call_standard_errors()
+
+    reductions = None
+    if control_variates:
+        reductions = {
+            name: statistics.combination_variance(target)
+            / np.maximum(statistics.combination_variance(target, CONTROLS), np.finfo(float).tiny)
+            for name, target in (("call", "call"), ("put", "put"), ("straddle", straddle))
+        }
+    return errors, reductions
+
+def summarize(setup, statistics, replicates, control_variates=False):
+    """
+    Response data computed from the merged path statistics. Standard errors
+    and variance reductions come from the block replicates, or with a single
+    block from the paths (path_errors); standard_error_type says which.
+    """
+    values = estimates(setup, statistics, control_variates)
+    market_vol = np.sqrt(np.asarray(setup["market_variance"][1:]) / setup["expiries"])
+    if len(replicates) >= 2:
+        error_type = "across_blocks"
+        errors = {name: replicates.standard_error(name) for name in ESTIMATORS}
+        if statistics.ladder is not None:
+            errors["smile_call_prices"] = replicates.standard_error("smile_call_prices")
+        # Replicate variance of the plain estimate over that of the adjusted one
+        reductions = {
+            name: replicates.variance(f"{name}_price_plain") / replicates.variance(f"{name}_price")
+            for name in ("call", "put", "straddle")
+        } if control_variates else None
+    else:
+        error_type = "across_paths"
+        errors, reductions = path_errors(setup, statistics, values, control_variates)
+
+    data = {
+        "strikes": values["strikes"].tolist(),
+        "model_volatility": values["model_volatility"].tolist(),
+        "market_volatility": market_vol.tolist(),
+        "results_money_market": values["results_money_market"].tolist(),
+        "results_discount_factors": values["results_discount_factors"].tolist(),
+        "standard_errors": {name: _json_floats(errors[name]) for name in ESTIMATORS},
+        "standard_error_type": error_type,
+    }
+    if control_variates:
+        data["variance_reduction"] = {name: _json_floats(factor) for name, factor in reductions.items()}
+    if statistics.ladder is not None:
+        data["smile"] = smile(setup, statistics)
+        data["smile"]["call_standard_errors"] = _json_floats(errors["smile_call_prices"])
+    return data
+
+def smile(setup, statistics):
+    """
+    Model implied volatility per date and ladder strike, each from the
+    out-of-the-money option: the call above the forward, the put (by
+    put-call parity on the same paths) below it.
+    """
+    ladder = statistics.ladder
+    calls = ladder.call_prices()
+    forward_values = statistics.mean("domestic_fx")
+    bond_values = statistics.mean("domestic")
+
+    volatility = []
+    for d, (fwd, expiry, df) in enumerate(zip(setup["forwards"], setup["expiries"], setup["df_domestic"])):
+        strikes = ladder.moneyness * fwd
+        puts = calls[d] - (forward_values[d] - strikes * bond_values[d])
+        volatility.append([
+            blackScholes.implied_volatility(fwd, strike, expiry, call, df, 1.0)
+            if strike >= fwd else
+            blackScholes.implied_volatility(fwd, strike, expiry, put, df, -1.0)
+            for strike, call, put in zip(strikes, calls[d], puts)
+        ])
+
+    return {
+        "moneyness": ladder.moneyness.tolist(),
+        "strikes": np.outer(setup["forwards"], ladder.moneyness).tolist(),
+        "volatility": volatility,
+        "call_prices": calls.tolist(),
+    }
+
+def scenario_checkpoint(snapshot, args, volatility):
+    """Checkpoint of one scenario, keyed by everything its statistics depend on."""
+    return SimulationCheckpoint("fx_mhjm", {
+        "market_data": snapshot.digests(),
+        "volatility": volatility,
+        "num_paths": args.num_paths,
+        "block_size": args.block_size,
+        "seed": RANDOM_SEED,
+        "smile_moneyness": args.smile_moneyness,
+        # The trace and the stopping point depend on these
+        "target_error": args.target_error,
+        "control_variates": args.control_variates,
+    })
+
+def run_scenario(setup, args, pool, workers, checkpoint=None):
+    """Simulate one volatility scenario and build its response data."""
+    start = time.perf_counter()
+    statistics, replicates, trace = simulate(
+        setup, args.num_paths, args.block_size, pool=pool, workers=workers,
+        target_error=args.target_error, control_variates=args.control_variates,
+        checkpoint=checkpoint, resume=args.resume,
+    )
+    data = summarize(setup, statistics, replicates, args.control_variates)
+    data["convergence"] = trace
+    data["simulation"] = {
+        "num_paths": statistics.count,
+        "max_paths": args.num_paths,
+        "block_size": args.block_size,
+        "blocks": len(trace),
+        "workers": workers,
+        "requested_workers": args.workers,
+        "target_error": args.target_error,
+        "control_variates": args.control_variates,
+        "converged": (
+            args.target_error is not None
+            and len(replicates) >= MIN_REPLICATES
+            and all(error is not None and error <= args.target_error
+                    for error in trace[-1]["max_standard_error"].values())
+        ),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    return data
+
 def main():
     try:
         args = parse_arguments()
-        num_paths = args.num_paths
-        volatility = args.volatility
+        if args.block_size is None:
+            args.block_size = default_block_size(args.num_paths)
+        volatilities = args.volatilities or [args.volatility]
 
         XSIGMA_DATA_ROOT = xsigmaGetDataRoot()
-        XSIGMA_TEST_ROOT = xsigmaGetTempDir()
-        
-        # Setup IDs
-        dom_ir_id = discountId("LIBOR.3M.USD", "USD")
-        diffusion_dom_id = simulatedMarketDataIrId(dom_ir_id)
-        for_ir_id = discountId("LIBOR.3M.USD", "EUR")
-        diffusion_for_id = simulatedMarketDataIrId(for_ir_id)
-        fx_forward_id = fxForwardId(dom_ir_id, for_ir_id)
-        diffusion_fx_id = simulatedMarketDataFxId(fx_forward_id)
-        simulated_ids = [diffusion_dom_id, diffusion_for_id, diffusion_fx_id]
-        
-        # Setup instructions
-        anyids = [anyId(dynamicInstructionIrId(diffusion_dom_id))]
-        anyobject = [anyObject(dynamicInstructionIrMarkovianHjm())]
-        anyids.append(anyId(dynamicInstructionIrId(diffusion_for_id)))
-        anyobject.append(anyObject(dynamicInstructionIrMarkovianHjm()))
-        anyids.append(anyId(dynamicInstructionFxId(diffusion_fx_id)))
-        anyobject.append(anyObject(dynamicInstructionFxLognormal()))
-        
-        # Load parameters
-        params_dom = parameterMarkovianHjm.read_from_json(
-            XSIGMA_DATA_ROOT + "/Data/calibratedParameters/calibrated_mhjm_parameter_LIBOR.3M.USD_USD_3f.json"
-        )
-        anyids.append(anyId(parameterMarkovianHjmId(diffusion_dom_id)))
-        anyobject.append(anyObject(params_dom))
-        
-        params_for = parameterMarkovianHjm.read_from_json(
-            XSIGMA_DATA_ROOT + "/Data/calibratedParameters/calibrated_mhjm_parameter_LIBOR.3M.USD_EUR_2f.json"
-        )
-        anyids.append(anyId(parameterMarkovianHjmId(diffusion_for_id)))
-        anyobject.append(anyObject(params_for))
-        
-        # Load market data
-        discount_curve = discountCurvePiecewiseConstant.read_from_json(
-            XSIGMA_DATA_ROOT + "/Data/marketData/discount_curve_piecewise_constant.json"
-        )
-        anyids.append(anyId(dom_ir_id))
-        anyobject.append(anyObject(discount_curve))
-        anyids.append(anyId(for_ir_id))
-        anyobject.append(anyObject(discount_curve))
-        
-        # Setup FX forward
-        valuation_date = discount_curve.valuation_date()
-        fx_forward = fxForward(valuation_date, 1, discount_curve, discount_curve)
-        anyids.append(anyId(fx_forward_id))
-        anyobject.append(anyObject(fx_forward))
-        
-        # Setup correlation
-        correlation_mgr = correlationManager.read_from_json(
-            XSIGMA_DATA_ROOT + "/Data/marketData/correlation_manager.json"
-        )
-        anyids.append(anyId(correlationManagerId()))
-        anyobject.append(anyObject(correlation_mgr))
-        
-        correlation = correlation_mgr.pair_correlation_matrix(simulated_ids, simulated_ids)
-        valuation_date = correlation_mgr.valuation_date()
-        calibrator = lognormalFxWithMhjmIr(valuation_date, correlation, params_dom, params_for)
-        
-        # Setup convention and dates
-        convention = dayCountConvention.read_from_json(
-            XSIGMA_DATA_ROOT + "/Data/staticData/day_count_convention_360.json"
-        )
-        calibration_dates = helper.simulation_dates(valuation_date, "3M", 120)
-        expiry_fraction = helper.convert_dates_to_fraction(
-            valuation_date, calibration_dates, convention
+        snapshot = load_snapshot(MARKET_DATA_FILES, XSIGMA_DATA_ROOT)
+        base = build_base(snapshot, args.smile_moneyness)
+
+        # One pool for the whole sweep, so its processes build the base once;
+        # a process beyond one per block would have nothing to do
+        workers = min(args.workers, len(block_sizes(args.num_paths, args.block_size)))
+        if workers < args.workers:
+            print(f"Simulating {args.num_paths} paths in {workers} process(es) instead of {args.workers}: "
+                  f"only {workers} block(s) of {args.block_size or args.num_paths}", file=sys.stderr)
+        # Finished scenarios keep their checkpoint until the whole run is
+        # written, so a resumed sweep skips them
+        checkpoints = [scenario_checkpoint(snapshot, args, volatility) for volatility in volatilities]
+        if len(block_sizes(args.num_paths, args.block_size)) == 1:
+            print("Single-block run: checkpoints are only saved between blocks, so a timeout cannot be resumed",
+                  file=sys.stderr)
+        pool_context = (
+            simulation_pool(workers, XSIGMA_DATA_ROOT, args.smile_moneyness) if workers > 1 else nullcontext()
         )
-        
-        # Calculate market variance
-        market_variance = []
-        for i in range(0, len(calibration_dates)):
-            market_variance.append(volatility * volatility * expiry_fraction[i])
-            
-        # Calibrate FX
-        params_fx = calibrator.calibrate(calibration_dates, market_variance, convention)
-        anyids.append(anyId(parameterLognormalId(diffusion_fx_id)))
-        anyobject.append(anyObject(params_fx))
-        
-        # Setup measure and config
-        anyids.append(anyId(measureId()))
-        anyobject.append(anyObject(measure(dom_ir_id)))
-        config = randomConfig(random_type.SOBOL_BROWNIAN_BRIDGE, 542897, num_paths)
-        anyids.append(anyId(randomConfigId()))
-        anyobject.append(anyObject(config))
-        
-        # Setup simulation
-        market = anyContainer(anyids, anyobject)
-        simulation_mgr = simulationManager(simulated_ids, market, calibration_dates)
-        maturity = max(calibration_dates)
-        
-        # Setup curves
-        diffusion_curve_domestic = simulation_mgr.discount_curve(diffusion_dom_id)
-        diffusion_curve_foreign = simulation_mgr.discount_curve(diffusion_for_id)
-        diffusion_fx = simulation_mgr.fx_forward(diffusion_fx_id)
-        dis_for_curve = discount_curve
-        dis_dom_curve = discount_curve
-        
-        # Initialize arrays
-        mm_dom = np.zeros(num_paths)
-        mm_for = np.zeros(num_paths)
-        spot_fx_fwd = np.zeros(num_paths)
-        log_discount_factor = np.zeros(num_paths)
-        
-        mm_dom_ = numpyToXsigma(mm_dom)
-        mm_for_ = numpyToXsigma(mm_for)
-        spot_fx_fwd_ = numpyToXsigma(spot_fx_fwd)
-        log_discount_factor_ = numpyToXsigma(log_discount_factor)
-        
-        # Initialize results arrays
-        results_mm_market = []
-        results_df_market = []
-        results_mm = []
-        results_df = []
-        model_vol = []
-        market_vol = []
-        model_stradle_vol = []
-        fwds = []
-        strikes = []
-        
-        df_for_maturity = dis_for_curve.df(valuation_date, maturity)
-        simulation_mgr.states_initialize()
-        
-        # Run simulation
-        for t in range(1, len(calibration_dates)):
-            conditional_date = calibration_dates[t]
-            simulation_mgr.propagate(t)
-            
-            # Calculate discounting
-            diffusion_curve_domestic.discounting(mm_dom_, conditional_date)
-            diffusion_curve_foreign.discounting(mm_for_, conditional_date)
-            diffusion_curve_foreign.log_df(log_discount_factor_, conditional_date, maturity)
-            diffusion_fx.forward(spot_fx_fwd_, conditional_date)
-            
-            # Convert back to numpy
-            mm_dom = xsigmaToNumpy(mm_dom_)
-            mm_for = xsigmaToNumpy(mm_for_)
-            spot_fx_fwd = xsigmaToNumpy(spot_fx_fwd_)
-            log_discount_factor = xsigmaToNumpy(log_discount_factor_)
-            
-            # Calculate market values
-            df_for_market = dis_for_curve.df(valuation_date, conditional_date)
-            df_dom_market = dis_dom_curve.df(valuation_date, conditional_date)
-            results_mm_market.append(0.0)
-            results_mm.append(np.average(mm_dom * spot_fx_fwd / mm_for) - 1.0)
-            results_df_market.append(0.0)
-            results_df.append(
-                np.average(mm_dom * np.exp(log_discount_factor) * spot_fx_fwd) / df_for_maturity
-                - 1
-            )
-            
-            # Calculate forwards
-            fwd = fx_forward.forward(conditional_date)
-            strike = np.average(mm_dom * spot_fx_fwd) / np.average(mm_dom) - 1.0
-            strikes.append(strike)
-            fwds.append(fwd)
-            
-            # Calculate option values
-            model_stradle_vol.append(np.average(mm_dom * (spot_fx_fwd - fwd)))
-            fx_call_price = np.average(mm_dom * np.maximum(spot_fx_fwd - fwd, 0.0))
-            fx_put_price = np.average(mm_dom * np.maximum(fwd - spot_fx_fwd, 0.0))
-            
-            # Calculate volatilities
-            expiry_double = convention.fraction(valuation_date, conditional_date)
-            model_vol.append(
-                0.5
-                * (
-                    blackScholes.implied_volatility(
-                        fwd, fwd, expiry_double, fx_call_price, df_dom_market, 1.0
-                    )
-                    + blackScholes.implied_volatility(
-                        fwd, fwd, expiry_double, fx_put_price, df_dom_market, -1.0
-                    )
-                )
-            )
-            market_vol.append(np.sqrt(market_variance[t] / expiry_double))
-            
+        with pool_context as pool:
+            scenarios = [
+                dict(volatility=volatility, **run_scenario(
+                    calibrate_scenario(base, volatility), args, pool, max(workers, 1), checkpoint
+                ))
+                for volatility, checkpoint in zip(volatilities, checkpoints)
+            ]
+
+        data = scenarios[0] if args.volatilities is None else {"scenarios": scenarios}
+
         output = {
             "status": "success",
-            "data": {
-                "strikes": strikes,
-                "model_volatility": model_vol,
-                "market_volatility": market_vol,
-                "results_money_market": results_mm,
-                "results_discount_factors": results_df
-            },
+            "data": data,
             "error": None
         }
         print(json.dumps(output))
+        sys.stdout.flush()
+        for checkpoint in checkpoints:
+            checkpoint.clear()
         
     except Exception as e:
         print(json.dumps({
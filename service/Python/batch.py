@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Batch evaluation of many parameter sets on one shared strike grid.
+
+Risk jobs send thousands of parameter sets; evaluating them in one call
+avoids a round trip (or a spawn, when run as a script) per set. The result
+is columnar: every output is an n_sets x n_strikes matrix sharing a single
+strike vector, and the inputs come back as one column per parameter.
+
+Kinds:
+    analytical_sigma_volatility  VolatilitySurfaceCalculator (vols, density, probability)
+    volatility                   calculate_vols_and_density, model_type asv or svi (vols, density)
+    zabr                         create_volatility_dynamic, model_type classical, mixture or pde (vols)
+
+A parameter set that fails does not fail the batch: its rows are NaN (null
+in JSON) and its error is reported at the same index of "errors". The
+columns stay numpy arrays so the columnar worker format can write them
+without a tolist() copy.
+"""
+
+import sys
+import json
+import time
+import numpy as np
+import volatility
+import volatility_svi
+from AnalyticalSigmaVolatility import VolatilityParams, VolatilitySurfaceCalculator
+from common.volatilityCompute import (
+    calculate_vols_and_density,
+    density_strike_grid,
+    create_model,
+    compute_density,
+)
+from common.baselineCache import baseline_cache
+from common.columnarFormat import to_json_compatible
+from zabr_analytics import model_setup, initial_curve
+
+MAX_BATCH_SIZE = 10000
+# Defaults and strike grid of the analytical sigma volatility tests 2-4
+ANALYTICAL_SIGMA_DEFAULTS = {
+    "fwd": 1.0,
+    "time": 0.333,
+    "ctrl_p": 0.2,
+    "ctrl_c": 0.2,
+    "atm": 0.1929,
+    "skew": 0.02268,
+    "smile": 0.00317,
+    "put": -0.00213,
+    "call": -0.00006,
+}
+DEFAULT_ASV_STRIKES = (0.3, 2.0, 200)
+
+VOLATILITY_DEFAULTS = {
+    "asv": volatility.INITIAL_VALUES,
+    "svi": volatility_svi.INITIAL_VALUES,
+}
+
+
+def _analytical_sigma_volatility(strikes):
+    def evaluate(values):
+        params = VolatilityParams.from_dict(
+            {**ANALYTICAL_SIGMA_DEFAULTS, **values, "n": len(strikes), "test": 0}
+        )
+        vols, density, probability = VolatilitySurfaceCalculator(params).calculate_smile(strikes)
+        return {"vols": vols, "density": density, "probability": probability}
+
+    return evaluate
+
+
+def _volatility(model_type, strikes):
+    defaults = VOLATILITY_DEFAULTS[model_type]
+
+    def evaluate(values):
+        params = {key: values.get(key, defaults[key]) for key in defaults}
+        _, vols, density = calculate_vols_and_density(params["fwd"], params, model_type, strikes=strikes)
+        return {"vols": vols, "density": density}
+
+    return evaluate
+
+
+def _zabr(model_class, initial_values, strikes):
+    def evaluate(values):
+        current = {key: values.get(key, initial_values[key]) for key in initial_values}
+        return {"vols": compute_density(create_model(model_class, current), strikes)}
+
+    return evaluate
+
+
+def compute(params):
+    """
+    Evaluate params["parameter_sets"] for params["kind"].
+
+    params:
+        kind: analytical_sigma_volatility, volatility or zabr
+        model_type: asv/svi for volatility, classical/mixture/pde for zabr
+        strikes: optional shared strike grid (defaults to the kind's usual grid)
+        parameter_sets: list of parameter dicts; missing keys take the
+            endpoint defaults
+    """
+    kind = params.get("kind")
+    parameter_sets = params.get("parameter_sets") or []
+    if not isinstance(parameter_sets, list) or not parameter_sets:
+        raise ValueError("parameter_sets must be a non-empty list")
+    if not all(isinstance(values, dict) for values in parameter_sets):
+        raise ValueError("Each parameter set must be an object")
+    if len(parameter_sets) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} parameter sets per batch, got {len(parameter_sets)}")
+
+    strikes = params.get("strikes")
+    initial = None
+    if kind == "analytical_sigma_volatility":
+        if strikes is None:
+            strikes = np.linspace(*DEFAULT_ASV_STRIKES)
+        strikes = np.asarray(strikes, dtype=float)
+        evaluate = _analytical_sigma_volatility(strikes)
+        columns = ("vols", "density", "probability")
+    elif kind == "volatility":
+        model_type = params.get("model_type", "asv")
+        if model_type not in VOLATILITY_DEFAULTS:
+            raise ValueError(f"Unknown model_type '{model_type}' for kind 'volatility'. "
+                             f"Must be one of: {', '.join(VOLATILITY_DEFAULTS)}")
+        if strikes is None:
+            # The endpoints' grid for the default forward, shared by every set
+            strikes = density_strike_grid(VOLATILITY_DEFAULTS[model_type]["fwd"])
+        strikes = np.asarray(strikes, dtype=float)
+        evaluate = _volatility(model_type, strikes)
+        columns = ("vols", "density")
+    elif kind == "zabr":
+        model_class, initial_values, x_values = model_setup(params.get("model_type", "classical"))
+        strikes = np.asarray(x_values if strikes is None else strikes, dtype=float)
+        evaluate = _zabr(model_class, initial_values, strikes)
+        # The reference curve is the same for every set, so it is returned once
+        initial = baseline_cache.get_or_compute(
+            model_class.__name__,
+            initial_values,
+            strikes,
+            lambda: initial_curve(model_class, initial_values, strikes)
+        )
+        columns = ("vols",)
+    else:
+        raise ValueError(
+            f"Unknown batch kind '{kind}'. Must be one of: analytical_sigma_volatility, volatility, zabr"
+        )
+
+    start = time.perf_counter()
+    output = {name: np.full((len(parameter_sets), len(strikes)), np.nan) for name in columns}
+    errors = []
+    for i, values in enumerate(parameter_sets):
+        try:
+            rows = evaluate(values)
+            for name in columns:
+                output[name][i] = rows[name]
+            errors.append(None)
+        except Exception as e:
+            errors.append(str(e))
+    elapsed = time.perf_counter() - start
+
+    parameter_names = sorted({name for values in parameter_sets for name in values})
+    result = {
+        "kind": kind,
+        "strikes": strikes,
+        "parameters": {name: [values.get(name) for values in parameter_sets] for name in parameter_names},
+        "columns": output,
+        "errors": errors,
+        "performance": {
+            "sets": len(parameter_sets),
+            "failed": sum(error is not None for error in errors),
+            "evaluation_ms": round(elapsed * 1000, 2),
+            "per_set_ms": round(elapsed * 1000 / len(parameter_sets), 4),
+        },
+    }
+    if initial is not None:
+        result["initial"] = initial
+    return result
+
+
+if __name__ == "__main__":
+    try:
+        params = json.loads(sys.argv[1])
+        print(json.dumps(
+            {"status": "success", "data": compute(params), "error": None},
+            default=to_json_compatible
+        ))
+    except Exception as e:
+        print(json.dumps({"status": "error", "data": None, "error": str(e)}))
+        sys.exit(1)
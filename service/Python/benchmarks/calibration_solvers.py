@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Compare solver backends and tolerances for the ASV calibration.
+
+The corpus is the endpoint's sample smile (common.volatilityCompute
+generate_sample_data) with multiplicative noise and jittered expiries, so
+every smile has the same shape as what the server calibrates. Each
+(solver, tolerance) combination calibrates the whole corpus from the
+endpoint's default initial guess and reports wall time and fit RMSE.
+
+The xsigmamodules solvers do not report iteration counts, so iterations are
+estimated: the smallest max_iterations cap whose RMSE is within 1% of the
+uncapped run on the same smile.
+
+Usage (from service/Python, with the same environment as the server):
+    xsigmapython benchmarks/calibration_solvers.py [--smiles 20] [--json out.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xsigmamodules.Market import volatilityModelExtendedSvi
+from xsigmamodules.Util import volatility_type
+from xsigmamodules.util.numpy_support import numpyToXsigma
+from common.volatilityCompute import generate_sample_data
+from common.solverOptions import SOLVER_DEFAULTS, solver_settings, build_solver_options
+
+SPOT = 2245.0656
+EXPIRY = 1.0
+# Same initial guess as the endpoint defaults (volvol, beta, rho, r, q)
+INITIAL_GUESS = (0.2256, 0.4158, 0.2256, 0.003, 0.0022)
+TOLERANCES = (1e-14, 1e-10, 1e-8, 1e-6)
+ITERATION_CAPS = (5, 10, 20, 50, 100, 200, 500)
+RMSE_MATCH = 0.01
+
+
+def corpus(n_smiles, noise, seed):
+    """(strikes, vols, expiry) smiles around the sample data."""
+    rng = np.random.default_rng(seed)
+    strikes, _, _, mid_values = generate_sample_data()
+    smiles = []
+    for _ in range(n_smiles):
+        vols = mid_values * (1.0 + noise * rng.standard_normal(len(mid_values)))
+        smiles.append((strikes, vols, EXPIRY * rng.uniform(0.8, 1.2)))
+    return smiles
+
+
+def calibrate(solver, settings, strikes, vols, expiry):
+    """Calibrated-model RMSE and wall time for one smile."""
+    start = time.perf_counter()
+    model = volatilityModelExtendedSvi.calibrate(
+        numpyToXsigma(strikes),
+        numpyToXsigma(vols),
+        SPOT,
+        expiry,
+        build_solver_options(solver, settings),
+        1,
+        1,
+        volatilityModelExtendedSvi(SPOT, 0.2, *INITIAL_GUESS, 0.00006),
+    )
+    elapsed = time.perf_counter() - start
+
+    fitted = np.zeros(len(strikes))
+    model.implied_volatility(
+        numpyToXsigma(fitted), numpyToXsigma(strikes), 1.0, expiry, volatility_type.LOG_NORMAL
+    )
+    return float(np.sqrt(np.mean((fitted - vols) ** 2))), elapsed
+
+
+def estimated_iterations(solver, settings, smile, full_rmse):
+    """Smallest iteration cap that reproduces the full run's RMSE."""
+    for cap in ITERATION_CAPS:
+        if cap >= settings["max_iterations"]:
+            break
+        rmse, _ = calibrate(solver, {**settings, "max_iterations": cap}, *smile)
+        if rmse <= full_rmse * (1.0 + RMSE_MATCH):
+            return cap
+    return settings["max_iterations"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASV calibration solver benchmark")
+    parser.add_argument("--smiles", type=int, default=20, help="Number of smiles in the corpus")
+    parser.add_argument("--noise", type=float, default=0.01, help="Relative noise on the sample vols")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVER_DEFAULTS), choices=list(SOLVER_DEFAULTS),
+                        help="Also runs the backends not yet accepted from requests (see VERIFIED_SOLVERS)")
+    parser.add_argument("--tolerances", nargs="+", type=float, default=list(TOLERANCES))
+    parser.add_argument("--probe", type=int, default=5,
+                        help="Smiles used to estimate iteration counts (0 to skip)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    smiles = corpus(args.smiles, args.noise, args.seed)
+    results = []
+
+    print(f"{'solver':<8}{'tolerance':>11}{'mean (ms)':>12}{'max (ms)':>11}"
+          f"{'mean rmse':>12}{'max rmse':>11}{'~iters':>8}{'failed':>8}")
+    for solver in args.solvers:
+        for tolerance in args.tolerances:
+            overrides = {name: tolerance for name in SOLVER_DEFAULTS[solver] if name.endswith("_tolerance")}
+            settings = solver_settings(solver, overrides, allow_unverified=True)
+
+            rmses, times, failures = [], [], 0
+            for smile in smiles:
+                try:
+                    rmse, elapsed = calibrate(solver, settings, *smile)
+                except Exception as e:
+                    print(f"  {solver} at {tolerance:g}: {e}", file=sys.stderr)
+                    failures += 1
+                    continue
+                rmses.append(rmse)
+                times.append(elapsed)
+
+            iterations = [
+                estimated_iterations(solver, settings, smile, rmse)
+                for smile, rmse in list(zip(smiles, rmses))[:args.probe]
+            ]
+            row = {
+                "solver": solver,
+                "tolerance": tolerance,
+                "settings": settings,
+                "mean_ms": 1000 * float(np.mean(times)) if times else None,
+                "max_ms": 1000 * float(np.max(times)) if times else None,
+                "mean_rmse": float(np.mean(rmses)) if rmses else None,
+                "max_rmse": float(np.max(rmses)) if rmses else None,
+                "estimated_iterations": float(np.median(iterations)) if iterations else None,
+                "failures": failures,
+            }
+            results.append(row)
+
+            if not times:
+                print(f"{solver:<8}{tolerance:>11.0e}{'-':>12}{'-':>11}{'-':>12}{'-':>11}{'-':>8}{failures:>8}")
+                continue
+            iters = f"{row['estimated_iterations']:.0f}" if iterations else "-"
+            print(
+                f"{solver:<8}{tolerance:>11.0e}{row['mean_ms']:>12.2f}{row['max_ms']:>11.2f}"
+                f"{row['mean_rmse']:>12.2e}{row['max_rmse']:>11.2e}{iters:>8}{failures:>8}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"smiles": args.smiles, "noise": args.noise, "seed": args.seed, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for the server scripts.
+
+Each script module is imported in a fresh interpreter, once on its own
+(what the server pays today) and once after eagerly importing the plotting
+stack the scripts used to pull in through common.volatilityDensityModel and
+common.sabrHelper. The difference is the cold-start saving per script.
+
+Usage (from service/Python, with the same environment as the server):
+    xsigmapython benchmarks/import_time.py [--repeat 5]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = [
+    "AnalyticalSigmaVolatilityCalibration",
+    "AnalyticalSigmaVolatility",
+    "volatility",
+    "volatility_svi",
+    "zabr_analytics",
+    "zabr_calibration",
+    "compute_worker",
+]
+
+# What common.volatilityDensityModel and common.sabrHelper imported at module scope
+PLOTTING_STACK = ["matplotlib.pyplot", "ipywidgets", "IPython.display"]
+
+PROBE = """
+import sys, time, json, importlib
+start = time.perf_counter()
+for name in {preload!r}:
+    importlib.import_module(name)
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "plotting_loaded": any(m in sys.modules for m in ("matplotlib", "ipywidgets", "IPython")),
+}}))
+"""
+
+
+def time_import(module, preload, repeat):
+    """Median wall time of importing module in a fresh interpreter."""
+    samples = []
+    plotting_loaded = False
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, preload=preload)],
+            cwd=SERVICE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        plotting_loaded = result["plotting_loaded"]
+    return statistics.median(samples), plotting_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    print(f"{'script':<40}{'headless (ms)':>15}{'with UI (ms)':>15}{'saved (ms)':>12}  plotting loaded")
+    for module in SCRIPTS:
+        try:
+            headless, plotting_loaded = time_import(module, [], args.repeat)
+            with_ui, _ = time_import(module, PLOTTING_STACK, args.repeat)
+        except subprocess.CalledProcessError as e:
+            message = (e.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"{module:<40}failed: {message}")
+            continue
+        print(
+            f"{module:<40}{headless * 1000:>15.1f}{with_ui * 1000:>15.1f}"
+            f"{(with_ui - headless) * 1000:>12.1f}  {'yes' if plotting_loaded else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
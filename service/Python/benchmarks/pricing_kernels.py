@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Check and time the vectorized pricing kernels against the scalar xsigma calls.
+
+The smile comes from volatilityModelExtendedSvi.sensitivities with the same
+default parameters as the AnalyticalSigmaVolatility endpoint, and the normal
+vols from the /zabr PDE baseline model, so the inputs match what the server
+feeds the kernels. Exits non-zero if any value differs from the scalar result
+by more than the tolerance.
+
+Usage (from service/Python, with the same environment as the server):
+    xsigmapython benchmarks/pricing_kernels.py [--n 10000] [--tolerance 1e-12]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xsigmamodules.Market import volatilityModelExtendedSvi
+from xsigmamodules.Util import blackScholes, bachelier, density_smoothing_type
+from xsigmamodules.util.numpy_support import numpyToXsigma, xsigmaToNumpy
+from common.vectorizedPricing import (
+    black_scholes_price,
+    black_scholes_density,
+    black_scholes_probability,
+    bachelier_price,
+    bachelier_implied_volatility,
+)
+from common.volatilityCompute import create_model, pde_implied_volatility
+from zabr_analytics import model_setup
+
+FWD = 1.0
+TIME = 0.333
+MODEL = dict(ctrl_p=0.2, ctrl_c=0.2, atm=0.1929, skew=0.02268, smile=0.003, put=0.0384, call=0.01)
+
+
+def smile(strikes):
+    """vols, dvol/dK and d2vol/dK2 from one sensitivities pass."""
+    n = len(strikes)
+    vols = np.zeros(n)
+    sensitivities = [np.zeros(n) for _ in range(10)]
+    volatilityModelExtendedSvi(
+        FWD, MODEL["ctrl_p"], MODEL["ctrl_c"], MODEL["atm"], MODEL["skew"],
+        MODEL["smile"], MODEL["put"], MODEL["call"],
+    ).sensitivities(
+        TIME, numpyToXsigma(strikes), numpyToXsigma(vols),
+        *[numpyToXsigma(s) for s in sensitivities]
+    )
+    return vols, sensitivities[5], sensitivities[9]
+
+
+def scalar_pde_implied_volatility(obj, strikes):
+    """The per-strike loop compute_density used before pde_implied_volatility."""
+    forward, expiry = obj.forward(), obj.expiry()
+    vols = np.zeros_like(strikes)
+    for i, K in enumerate(strikes):
+        is_call = 1.0 if K > forward else -1.0
+        p = obj.price(K, True, density_smoothing_type.LINEAR)
+        p = p - max(is_call * (forward - K), 0.0)
+        if p > 0:
+            vols[i] = bachelier.implied_volatility(forward, K, expiry, p, 1.0, is_call)
+    return vols
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = np.asarray(fn(), dtype=float)
+    return result, time.perf_counter() - start
+
+
+def max_relative_error(vectorized, scalar):
+    return float(np.max(np.abs(vectorized - scalar) / np.maximum(1.0, np.abs(scalar))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized pricing kernel check")
+    parser.add_argument("--n", type=int, default=10000, help="Number of strikes")
+    parser.add_argument("--tolerance", type=float, default=1e-12,
+                        help="Maximum allowed error relative to max(1, |scalar|)")
+    args = parser.parse_args()
+
+    strikes = np.linspace(0.3, 2.0, args.n)
+    vols, dvol, d2vol = smile(strikes)
+
+    model_class, initial_values, _ = model_setup("pde")
+    pde = create_model(model_class, initial_values)
+    pde_strikes = xsigmaToNumpy(pde.strikes())
+    normal_fwd, normal_time = initial_values["forward"], initial_values["expiry"]
+    normal_strikes = np.linspace(normal_fwd - 0.02, normal_fwd + 0.02, args.n)
+    normal_is_call = np.where(normal_strikes > normal_fwd, 1.0, -1.0)
+    normal_prices = bachelier_price(normal_fwd, normal_strikes, normal_time, 0.01, 1.0, normal_is_call)
+
+    cases = {
+        "price": (
+            lambda: [blackScholes.price(FWD, k, TIME, v, 1.0, 1.0) for k, v in zip(strikes, vols)],
+            lambda: black_scholes_price(FWD, strikes, TIME, vols, 1.0, 1.0),
+        ),
+        "density": (
+            lambda: [blackScholes.density(FWD, k, TIME, v, s, s2)
+                     for k, v, s, s2 in zip(strikes, vols, dvol, d2vol)],
+            lambda: black_scholes_density(FWD, strikes, TIME, vols, dvol, d2vol),
+        ),
+        "probability": (
+            lambda: [blackScholes.probability(FWD, k, TIME, v, s)
+                     for k, v, s in zip(strikes, vols, dvol)],
+            lambda: black_scholes_probability(FWD, strikes, TIME, vols, dvol),
+        ),
+        "normal vol": (
+            lambda: [bachelier.implied_volatility(normal_fwd, k, normal_time, p, 1.0, c)
+                     for k, p, c in zip(normal_strikes, normal_prices, normal_is_call)],
+            lambda: bachelier_implied_volatility(
+                normal_fwd, normal_strikes, normal_time, normal_prices, 1.0, normal_is_call),
+        ),
+        # Different integration of the same PDE density, so compare to
+        # discretisation accuracy rather than round-off
+        "pde vols": (
+            lambda: scalar_pde_implied_volatility(pde, pde_strikes),
+            lambda: pde_implied_volatility(pde, pde_strikes),
+        ),
+    }
+    tolerances = {"pde vols": 1e-6}
+
+    failed = False
+    print(f"{'kernel':<15}{'scalar (ms)':>14}{'vectorized (ms)':>18}{'speed-up':>10}{'max error':>12}")
+    for name, (scalar_fn, vectorized_fn) in cases.items():
+        scalar, scalar_time = timed(scalar_fn)
+        vectorized, vectorized_time = timed(vectorized_fn)
+        error = max_relative_error(vectorized, scalar)
+        failed |= error > tolerances.get(name, args.tolerance)
+        print(
+            f"{name:<15}{scalar_time * 1000:>14.2f}{vectorized_time * 1000:>18.2f}"
+            f"{scalar_time / vectorized_time:>10.1f}{error:>12.2e}"
+        )
+
+    if failed:
+        print("FAILED: error above tolerance")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
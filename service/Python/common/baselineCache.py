@@ -0,0 +1,55 @@
+"""
+Cache for the fixed "initial" curves drawn next to the user's current curve.
+
+The /zabr, /volatility and /svi responses always include the curve for the
+hard-coded initial parameters. It only depends on the model type, those
+parameters and the strike grid, so it is computed once per worker and kept on
+disk between cold starts; each request then only evaluates the current model.
+"""
+
+import os
+from common.diskCache import cache_dir, canonical_key, read_json, write_json_atomic
+
+# Bump when a model or kernel change alters the baseline curves
+BASELINE_VERSION = 1
+
+
+class BaselineCache:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key):
+        directory = self.directory or cache_dir("baselines")
+        return os.path.join(directory, f"{key}.json")
+
+    def get_or_compute(self, model_type, params, strikes, compute):
+        """
+        Baseline curve for (model_type, params, strikes); compute() is only
+        called when it is neither in memory nor on disk and must return a
+        JSON-serializable dict.
+        """
+        key = canonical_key(BASELINE_VERSION, model_type, params, strikes)
+        if key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+
+        path = self.path_for(key)
+        value = read_json(path)
+        if value is None:
+            self.misses += 1
+            value = compute()
+            write_json_atomic(path, value)
+        else:
+            self.hits += 1
+
+        self.entries[key] = value
+        return value
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+baseline_cache = BaselineCache()
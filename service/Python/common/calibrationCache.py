@@ -0,0 +1,149 @@
+"""
+Content-addressed cache of calibrated models, shared by every process.
+
+The key is a SHA-256 of the canonical JSON of everything a calibration
+depends on: market inputs, initial guess and solver options. A hit therefore
+does not depend on parameter order or on which worker (or which restart)
+produced the entry. Calibrated models are stored with the xsigmamodules JSON
+serialization (write_to_json / read_from_json) under
+XSIGMA_CACHE_DIR/calibrations; the oldest entries are evicted once the
+directory grows past XSIGMA_CALIBRATION_CACHE_MB. Each process also keeps the
+most recent models in memory. Failed writes are counted in stats() (and so
+in the worker's ping) since they leave the disk tier empty.
+"""
+
+import os
+import sys
+import hashlib
+from collections import OrderedDict
+from common.diskCache import cache_dir, canonical_key, write_model_json
+
+# Bump when a calibration routine changes so stale entries stop matching
+CALIBRATION_CACHE_VERSION = 1
+DEFAULT_MAX_MB = 256
+MEMORY_ENTRIES = 32
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, for keys built from market-data files."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def solver_key(name, settings):
+    """Key fragment for a solver options object, which is opaque to Python."""
+    return {"solver": name, "settings": settings}
+
+
+class CalibrationCache:
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("XSIGMA_CALIBRATION_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.store_failures = 0
+        self.last_store_error = None
+
+    def path_for(self, key):
+        directory = self.directory or cache_dir("calibrations")
+        return os.path.join(directory, f"{key}.json")
+
+    def key(self, kind, inputs):
+        return canonical_key(CALIBRATION_CACHE_VERSION, kind, inputs)
+
+    def get_or_calibrate(self, kind, inputs, calibrate, model_class):
+        """
+        Calibrated model for (kind, inputs), calling calibrate() on a miss.
+
+        inputs must be JSON-serializable (numpy arrays are allowed) and
+        describe everything the calibration depends on. model_class provides
+        read_from_json/write_to_json for the on-disk copy.
+        """
+        key = self.key(kind, inputs)
+
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return self.memory[key]
+
+        path = self.path_for(key)
+        model = self._load(path, model_class)
+        if model is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            model = calibrate()
+            self._store(path, model, model_class)
+
+        self.memory[key] = model
+        if len(self.memory) > MEMORY_ENTRIES:
+            self.memory.popitem(last=False)
+        return model
+
+    def _load(self, path, model_class):
+        if not os.path.exists(path):
+            return None
+        try:
+            model = model_class.read_from_json(path)
+        except Exception as e:
+            print(f"Ignoring unreadable calibration cache entry {path}: {e}", file=sys.stderr)
+            return None
+        # Eviction is by modification time, so a hit keeps the entry fresh
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return model
+
+    def _store(self, path, model, model_class):
+        try:
+            write_model_json(model_class, path, model)
+        except Exception as e:
+            # The model stays in the memory tier; only persistence is lost
+            print(f"Could not persist calibration to {path}: {e}", file=sys.stderr)
+            self.store_failures += 1
+            self.last_store_error = str(e)
+            return
+        self._evict(os.path.dirname(path))
+
+    def _evict(self, directory):
+        entries = []
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "store_failures": self.store_failures,
+            "last_store_error": self.last_store_error,
+        }
+
+
+calibration_cache = CalibrationCache()
@@ -0,0 +1,123 @@
+"""
+Binary columnar encoding of handler results.
+
+JSON float lists cost a decimal string per value on both sides of the pipe,
+which dominates latency for large strike grids and path diagnostics. In the
+binary format every float array is written as raw little-endian float64 and
+only the structure around the arrays is JSON:
+
+    magic     4 bytes   b"XSC1"
+    length    uint32 LE size of the JSON header in bytes
+    header    JSON      {"data": ..., "arrays": [{"offset", "shape"}, ...]}
+    padding   zeros up to the next multiple of 8 bytes
+    buffers   float64 LE, each at an 8-byte aligned offset from the start
+              of the buffer section
+
+In "data", each float array is replaced by {"$array": index}. numpy arrays
+are written without a tolist() copy; plain lists of at least
+MIN_ARRAY_LENGTH numbers, some of them floats, are converted so results
+built with tolist() also benefit. Integer arrays and lists stay in the JSON
+header, so they keep their type. service/columnarFormat.js decodes the
+same layout into Float64Array views.
+"""
+
+import json
+import math
+import struct
+import numbers
+import numpy as np
+
+MAGIC = b"XSC1"
+ALIGNMENT = 8
+# Shorter number lists stay in the JSON header
+MIN_ARRAY_LENGTH = 16
+CONTENT_TYPE = "application/vnd.xsigma.columnar"
+
+
+def _is_number_list(value):
+    return (
+        len(value) >= MIN_ARRAY_LENGTH
+        and all(isinstance(v, numbers.Real) and not isinstance(v, bool) for v in value)
+        and not all(isinstance(v, numbers.Integral) for v in value)
+    )
+
+
+def _padding(size):
+    return -size % ALIGNMENT
+
+
+def encode(data):
+    """Encode a handler result; returns bytes."""
+    arrays = []
+
+    def walk(value):
+        if isinstance(value, np.ndarray) and value.dtype.kind == "f":
+            arrays.append(np.ascontiguousarray(value, dtype="<f8"))
+            return {"$array": len(arrays) - 1}
+        if isinstance(value, dict):
+            return {key: walk(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            if _is_number_list(value):
+                arrays.append(np.asarray(value, dtype="<f8"))
+                return {"$array": len(arrays) - 1}
+            return [walk(item) for item in value]
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, (np.floating, np.integer, np.bool_)):
+            value = value.item()
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+
+    structure = walk(data)
+
+    table, offset = [], 0
+    for array in arrays:
+        table.append({"offset": offset, "shape": list(array.shape)})
+        offset += array.nbytes + _padding(array.nbytes)
+
+    header = json.dumps({"data": structure, "arrays": table}, allow_nan=False).encode("utf-8")
+    parts = [MAGIC, struct.pack("<I", len(header)), header, b"\0" * _padding(8 + len(header))]
+    for array in arrays:
+        parts.append(array.tobytes())
+        parts.append(b"\0" * _padding(array.nbytes))
+    return b"".join(parts)
+
+
+def decode(payload):
+    """Inverse of encode, with arrays as numpy views over payload."""
+    if payload[:4] != MAGIC:
+        raise ValueError("Not a columnar payload")
+    (header_length,) = struct.unpack_from("<I", payload, 4)
+    header = json.loads(payload[8:8 + header_length].decode("utf-8"))
+    start = 8 + header_length + _padding(8 + header_length)
+
+    arrays = [
+        np.frombuffer(
+            payload, dtype="<f8", count=int(np.prod(entry["shape"])), offset=start + entry["offset"]
+        ).reshape(entry["shape"])
+        for entry in header["arrays"]
+    ]
+
+    def walk(value):
+        if isinstance(value, dict):
+            if set(value) == {"$array"}:
+                return arrays[value["$array"]]
+            return {key: walk(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        return value
+
+    return walk(header["data"])
+
+
+def to_json_compatible(value):
+    """json.dumps default hook for handlers that return numpy arrays."""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f" and not np.all(np.isfinite(value)):
+            # NaN is not valid JSON; failed rows become null
+            return np.where(np.isfinite(value), value, None).tolist()
+        return value.tolist()
+    if isinstance(value, (np.floating, np.integer, np.bool_)):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,79 @@
+"""
+Small on-disk cache primitives shared by the result caches.
+
+Entries are JSON files named by a SHA-256 of the canonical JSON of their key,
+written to a temporary file and moved into place with os.replace so several
+compute workers can share one directory without reading half-written files.
+The root directory comes from XSIGMA_CACHE_DIR (set by the Node service from
+CONFIG.PYTHON.CACHE_DIR).
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "xsigma-cache")
+
+
+def cache_dir(name):
+    """Directory for one cache, created on first use."""
+    path = os.path.join(os.environ.get("XSIGMA_CACHE_DIR", DEFAULT_CACHE_DIR), name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _canonical(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (np.floating, np.integer)):
+        return value.item()
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+def canonical_key(*parts):
+    """SHA-256 of the parts as sorted, compact JSON; arrays are hashed by value."""
+    text = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=_canonical)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def read_json(path):
+    """Cached value at path, or None if it is missing or unreadable."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_model_json(model_class, path, model):
+    """
+    Write an xsigmamodules object with model_class.write_to_json, through a
+    temporary file moved into place. Raises if the call fails or leaves no
+    file behind, so a binding that does not write where it is told (e.g. a
+    different argument order) is reported instead of passing silently.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        model_class.write_to_json(tmp_path, model)
+        if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+            raise OSError(f"{model_class.__name__}.write_to_json did not write {tmp_path}")
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_json_atomic(path, value):
+    """Write value as JSON to path; failures are ignored since the cache is optional."""
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
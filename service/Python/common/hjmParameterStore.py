@@ -0,0 +1,81 @@
+"""
+Calibrated HJM parameters per valuation date and market data.
+
+The HJM calibration (AAD, up to 200 iterations) only depends on the market
+data and the calibration settings, so its parameterMarkovianHjm result is
+kept under XSIGMA_CACHE_DIR/hjm_parameters/<valuation date>/<market hash>.json
+in the same JSON format as the calibrated_mhjm_parameter_*.json files. Later
+runs for the same valuation date and market data load it instead of
+calibrating; recalibrate=True forces a fresh calibration that replaces the
+stored parameters. Unlike the calibration cache there is no size-based
+eviction: one small file per valuation date and market-data version.
+"""
+
+import os
+import re
+import sys
+import time
+from common.diskCache import cache_dir, write_model_json
+
+
+def _date_dir(valuation_date):
+    # Dates come from xsigmamodules; keep their string form filesystem-safe
+    return re.sub(r"[^0-9A-Za-z_.-]+", "-", str(valuation_date)).strip("-") or "undated"
+
+
+class HjmParameterStore:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.memory = {}
+
+    def path_for(self, valuation_date, market_hash):
+        root = self.directory or cache_dir("hjm_parameters")
+        directory = os.path.join(root, _date_dir(valuation_date))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{market_hash}.json")
+
+    def load(self, valuation_date, market_hash, parameter_class):
+        """Stored parameters, or None if there are none (or they are unreadable)."""
+        path = self.path_for(valuation_date, market_hash)
+        if path in self.memory:
+            return self.memory[path]
+        if not os.path.exists(path):
+            return None
+        try:
+            parameter = parameter_class.read_from_json(path)
+        except Exception as e:
+            print(f"Ignoring unreadable HJM parameters {path}: {e}", file=sys.stderr)
+            return None
+        self.memory[path] = parameter
+        return parameter
+
+    def store(self, valuation_date, market_hash, parameter, parameter_class):
+        path = self.path_for(valuation_date, market_hash)
+        self.memory[path] = parameter
+        try:
+            write_model_json(parameter_class, path, parameter)
+        except Exception as e:
+            print(f"Could not store HJM parameters to {path}: {e}", file=sys.stderr)
+        return path
+
+    def get_or_calibrate(self, valuation_date, market_hash, calibrate, parameter_class, recalibrate=False):
+        """
+        (parameters, info) for the valuation date and market data, calling
+        calibrate() on a miss or when recalibrate is set.
+        """
+        info = {"valuation_date": str(valuation_date), "market_hash": market_hash}
+        if not recalibrate:
+            parameter = self.load(valuation_date, market_hash, parameter_class)
+            if parameter is not None:
+                info["source"] = "store"
+                return parameter, info
+
+        start = time.perf_counter()
+        parameter = calibrate()
+        info["calibration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        info["source"] = "recalibrated" if recalibrate else "calibrated"
+        self.store(valuation_date, market_hash, parameter, parameter_class)
+        return parameter, info
+
+
+hjm_parameter_store = HjmParameterStore()
@@ -0,0 +1,110 @@
+"""
+Immutable market-data snapshots shared by the HJM and FX scripts.
+
+load_snapshot deserializes a set of xsigmamodules JSON files concurrently on
+a thread pool and caches each parsed object keyed by (path, mtime, size), so
+a long-lived process parses every file once and picks up a new version as
+soon as the file is rewritten. Content digests (for calibration cache keys)
+are cached the same way.
+
+Snapshot objects are shared between callers and must not be mutated.
+"""
+
+import os
+import threading
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from common.calibrationCache import file_digest
+from common.diskCache import canonical_key
+
+MAX_LOADER_THREADS = 8
+
+_lock = threading.Lock()
+_objects = {}
+_digests = {}
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _load(model_class, path):
+    key = (model_class.__name__,) + _file_key(path)
+    with _lock:
+        if key in _objects:
+            return key, _objects[key]
+    value = model_class.read_from_json(path)
+    with _lock:
+        # Drop older versions of the same file
+        for stale in [k for k in _objects if k[:2] == key[:2] and k != key]:
+            del _objects[stale]
+        _objects[key] = value
+    return key, value
+
+
+def digest(path):
+    """SHA-256 of a file's contents, recomputed only when it changes."""
+    key = _file_key(path)
+    with _lock:
+        if key in _digests:
+            return _digests[key]
+    value = file_digest(path)
+    with _lock:
+        for stale in [k for k in _digests if k[0] == key[0] and k != key]:
+            del _digests[stale]
+        _digests[key] = value
+    return value
+
+
+class MarketDataSnapshot:
+    """Read-only mapping of names to deserialized market-data objects."""
+
+    def __init__(self, objects, files):
+        self._objects = MappingProxyType(dict(objects))
+        self.files = MappingProxyType(dict(files))
+
+    def __getitem__(self, name):
+        return self._objects[name]
+
+    def __contains__(self, name):
+        return name in self._objects
+
+    def keys(self):
+        return self._objects.keys()
+
+    def digests(self):
+        """Content digest per name, for cache keys that depend on the data."""
+        return {name: digest(path) for name, path in self.files.items()}
+
+    def key(self):
+        """Key of this snapshot's file versions (path, mtime, size)."""
+        return canonical_key({name: list(_file_key(path)) for name, path in self.files.items()})
+
+
+def load_snapshot(files, data_root=None):
+    """
+    Load files, a dict of name -> (model_class, path), into a snapshot.
+
+    Relative paths are resolved against data_root. Files already parsed at
+    their current version are served from the process cache; the rest are
+    read concurrently.
+    """
+    paths = {
+        name: path if data_root is None or os.path.isabs(path) else os.path.join(data_root, path)
+        for name, (_, path) in files.items()
+    }
+
+    with ThreadPoolExecutor(max_workers=min(MAX_LOADER_THREADS, len(files)) or 1) as pool:
+        futures = {
+            name: pool.submit(_load, model_class, paths[name])
+            for name, (model_class, _) in files.items()
+        }
+        objects = {name: future.result()[1] for name, future in futures.items()}
+
+    return MarketDataSnapshot(objects, paths)
+
+
+def cache_stats():
+    with _lock:
+        return {"objects": len(_objects), "digests": len(_digests)}
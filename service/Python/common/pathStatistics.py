@@ -0,0 +1,336 @@
+"""
+Per-date sufficient statistics for chunked Monte Carlo simulations.
+
+A simulation processes its paths in blocks and only keeps, for each
+simulation date and each tracked quantity, the number of paths, the sum and
+the sum of squares, plus the sums of products of selected quantity pairs
+(for ratio estimators and control variates). Blocks merge by addition, so
+peak memory depends on the block size rather than on the total number of
+paths, and means and per-path covariances of the full run are recovered
+from the merged totals.
+
+The paths of a block are quasi-random (Sobol) points, which are correlated
+by design, so per-path variances do not give valid error bars. Blocks have
+independent seeds instead, and BlockReplicates takes the standard errors
+from the spread of the per-block estimates, each block being one randomized
+replicate. The per-path standard errors below are only a fallback for runs
+of a single block: they treat the paths as independent and usually
+overstate the error of a Sobol estimate.
+"""
+
+import numpy as np
+
+# Seeds of blocks after the first are drawn from this sequence
+SEED_SPAWN_KEY = 0x5eed
+
+
+def block_seed(seed, index):
+    """
+    Seed of block index. Block 0 keeps the original seed so a run with a single
+    block reproduces the unchunked simulation; later blocks get independent
+    seeds derived from it.
+    """
+    if index == 0:
+        return seed
+    state = np.random.SeedSequence(seed, spawn_key=(SEED_SPAWN_KEY, index))
+    # Non-negative 31-bit, a valid seed for every random_type
+    return int(state.generate_state(1)[0] & 0x7FFFFFFF)
+
+
+def block_sizes(num_paths, block_size):
+    """Path counts of the blocks covering num_paths; the last one may be short."""
+    if num_paths <= 0:
+        raise ValueError("num_paths must be positive")
+    if block_size <= 0 or block_size >= num_paths:
+        return [num_paths]
+    full, rest = divmod(num_paths, block_size)
+    return [block_size] * full + ([rest] if rest else [])
+
+
+class StrikeLadder:
+    """
+    Per-date sums and sums of squares of discounted call payoffs
+    w * max(S - K, 0) for a ladder of strikes K = moneyness * forward.
+
+    Instead of one payoff pass per strike, each path is assigned to the strike
+    interval its spot falls in (a binary search over the sorted ladder) and
+    the weighted sums of w, w*S and their squares are binned by interval.
+    Cumulative sums from the top interval then give, for every strike, the
+    sums over the paths above it, from which the payoff moments follow.
+    """
+
+    def __init__(self, num_dates, moneyness):
+        self.moneyness = np.unique(np.asarray(moneyness, dtype=float))
+        if self.moneyness.size == 0 or self.moneyness[0] <= 0.0:
+            raise ValueError("Strike ladder moneyness must be positive")
+        self.count = 0
+        self.sums = np.zeros((num_dates, self.moneyness.size))
+        self.sums_of_squares = np.zeros((num_dates, self.moneyness.size))
+
+    def add(self, date_index, forward, spots, weights, weighted_spots, scratch):
+        """
+        Accumulate one date of a block: spots S, discount factors w and
+        w * S per path. scratch is a path-sized buffer that may be overwritten.
+        """
+        strikes = self.moneyness * forward
+        # bucket b holds the paths above exactly b strikes
+        buckets = np.searchsorted(strikes, spots)
+        size = strikes.size + 1
+
+        def tail(values):
+            # Sum over the paths above each strike
+            binned = np.bincount(buckets, weights=values, minlength=size)
+            return np.cumsum(binned[::-1])[::-1][1:]
+
+        w = tail(weights)
+        ws = tail(weighted_spots)
+        ws2 = tail(np.multiply(weighted_spots, weighted_spots, out=scratch))
+        w2s = tail(np.multiply(weights, weighted_spots, out=scratch))
+        w2 = tail(np.multiply(weights, weights, out=scratch))
+
+        self.sums[date_index] += ws - strikes * w
+        self.sums_of_squares[date_index] += ws2 - 2.0 * strikes * w2s + strikes * strikes * w2
+
+    def add_paths(self, count):
+        self.count += count
+
+    def merge(self, other):
+        if not np.array_equal(other.moneyness, self.moneyness) or other.sums.shape != self.sums.shape:
+            raise ValueError("Cannot merge strike ladders of different simulations")
+        self.count += other.count
+        self.sums += other.sums
+        self.sums_of_squares += other.sums_of_squares
+        return self
+
+    def to_state(self):
+        """JSON-compatible state, for checkpoints."""
+        return {
+            "moneyness": self.moneyness.tolist(),
+            "count": self.count,
+            "sums": self.sums.tolist(),
+            "sums_of_squares": self.sums_of_squares.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        ladder = cls(len(state["sums"]), state["moneyness"])
+        ladder.count = state["count"]
+        ladder.sums = np.array(state["sums"], dtype=float).reshape(ladder.sums.shape)
+        ladder.sums_of_squares = np.array(state["sums_of_squares"], dtype=float).reshape(ladder.sums.shape)
+        return ladder
+
+    def call_prices(self):
+        """(dates, strikes) mean discounted call payoffs."""
+        return self.sums / self.count
+
+    def call_standard_errors(self):
+        """Per-path (iid) standard errors of call_prices."""
+        mean = self.call_prices()
+        variance = (self.sums_of_squares - self.count * mean * mean) / max(self.count - 1, 1)
+        return np.sqrt(np.maximum(variance, 0.0) / self.count)
+
+
+class PathStatistics:
+    def __init__(self, num_dates, quantities, products=(), ladder=None):
+        """
+        products lists the (quantity, quantity) pairs whose covariance is
+        needed; ladder is an optional StrikeLadder accumulated alongside.
+        """
+        self.quantities = tuple(quantities)
+        self.products = tuple(tuple(pair) for pair in products)
+        self._product_columns = [
+            (self.quantities.index(a), self.quantities.index(b)) for a, b in self.products
+        ]
+        self.count = 0
+        self.sums = np.zeros((num_dates, len(self.quantities)))
+        self.sums_of_squares = np.zeros((num_dates, len(self.quantities)))
+        self.sums_of_products = np.zeros((num_dates, len(self.products)))
+        self.ladder = ladder
+
+    def add_rows(self, date_index, rows):
+        """
+        Accumulate one date of a block; rows is a (quantities, paths) array in
+        the order of self.quantities. The path count is advanced separately
+        (add_paths).
+        """
+        self.sums[date_index] += rows.sum(axis=1)
+        self.sums_of_squares[date_index] += np.einsum("ij,ij->i", rows, rows)
+        for column, (a, b) in enumerate(self._product_columns):
+            self.sums_of_products[date_index, column] += np.dot(rows[a], rows[b])
+
+    def add_paths(self, count):
+        self.count += count
+        if self.ladder is not None:
+            self.ladder.add_paths(count)
+
+    def merge(self, other):
+        if (other.quantities != self.quantities or other.products != self.products
+                or other.sums.shape != self.sums.shape):
+            raise ValueError("Cannot merge statistics of different simulations")
+        self.count += other.count
+        self.sums += other.sums
+        self.sums_of_squares += other.sums_of_squares
+        self.sums_of_products += other.sums_of_products
+        if self.ladder is not None:
+            self.ladder.merge(other.ladder)
+        return self
+
+    def to_state(self):
+        """JSON-compatible state, for checkpoints."""
+        return {
+            "quantities": list(self.quantities),
+            "products": [list(pair) for pair in self.products],
+            "count": self.count,
+            "sums": self.sums.tolist(),
+            "sums_of_squares": self.sums_of_squares.tolist(),
+            "sums_of_products": self.sums_of_products.tolist(),
+            "ladder": self.ladder.to_state() if self.ladder is not None else None,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        ladder = StrikeLadder.from_state(state["ladder"]) if state["ladder"] is not None else None
+        statistics = cls(len(state["sums"]), state["quantities"], state["products"], ladder)
+        statistics.count = state["count"]
+        for name in ("sums", "sums_of_squares", "sums_of_products"):
+            current = getattr(statistics, name)
+            setattr(statistics, name, np.array(state[name], dtype=float).reshape(current.shape))
+        return statistics
+
+    def mean(self, name):
+        """Per-date mean of a quantity over all accumulated paths."""
+        return self.sums[:, self.quantities.index(name)] / self.count
+
+    def variance(self, name):
+        """Per-date sample variance of a quantity."""
+        column = self.quantities.index(name)
+        mean = self.sums[:, column] / self.count
+        variance = (self.sums_of_squares[:, column] - self.count * mean * mean) / max(self.count - 1, 1)
+        return np.maximum(variance, 0.0)
+
+    def covariance(self, a, b):
+        """Per-date sample covariance of a tracked pair of quantities."""
+        if a == b:
+            return self.variance(a)
+        pair = (a, b) if (a, b) in self.products else (b, a)
+        if pair not in self.products:
+            raise KeyError(f"Products of {a} and {b} are not tracked")
+        sums = self.sums_of_products[:, self.products.index(pair)]
+        return (sums - self.count * self.mean(a) * self.mean(b)) / max(self.count - 1, 1)
+
+    def standard_error(self, name):
+        """Per-date per-path (iid) standard error of the mean of a quantity."""
+        return np.sqrt(self.variance(name) / self.count)
+
+    def ratio_standard_error(self, a, b):
+        """Per-date per-path (iid) standard error of mean(a) / mean(b), by the delta method."""
+        ratio = self.mean(a) / self.mean(b)
+        variance = self.variance(a) - 2.0 * ratio * self.covariance(a, b) + ratio * ratio * self.variance(b)
+        return np.sqrt(np.maximum(variance, 0.0) / self.count) / np.abs(self.mean(b))
+
+    def combination_variance(self, target, controls=()):
+        """
+        Per-date per-path variance of target, a quantity or a {quantity: weight}
+        linear combination; with controls, the residual variance left after the
+        control variate regression.
+        """
+        target = {target: 1.0} if isinstance(target, str) else dict(target)
+        variance = np.maximum(self._combination_covariance(target, target), 0.0)
+        controls = list(controls)
+        if not controls:
+            return variance
+        beta, target_covariance = self._regression(target, controls)
+        return np.maximum(variance - np.einsum("dk,dk->d", beta, target_covariance), 0.0)
+
+    def _regression(self, target, controls):
+        """Per-date coefficients of target on controls, and their covariances."""
+        control_covariance = np.stack(
+            [np.stack([self.covariance(a, b) for b in controls], axis=-1) for a in controls], axis=-2
+        )
+        target_covariance = np.stack(
+            [self._combination_covariance(target, {c: 1.0}) for c in controls], axis=-1
+        )
+        return np.einsum("dkl,dl->dk", np.linalg.pinv(control_covariance), target_covariance), target_covariance
+
+    def _combination_covariance(self, a, b):
+        """Covariance of two {quantity: weight} linear combinations."""
+        return sum(
+            wa * wb * self.covariance(x, y) for x, wa in a.items() for y, wb in b.items()
+        )
+
+    def control_variate(self, target, controls, expectations):
+        """
+        Per-date mean of target adjusted with control variates.
+
+        target is a quantity or a {quantity: weight} linear combination;
+        controls are quantities with known expectations (a scalar or a
+        per-date array each). The regression coefficients are estimated from
+        all accumulated paths, so the estimator merges across blocks like the
+        plain mean.
+        """
+        target = {target: 1.0} if isinstance(target, str) else dict(target)
+        controls = list(controls)
+        beta, _ = self._regression(target, controls)
+
+        mean = sum(weight * self.mean(name) for name, weight in target.items())
+        offsets = np.stack(
+            [self.mean(c) - np.broadcast_to(e, mean.shape) for c, e in zip(controls, expectations)], axis=-1
+        )
+        return mean - np.einsum("dk,dk->d", beta, offsets)
+
+
+class BlockReplicates:
+    """
+    Estimates computed from each block on its own, for error bars.
+
+    The pooled estimate is (exactly for means, to first order otherwise) the
+    path-weighted average of the block estimates, so its variance is
+    estimated from their spread around it. This stays valid for randomized
+    quasi-Monte Carlo, where the blocks are independent but the paths within
+    a block are not, and covers nonlinear estimators (ratios, implied
+    volatilities) without linearizing them.
+    """
+
+    def __init__(self):
+        self.counts = []
+        self.values = {}
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, count, values):
+        """Estimates of one block of count paths; values maps names to arrays."""
+        self.counts.append(count)
+        for name, value in values.items():
+            self.values.setdefault(name, []).append(np.asarray(value, dtype=float))
+
+    def variance(self, name):
+        """Variance of the path-weighted average of the block estimates (NaN below 2 blocks)."""
+        values = np.stack(self.values[name])
+        if len(self.counts) < 2:
+            return np.full(values.shape[1:], np.nan)
+        weights = np.asarray(self.counts, dtype=float)
+        weights /= weights.sum()
+        mean = np.tensordot(weights, values, axes=1)
+        spread = np.tensordot(weights * weights, (values - mean) ** 2, axes=1)
+        return spread * len(self.counts) / (len(self.counts) - 1)
+
+    def standard_error(self, name):
+        return np.sqrt(self.variance(name))
+
+    def to_state(self):
+        """JSON-compatible state, for checkpoints."""
+        return {
+            "counts": list(self.counts),
+            "values": {name: [value.tolist() for value in values] for name, values in self.values.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        replicates = cls()
+        replicates.counts = list(state["counts"])
+        replicates.values = {
+            name: [np.asarray(value, dtype=float) for value in values]
+            for name, values in state["values"].items()
+        }
+        return replicates
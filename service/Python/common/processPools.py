@@ -0,0 +1,61 @@
+"""
+Process pools that do not outlive their script.
+
+The Node services stop a timed-out or abandoned HJM/FX script with SIGTERM,
+which only reaches the script's own process. ProcessPoolExecutor workers are
+separate processes: without help they keep computing, and holding their
+cores, after the parent is gone. terminating_pool terminates them when the
+parent gets SIGTERM and then exits.
+"""
+
+import os
+import signal
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    """
+    Default pool size of one script run: XSIGMA_SIMULATION_WORKERS (set by the
+    Node service from CONFIG.PYTHON.SIMULATION_WORKERS), else half the CPUs,
+    so an HJM and an FX run in parallel do not oversubscribe the host.
+    """
+    configured = os.environ.get("XSIGMA_SIMULATION_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def _reset_sigterm(initializer, initargs):
+    # Pool processes are forked with the parent's handler; they must simply die
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+@contextmanager
+def terminating_pool(max_workers, initializer=None, initargs=()):
+    """
+    ProcessPoolExecutor whose processes are terminated when this process gets
+    SIGTERM. On a normal exit from the block, queued work is cancelled and the
+    pool is shut down as usual.
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_reset_sigterm, initargs=(initializer, initargs)
+    )
+    owner = os.getpid()
+
+    def handle_sigterm(signum, frame):
+        if os.getpid() == owner:
+            # _processes is only populated once work has been submitted
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        # Skip the finally blocks: shutdown would wait for the running tasks
+        os._exit(128 + signum)
+
+    previous = signal.signal(signal.SIGTERM, handle_sigterm)
+    try:
+        yield pool
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        pool.shutdown(cancel_futures=True)
@@ -0,0 +1,90 @@
+"""
+Newline-delimited JSON progress events for long-running scripts.
+
+Each line on the protocol stream is one JSON object with an "event" field:
+
+    {"event": "stage", "stage": "calibration", "status": "start", "percent": 10.0}
+    {"event": "stage", "stage": "calibration", "status": "end", "elapsed_ms": 812.4, "percent": 40.0}
+    {"event": "stage", "stage": "pricing", "status": "failed", "elapsed_ms": 95.1, "percent": 40.0, "error": "..."}
+    {"event": "progress", "percent": 55.0, "message": "priced expiry 3 of 8"}
+    {"event": "partial", "expiry_fraction": 2.0, "model": [...], "market": [...]}
+    {"event": "result", "status": "success", "data": {...}, "error": null}
+
+Every stage start is followed by its end, or by a "failed" event if the
+stage raised. The result event is always the last line. Anything else the script or the
+libraries print should go to stderr (see EventStream.protocol_stdout) so the
+stream stays machine-parseable.
+"""
+
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+
+class EventStream:
+    def __init__(self, stream=None, stage_weights=None):
+        """
+        stage_weights maps stage names to their expected share of the run;
+        percent complete advances by a stage's weight when it ends.
+        """
+        self.stream = stream or sys.stdout
+        self.stage_weights = dict(stage_weights or {})
+        self.total_weight = sum(self.stage_weights.values()) or 1.0
+        self.completed_weight = 0.0
+        self.current_stage = None
+        self.start = time.perf_counter()
+
+    @classmethod
+    def protocol_stdout(cls, stage_weights=None):
+        """Stream on the real stdout, with sys.stdout redirected to stderr."""
+        stream = sys.stdout
+        sys.stdout = sys.stderr
+        return cls(stream, stage_weights)
+
+    def emit(self, event, **fields):
+        self.stream.write(json.dumps({"event": event, **fields}) + "\n")
+        self.stream.flush()
+
+    def percent(self, stage_fraction=0.0):
+        """Percent complete, counting stage_fraction of the current stage."""
+        weight = self.completed_weight
+        if self.current_stage is not None:
+            weight += stage_fraction * self.stage_weights.get(self.current_stage, 0.0)
+        return round(100.0 * weight / self.total_weight, 1)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Emit start and end events around a stage, with its wall time; a stage
+        that raises ends with a "failed" event instead and does not count
+        towards percent complete.
+        """
+        self.current_stage = name
+        self.emit("stage", stage=name, status="start", percent=self.percent())
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            # Also on SystemExit and KeyboardInterrupt, so no start goes unmatched
+            self.current_stage = None
+            self.emit("stage", stage=name, status="failed",
+                      elapsed_ms=round((time.perf_counter() - start) * 1000, 2), percent=self.percent(),
+                      error=str(e) or type(e).__name__)
+            raise
+        elapsed = time.perf_counter() - start
+        self.completed_weight += self.stage_weights.get(name, 0.0)
+        self.current_stage = None
+        self.emit("stage", stage=name, status="end", elapsed_ms=round(elapsed * 1000, 2), percent=self.percent())
+
+    def progress(self, stage_fraction, message=None):
+        """Progress within the current stage (0 to 1)."""
+        self.emit("progress", percent=self.percent(stage_fraction), message=message)
+
+    def partial(self, **fields):
+        """A piece of the final result that is already available."""
+        self.emit("partial", **fields)
+
+    def result(self, response):
+        """The final {"status", "data", "error"} response."""
+        self.emit("result", total_ms=round((time.perf_counter() - self.start) * 1000, 2), **response)
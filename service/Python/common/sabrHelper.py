@@ -1,27 +1,14 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from ipywidgets import (
-    FloatSlider,
-    IntSlider,
-    Button,
-    ToggleButton,
-    HBox,
-    VBox,
-    Layout,
-    Output,
-    Checkbox,
-)
-from IPython.display import display
 from xsigmamodules.Util import (
     zabrMixtureAnalytics,
     zabrClassicalAnalytics,
     sabrPdeAnalyticsClassic,
-    zabr_output_type,
-    density_smoothing_type,
-    bachelier,
 )
 from xsigmamodules.util.numpy_support import xsigmaToNumpy, numpyToXsigma
 
+# Numeric kernels live in the headless module; re-exported for existing callers
+from common.volatilityCompute import compute_density, create_model as _create_model
+
 
 def get_parameter_range(param):
     ranges = {
@@ -49,6 +36,8 @@ def get_parameter_range(param):
 
 
 def create_sliders(initial_values):
+    from ipywidgets import FloatSlider, IntSlider, Checkbox
+
     sliders = {}
     for param, value in initial_values.items():
         min_val, max_val, step = get_parameter_range(param)
@@ -80,6 +69,8 @@ def create_sliders(initial_values):
 
 
 def create_ui(sliders, reset_func, night_mode_func):
+    from ipywidgets import Button, ToggleButton, HBox, VBox, Layout
+
     reset_button = Button(
         description="Reset", layout=Layout(width="auto", height="40px")
     )
@@ -101,6 +92,8 @@ def create_ui(sliders, reset_func, night_mode_func):
 def plot_volatility(
     x_initial, x_dynamic, y_initial, y_dynamic, title, is_night_mode, x_min, x_max
 ):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
     style = "dark_background" if is_night_mode else "default"
     plt.style.use(style)
@@ -152,58 +145,16 @@ def plot_volatility(
 def create_volatility_plotter(
     model_class, initial_values, x_values, x_min, x_max, title
 ):
+    from ipywidgets import Output
+    from IPython.display import display
+
     sliders = create_sliders(initial_values)
     output = Output()
     is_night_mode = False
     current_values = initial_values.copy()
 
     def create_model(values):
-        if model_class == zabrClassicalAnalytics:
-            return model_class(
-                values["expiry"],
-                values["forward"],
-                values["beta"],
-                values["shift"],
-                values["alpha"],
-                values["nu"],
-                values["rho"],
-                values["gamma"],
-                values["use_vol_adjustement"],
-            )
-        elif model_class == zabrMixtureAnalytics:
-            high_strike = max(
-                values["high_strike"], values["smothing_factor"] + values["low_strike"]
-            )
-            return model_class(
-                values["expiry"],
-                values["forward"],
-                values["alpha"],
-                values["beta1"],
-                values["beta2"],
-                values["d"],
-                values["vol_low"],
-                values["nu"],
-                values["rho"],
-                values["gamma"],
-                values["use_vol_adjustement"],
-                high_strike,
-                values["low_strike"],
-                values["forward_cut_off"],
-                values["smothing_factor"],
-            )
-        elif model_class == sabrPdeAnalyticsClassic:
-            return model_class(
-                values["expiry"],
-                values["forward"],
-                values["alpha"],
-                values["beta"],
-                values["nu"],
-                values["rho"],
-                values["shift"],
-                values["N"],
-                values["timesteps"],
-                values["nd"],
-            )
+        return _create_model(model_class, values)
 
     obj_initial = create_model(initial_values)
     x_initial = x_values
@@ -254,26 +205,3 @@ def create_volatility_plotter(
     display(ui, output)
     update_plot()
 
-
-def compute_density(obj, x_values):
-    if isinstance(obj, sabrPdeAnalyticsClassic):
-        implied_vol = vol_model = np.zeros_like(
-            x_values
-        )  # xsigmaToNumpy(obj.density())
-        forward = obj.forward()
-        T = obj.expiry()
-        for i, K in enumerate(x_values):
-            is_call = 1.0
-            if K <= forward:
-                is_call = -1.0
-            p = obj.price(K, True, density_smoothing_type.LINEAR)
-            p = p - max(is_call * (forward - K), 0.0)
-            vol = bachelier.implied_volatility(forward, K, T, p, 1.0, is_call)
-            implied_vol[i] = vol
-        return implied_vol
-    else:
-        implied_vol = np.zeros(len(x_values))
-        implied_vol_ = numpyToXsigma(implied_vol)
-        strikes_ = numpyToXsigma(x_values)
-        obj.values(implied_vol_, strikes_, zabr_output_type.IMPLIED_VOLATILITY, False)
-        return implied_vol
@@ -0,0 +1,50 @@
+"""
+Checkpoints of long simulations, so a run killed by a timeout can resume.
+
+A checkpoint is a JSON file under XSIGMA_CACHE_DIR/checkpoints/<kind>/ named
+by the canonical key of everything the run's result depends on (market-data
+digests, model parameters, path counts, seeds), so a resumed run only picks
+up state from an identical request. Scripts save their accumulated state
+(per-date sums, priced expiries, the next block to simulate) at most every
+CHECKPOINT_INTERVAL_SECONDS, always once more when they finish, and remove
+the checkpoint after their result has been written. Floats round-trip
+exactly through JSON, so a resumed run returns the same result as an
+uninterrupted one.
+"""
+
+import os
+import time
+from common.diskCache import cache_dir, canonical_key, read_json, write_json_atomic
+
+# Bump when the layout of a saved state changes
+CHECKPOINT_VERSION = 3
+CHECKPOINT_INTERVAL_SECONDS = float(os.environ.get("XSIGMA_CHECKPOINT_SECONDS", 30))
+
+
+class SimulationCheckpoint:
+    def __init__(self, kind, key, interval=CHECKPOINT_INTERVAL_SECONDS):
+        self.path = os.path.join(
+            cache_dir(os.path.join("checkpoints", kind)),
+            f"{canonical_key(CHECKPOINT_VERSION, key)}.json",
+        )
+        self.interval = interval
+        self.last_saved = time.monotonic()
+
+    def load(self):
+        """Saved state, or None if there is none."""
+        return read_json(self.path)
+
+    def save(self, state, force=False):
+        """Save state if the interval has passed since the last save (or force)."""
+        now = time.monotonic()
+        if not force and now - self.last_saved < self.interval:
+            return False
+        write_json_atomic(self.path, state)
+        self.last_saved = now
+        return True
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,98 @@
+"""
+Solver backend selection for the ASV calibrations.
+
+Each backend has default settings that can be overridden per request; the
+settings dict is also what the calibration cache key records, so two
+requests only share a cached calibration if they used the same solver.
+benchmarks/calibration_solvers.py compares the backends and tolerances.
+
+Only Ceres, whose options signature the calibrations used from the start,
+is accepted from requests. The Levenberg-Marquardt and NLopt argument
+orders and algorithm names below have not been checked against the
+bindings yet; the benchmark can run them (allow_unverified) to do so.
+"""
+
+from xsigmamodules.Math import (
+    solverOptionsCeres,
+    solverOptionsLm,
+    solverOptionsNlopt,
+    nlopt_algo_name
+)
+
+DEFAULT_SOLVER = "ceres"
+# Backends whose options construction is known to match the bindings
+VERIFIED_SOLVERS = ("ceres",)
+
+SOLVER_DEFAULTS = {
+    "ceres": {
+        "max_iterations": 500,
+        "function_tolerance": 1e-14,
+        "gradient_tolerance": 1e-14,
+        "parameter_tolerance": 1e-14,
+    },
+    "lm": {
+        "max_iterations": 500,
+        "function_tolerance": 1e-14,
+        "gradient_tolerance": 1e-14,
+        "parameter_tolerance": 1e-14,
+    },
+    "nlopt": {
+        "algorithm": "LN_BOBYQA",
+        "max_iterations": 500,
+        "function_tolerance": 1e-14,
+        "parameter_tolerance": 1e-14,
+    },
+}
+
+
+def solver_settings(solver=DEFAULT_SOLVER, overrides=None, allow_unverified=False):
+    """Default settings for solver updated with overrides, validated."""
+    accepted = SOLVER_DEFAULTS if allow_unverified else VERIFIED_SOLVERS
+    if solver not in accepted:
+        raise ValueError(f"Unknown solver '{solver}'. Must be one of: {', '.join(accepted)}")
+
+    settings = dict(SOLVER_DEFAULTS[solver])
+    for name, value in (overrides or {}).items():
+        if name not in settings:
+            raise ValueError(
+                f"Unknown setting '{name}' for solver '{solver}'. Must be one of: {', '.join(settings)}"
+            )
+        if name == "algorithm":
+            if not hasattr(nlopt_algo_name, str(value)):
+                raise ValueError(f"Unknown NLopt algorithm '{value}'")
+            settings[name] = str(value)
+        elif name == "max_iterations":
+            settings[name] = int(value)
+            if settings[name] <= 0:
+                raise ValueError("max_iterations must be positive")
+        else:
+            settings[name] = float(value)
+            if settings[name] <= 0:
+                raise ValueError(f"{name} must be positive")
+    return settings
+
+
+def build_solver_options(solver, settings):
+    """xsigmamodules options object for a solver and its settings."""
+    if solver == "ceres":
+        return solverOptionsCeres(
+            settings["max_iterations"],
+            settings["function_tolerance"],
+            settings["gradient_tolerance"],
+            settings["parameter_tolerance"],
+        )
+    if solver == "lm":
+        return solverOptionsLm(
+            settings["max_iterations"],
+            settings["function_tolerance"],
+            settings["gradient_tolerance"],
+            settings["parameter_tolerance"],
+        )
+    if solver == "nlopt":
+        return solverOptionsNlopt(
+            getattr(nlopt_algo_name, settings["algorithm"]),
+            settings["max_iterations"],
+            settings["function_tolerance"],
+            settings["parameter_tolerance"],
+        )
+    raise ValueError(f"Unknown solver '{solver}'")
@@ -0,0 +1,272 @@
+"""
+Headless numeric kernels shared by the server scripts and the notebook UIs.
+
+Nothing here imports matplotlib, ipywidgets or IPython, so the compute path
+(scripts and compute_worker.py) does not pay for the plotting stack at
+start-up. The UI modules (volatilityDensityModel, sabrHelper) re-export these
+functions and import their plotting dependencies lazily.
+"""
+
+import numpy as np
+from xsigmamodules.Util import (
+    sigmaVolatilityInspired,
+    zabrMixtureAnalytics,
+    zabrClassicalAnalytics,
+    sabrPdeAnalyticsClassic,
+    zabr_output_type,
+    density_smoothing_type,
+)
+from xsigmamodules.Market import volatilityModelExtendedSvi
+from xsigmamodules.util.numpy_support import xsigmaToNumpy, numpyToXsigma
+from common.vectorizedPricing import (
+    black_scholes_density,
+    bachelier_implied_volatility,
+    density_otm_prices,
+)
+
+# How far the PDE grid density may be from a unit mass, and its mean from
+# the forward (relative), before pde_otm_prices falls back to per-strike
+# obj.price calls; the level benchmarks/pricing_kernels.py holds the
+# density prices to
+PDE_DENSITY_MASS_TOLERANCE = 1e-6
+
+
+def generate_sample_data(num_points=39, strike_range=(1800, 2700)):
+    y_values = (
+        np.array(
+            [
+                140.00,
+                136.62,
+                133.02,
+                129.02,
+                124.96,
+                120.55,
+                115.67,
+                110.16,
+                106.32,
+                102.75,
+                96.93,
+                91.39,
+                85.85,
+                79.70,
+                73.11,
+                68.25,
+                62.71,
+                57.30,
+                49.97,
+                44.55,
+                41.58,
+                43.20,
+                47.41,
+                51.92,
+                56.99,
+                60.46,
+                64.68,
+                68.47,
+                72.31,
+                76.14,
+                79.63,
+                83.10,
+                86.15,
+                89.14,
+                91.85,
+                94.70,
+                97.06,
+                99.70,
+                101.03,
+            ]
+        )
+        / 100.0
+    )
+
+    strikes = np.linspace(strike_range[0], strike_range[1], num_points)
+    spread = np.random.uniform(0, 0.01, num_points)
+    bid_values = (
+        np.interp(
+            strikes, np.linspace(strike_range[0], strike_range[1], num_points), y_values
+        )
+        - spread
+    )
+    ask_values = (
+        np.interp(
+            strikes, np.linspace(strike_range[0], strike_range[1], num_points), y_values
+        )
+        + spread
+    )
+    mid_values = 0.5 * (bid_values + ask_values)
+
+    return strikes, bid_values, ask_values, mid_values
+
+
+def density_strike_grid(fwd, n=400):
+    """Strike grid used by calculate_vols_and_density."""
+    return np.linspace(0.5 * fwd, 2.0 * fwd, n)
+
+
+def calculate_vols_and_density(
+    forward, params, model_type="asv", legacy_parametrisation=False, strikes=None
+):
+    if strikes is None:
+        strikes = density_strike_grid(params["fwd"])
+    strikes = np.asarray(strikes, dtype=float)
+    n = len(strikes)
+
+    if model_type == "asv":
+        obj = volatilityModelExtendedSvi(
+            params["fwd"],
+            params["ctrl_p"],
+            params["ctrl_c"],
+            params["atm"],
+            params["skew"],
+            params["smile"],
+            params["put"],
+            params["call"],
+        )
+
+        arrays = {
+            "vols": np.zeros(n),
+            "atm_sensitivity": np.zeros(n),
+            "skew_sensitivity": np.zeros(n),
+            "smile_sensitivity": np.zeros(n),
+            "put_sensitivity": np.zeros(n),
+            "call_sensitivity": np.zeros(n),
+            "strike_sensitivity": np.zeros(n),
+            "ref_sensitivity": np.zeros(n),
+            "atm2_sensitivity": np.zeros(n),
+            "ref2_sensitivity": np.zeros(n),
+            "strike2_sensitivity": np.zeros(n),
+        }
+
+        obj.sensitivities(
+            params["time"],
+            numpyToXsigma(strikes),
+            *[numpyToXsigma(arr) for arr in arrays.values()],
+        )
+
+        vols = arrays["vols"]
+        density = black_scholes_density(
+            params["fwd"],
+            strikes,
+            params["time"],
+            vols,
+            arrays["strike_sensitivity"],
+            arrays["strike2_sensitivity"],
+        )
+
+    elif model_type == "svi":
+        obj = sigmaVolatilityInspired(
+            params["fwd"], params["b"], params["m"], params["sigma"]
+        )
+        vols = np.zeros(n)
+        obj.svi(numpyToXsigma(vols), numpyToXsigma(strikes))
+        density = np.exp(-0.5 * ((strikes - params["fwd"]) / vols) ** 2) / (
+            vols * np.sqrt(2 * np.pi)
+        )
+
+    else:
+        raise ValueError("Invalid model type. Choose 'asv' or 'svi'.")
+
+    return strikes, vols, density
+
+
+def create_model(model_class, values):
+    """Create model instance based on model class and parameters."""
+    if model_class == zabrClassicalAnalytics:
+        return model_class(
+            values["expiry"],
+            values["forward"],
+            values["beta"],
+            values["shift"],
+            values["alpha"],
+            values["nu"],
+            values["rho"],
+            values["gamma"],
+            values["use_vol_adjustement"]
+        )
+    elif model_class == zabrMixtureAnalytics:
+        high_strike = max(
+            values["high_strike"],
+            values["smothing_factor"] + values["low_strike"]
+        )
+        return model_class(
+            values["expiry"],
+            values["forward"],
+            values["alpha"],
+            values["beta1"],
+            values["beta2"],
+            values["d"],
+            values["vol_low"],
+            values["nu"],
+            values["rho"],
+            values["gamma"],
+            values["use_vol_adjustement"],
+            high_strike,
+            values["low_strike"],
+            values["forward_cut_off"],
+            values["smothing_factor"]
+        )
+    elif model_class == sabrPdeAnalyticsClassic:
+        return model_class(
+            values["expiry"],
+            values["forward"],
+            values["alpha"],
+            values["beta"],
+            values["nu"],
+            values["rho"],
+            values["shift"],
+            values["N"],
+            values["timesteps"],
+            values["nd"]
+        )
+
+
+def pde_otm_prices(obj, strikes):
+    """
+    Out-of-the-money prices from one sabrPdeAnalyticsClassic solve.
+
+    The payoff is integrated against the terminal density on the PDE grid for
+    all strikes at once. If the grid density does not integrate to one, or
+    its mean is not the forward, within PDE_DENSITY_MASS_TOLERANCE the prices
+    are read strike by strike from obj.price instead.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    forward = obj.forward()
+    grid = xsigmaToNumpy(obj.strikes())
+    density = xsigmaToNumpy(obj.density())
+
+    width = np.diff(grid)
+    mass = np.sum(0.5 * width * (density[:-1] + density[1:]))
+    mean = np.sum(width * (
+        grid[:-1] * (2.0 * density[:-1] + density[1:]) + grid[1:] * (density[:-1] + 2.0 * density[1:])
+    ) / 6.0)
+    if (abs(mass - 1.0) < PDE_DENSITY_MASS_TOLERANCE
+            and abs(mean - forward) < PDE_DENSITY_MASS_TOLERANCE * max(abs(forward), 1.0)):
+        return density_otm_prices(grid, density, forward, strikes)
+
+    prices = np.zeros_like(strikes)
+    for i, K in enumerate(strikes):
+        is_call = 1.0 if K > forward else -1.0
+        p = obj.price(K, True, density_smoothing_type.LINEAR)
+        prices[i] = p - max(is_call * (forward - K), 0.0)
+    return prices
+
+
+def pde_implied_volatility(obj, strikes):
+    """Normal implied volatilities of a sabrPdeAnalyticsClassic model."""
+    strikes = np.asarray(strikes, dtype=float)
+    forward = obj.forward()
+    is_call = np.where(strikes > forward, 1.0, -1.0)
+    prices = pde_otm_prices(obj, strikes)
+    return bachelier_implied_volatility(forward, strikes, obj.expiry(), prices, 1.0, is_call)
+
+
+def compute_density(obj, x_values):
+    """Compute density/implied volatility for given model and x values."""
+    if isinstance(obj, sabrPdeAnalyticsClassic):
+        return pde_implied_volatility(obj, x_values)
+    else:
+        implied_vol = np.zeros(len(x_values))
+        implied_vol_ = numpyToXsigma(implied_vol)
+        strikes_ = numpyToXsigma(x_values)
+        obj.values(implied_vol_, strikes_, zabr_output_type.IMPLIED_VOLATILITY, False)
+        return implied_vol
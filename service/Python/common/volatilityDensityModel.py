@@ -1,86 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from xsigmamodules.Util import (
-    blackScholes,
-    sigmaVolatilityInspired,
-    volatility_type,
-)
-from xsigmamodules.Market import volatilityModelExtendedSvi
 from xsigmamodules.util.numpy_support import xsigmaToNumpy, numpyToXsigma
-from ipywidgets import interactive, FloatSlider, Button, HBox, VBox, Checkbox, Layout
-import ipywidgets as widgets
-
-
-def generate_sample_data(num_points=39, strike_range=(1800, 2700)):
-    y_values = (
-        np.array(
-            [
-                140.00,
-                136.62,
-                133.02,
-                129.02,
-                124.96,
-                120.55,
-                115.67,
-                110.16,
-                106.32,
-                102.75,
-                96.93,
-                91.39,
-                85.85,
-                79.70,
-                73.11,
-                68.25,
-                62.71,
-                57.30,
-                49.97,
-                44.55,
-                41.58,
-                43.20,
-                47.41,
-                51.92,
-                56.99,
-                60.46,
-                64.68,
-                68.47,
-                72.31,
-                76.14,
-                79.63,
-                83.10,
-                86.15,
-                89.14,
-                91.85,
-                94.70,
-                97.06,
-                99.70,
-                101.03,
-            ]
-        )
-        / 100.0
-    )
 
-    strikes = np.linspace(strike_range[0], strike_range[1], num_points)
-    spread = np.random.uniform(0, 0.01, num_points)
-    bid_values = (
-        np.interp(
-            strikes, np.linspace(strike_range[0], strike_range[1], num_points), y_values
-        )
-        - spread
-    )
-    ask_values = (
-        np.interp(
-            strikes, np.linspace(strike_range[0], strike_range[1], num_points), y_values
-        )
-        + spread
-    )
-    mid_values = 0.5 * (bid_values + ask_values)
-
-    return strikes, bid_values, ask_values, mid_values
+# Numeric kernels live in the headless module; re-exported for existing callers
+from common.volatilityCompute import generate_sample_data, calculate_vols_and_density
+from common.vectorizedPricing import black_scholes_density
 
 
 def plot_volatility_smile(
     calibration_strikes, strikes, bid_values, ask_values, mid_values, vols
 ):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 8))
     plt.scatter(calibration_strikes, mid_values, label="Mid", color="blue", s=10)
     plt.scatter(calibration_strikes, bid_values, label="Bid", color="green", s=10)
@@ -95,6 +25,8 @@ def plot_volatility_smile(
 
 
 def plot_density(obj, strikes, spot, expiry):
+    import matplotlib.pyplot as plt
+
     n = len(strikes)
     arrays = {
         "vols": np.zeros(n),
@@ -114,15 +46,14 @@ def plot_density(obj, strikes, spot, expiry):
         expiry, numpyToXsigma(strikes), *[numpyToXsigma(arr) for arr in arrays.values()]
     )
 
-    density = [
-        blackScholes.density(spot, strike, expiry, vol, strike_sens, strike2_sens)
-        for strike, vol, strike_sens, strike2_sens in zip(
-            strikes,
-            arrays["vols"],
-            arrays["strike_sensitivity"],
-            arrays["strike2_sensitivity"],
-        )
-    ]
+    density = black_scholes_density(
+        spot,
+        strikes,
+        expiry,
+        arrays["vols"],
+        arrays["strike_sensitivity"],
+        arrays["strike2_sensitivity"],
+    )
 
     plt.figure(figsize=(10, 6))
     plt.plot(strikes, density, "b-", label="Density")
@@ -134,83 +65,11 @@ def plot_density(obj, strikes, spot, expiry):
     plt.show()
 
 
-def calculate_vols_and_density(
-    forward, params, model_type="asv", legacy_parametrisation=False
-):
-    n = 400
-    strikes = np.linspace(0.5 * params["fwd"], 2.0 * params["fwd"], n)
-
-    if model_type == "asv":
-        obj = volatilityModelExtendedSvi(
-            params["fwd"],
-            params["ctrl_p"],
-            params["ctrl_c"],
-            params["atm"],
-            params["skew"],
-            params["smile"],
-            params["put"],
-            params["call"],
-        )
-
-        arrays = {
-            "vols": np.zeros(n),
-            "atm_sensitivity": np.zeros(n),
-            "skew_sensitivity": np.zeros(n),
-            "smile_sensitivity": np.zeros(n),
-            "put_sensitivity": np.zeros(n),
-            "call_sensitivity": np.zeros(n),
-            "strike_sensitivity": np.zeros(n),
-            "ref_sensitivity": np.zeros(n),
-            "atm2_sensitivity": np.zeros(n),
-            "ref2_sensitivity": np.zeros(n),
-            "strike2_sensitivity": np.zeros(n),
-        }
-
-        obj.sensitivities(
-            params["time"],
-            numpyToXsigma(strikes),
-            *[numpyToXsigma(arr) for arr in arrays.values()],
-        )
-
-        vols = arrays["vols"]
-        density = np.array(
-            [
-                blackScholes.density(
-                    params["fwd"],
-                    strike,
-                    params["time"],
-                    vol,
-                    strike_sens,
-                    strike2_sens,
-                )
-                for strike, vol, strike_sens, strike2_sens in zip(
-                    strikes,
-                    vols,
-                    arrays["strike_sensitivity"],
-                    arrays["strike2_sensitivity"],
-                )
-            ]
-        )
-
-    elif model_type == "svi":
-        obj = sigmaVolatilityInspired(
-            params["fwd"], params["b"], params["m"], params["sigma"]
-        )
-        vols = np.zeros(n)
-        obj.svi(numpyToXsigma(vols), numpyToXsigma(strikes))
-        density = np.exp(-0.5 * ((strikes - params["fwd"]) / vols) ** 2) / (
-            vols * np.sqrt(2 * np.pi)
-        )
-
-    else:
-        raise ValueError("Invalid model type. Choose 'asv' or 'svi'.")
-
-    return strikes, vols, density
-
-
 def plot_volatility_smile_and_density(
     initial_values, current_params, model_type="asv", legacy_parametrisation=False
 ):
+    import matplotlib.pyplot as plt
+
     # Calculate for initial values
     initial_strikes, initial_vols, initial_density = calculate_vols_and_density(
         initial_values["fwd"], initial_values, model_type, legacy_parametrisation
@@ -248,6 +107,8 @@ def plot_volatility_smile_and_density(
 def create_interactive_model(
     initial_values, model_type="asv", legacy_parametrisation=False
 ):
+    from ipywidgets import interactive, FloatSlider, Button, HBox, VBox, Layout
+
     slider_layout = Layout(width="400px")
     sliders = {}
 
@@ -0,0 +1,122 @@
+"""
+Warm-start seeds for recalibrating the same instrument.
+
+After each calibration the calibrated model is kept as the seed for its
+(model kind, instrument, expiry, context), in memory and under
+XSIGMA_CACHE_DIR/warm_start so every worker sees it. The context holds the
+inputs the model object is built with besides its shape parameters (forward,
+spot, rates). The seed's model is used as-is as the solver's initial object,
+so a later calibration only starts from it when the expiry and context are
+exactly the same (typically the same smile requoted); otherwise it starts
+from the fixed initial guess.
+
+The xsigmamodules solvers do not report iteration counts, so the saving is
+measured in time: each warm-started calibration is compared with the rolling
+average of cold-started ones of the same kind in this process.
+"""
+
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from common.diskCache import cache_dir, canonical_key, read_json, write_json_atomic, write_model_json
+
+# Cold-start calibrations kept for the rolling average
+COLD_START_WINDOW = 20
+
+
+@dataclass
+class WarmStartSeed:
+    model: Any
+    expiry: float
+    timestamp: float
+    key: str
+    context: Any = None
+
+
+class WarmStartStore:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.seeds: Dict[tuple, WarmStartSeed] = {}
+        self.cold_start_seconds: Dict[str, deque] = {}
+
+    def _instrument_dir(self, kind, instrument):
+        root = self.directory or cache_dir("warm_start")
+        path = os.path.join(root, kind, canonical_key(instrument)[:32])
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _seed_id(expiry, context):
+        return canonical_key(float(expiry), context)
+
+    def lookup(self, kind, instrument, expiry, model_class, context=None) -> Optional[WarmStartSeed]:
+        """Newest seed for the instrument with exactly this expiry and context, if any."""
+        seed_id = self._seed_id(expiry, context)
+        directory = self._instrument_dir(kind, instrument)
+        best = read_json(os.path.join(directory, f"{seed_id[:16]}.meta.json"))
+        if best is not None and (best["expiry"] != float(expiry) or best.get("context") != context):
+            best = None
+        cached = self.seeds.get((kind, instrument, seed_id))
+        if cached is not None and (best is None or cached.timestamp >= best["timestamp"]):
+            return cached
+        if best is None:
+            return None
+
+        try:
+            model = model_class.read_from_json(os.path.join(directory, f"{best['key']}.json"))
+        except Exception as e:
+            print(f"Ignoring unreadable warm-start seed for {instrument}: {e}", file=sys.stderr)
+            return None
+        seed = WarmStartSeed(model, best["expiry"], best["timestamp"], best["key"], context)
+        self.seeds[(kind, instrument, seed_id)] = seed
+        return seed
+
+    def record(self, kind, instrument, expiry, model, model_class, key, context=None):
+        """Keep a calibrated model as the seed for (kind, instrument, expiry, context)."""
+        seed = WarmStartSeed(model, float(expiry), time.time(), key, context)
+        seed_id = self._seed_id(expiry, context)
+        self.seeds[(kind, instrument, seed_id)] = seed
+
+        directory = self._instrument_dir(kind, instrument)
+        model_path = os.path.join(directory, f"{key}.json")
+        try:
+            if not os.path.exists(model_path):
+                write_model_json(model_class, model_path, model)
+        except Exception as e:
+            print(f"Could not persist warm-start seed for {instrument}: {e}", file=sys.stderr)
+            return
+        # One meta file per expiry and context, so the newest calibration
+        # replaces the seed
+        write_json_atomic(
+            os.path.join(directory, f"{seed_id[:16]}.meta.json"),
+            {"expiry": seed.expiry, "timestamp": seed.timestamp, "key": key, "context": context},
+        )
+
+    def run(self, kind, seed: Optional[WarmStartSeed], calibrate: Callable, report: Dict):
+        """Call calibrate() and fill report with its timing against cold starts."""
+        start = time.perf_counter()
+        model = calibrate()
+        elapsed = time.perf_counter() - start
+
+        history = self.cold_start_seconds.setdefault(kind, deque(maxlen=COLD_START_WINDOW))
+        cold_average = sum(history) / len(history) if history else None
+        if seed is None:
+            history.append(elapsed)
+
+        report.update({
+            "warm_start": seed is not None,
+            "calibration_ms": round(elapsed * 1000, 2),
+            "cold_start_avg_ms": round(cold_average * 1000, 2) if cold_average is not None else None,
+        })
+        if seed is not None:
+            report["seed_expiry"] = seed.expiry
+            report["seed_age_s"] = round(time.time() - seed.timestamp, 1)
+            if cold_average is not None:
+                report["saved_ms"] = round((cold_average - elapsed) * 1000, 2)
+        return model
+
+
+warm_start_store = WarmStartStore()
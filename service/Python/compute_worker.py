@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Long-lived compute worker for the Node services.
+
+numpy and xsigmamodules are imported once when the worker starts, so each
+request only pays for the model evaluation instead of a fresh interpreter.
+Requests are read from stdin as JSON lines and answered on stdout, one line
+per request:
+
+    -> {"id": 7, "method": "zabr_analytics", "params": {"model_type": "pde"}}
+    <- {"id": 7, "status": "success", "data": {...}, "error": null}
+
+A request with "format": "columnar" is answered with a header line giving
+the payload size, followed by that many bytes in the binary layout of
+common/columnarFormat.py:
+
+    -> {"id": 8, "method": "batch", "params": {...}, "format": "columnar"}
+    <- {"id": 8, "status": "success", "format": "columnar", "bytes": 81952}
+    <- <81952 bytes>
+
+Anything the model code prints is redirected to stderr so stdout only ever
+carries protocol lines.
+"""
+
+import os
+import sys
+import json
+import traceback
+
+import AnalyticalSigmaVolatility
+import AnalyticalSigmaVolatilityCalibration
+import AnalyticalSigmaVolatilitySurface
+import HW_distribution
+import batch
+import volatility
+import volatility_svi
+import zabr_analytics
+import zabr_calibration
+from common.baselineCache import baseline_cache
+from common.calibrationCache import calibration_cache
+from common import columnarFormat
+
+
+def _unwrap(envelope):
+    """Return the data of a {"status", "data", "error"} result or raise its error."""
+    if envelope.get("status") == "error":
+        raise RuntimeError(envelope.get("error"))
+    return envelope["data"]
+
+
+def asv_calibration(params):
+    result = AnalyticalSigmaVolatilityCalibration.calculate_vols_and_density(
+        AnalyticalSigmaVolatilityCalibration.parse_params(params),
+        params["computationType"]
+    )
+    if result.get("status") == "error":
+        raise RuntimeError(result.get("error"))
+    return result
+
+
+def analytical_sigma_volatility(params):
+    return AnalyticalSigmaVolatility.run_test(
+        AnalyticalSigmaVolatility.VolatilityParams.from_dict(params)
+    )
+
+
+def zabr_calibrate(params):
+    return _unwrap(zabr_calibration.run_calibration(
+        zabr_calibration.ZabrParams.from_dict(params)
+    ))
+
+
+def hw_distribution(params):
+    args = (
+        int(params["n"]),
+        float(params["t"]),
+        int(params["size_roots"]),
+        float(params["x_0"]),
+        float(params["x_n"]),
+    )
+    HW_distribution.validate_inputs(*args)
+    return _unwrap(HW_distribution.calculate_hw_distribution(*args))
+
+
+HANDLERS = {
+    "ping": lambda params: {
+        "pid": os.getpid(),
+        "caches": {"baseline": baseline_cache.stats(), "calibration": calibration_cache.stats()},
+    },
+    "asv_calibration": asv_calibration,
+    "analytical_sigma_volatility": analytical_sigma_volatility,
+    "asv_surface_calibration": AnalyticalSigmaVolatilitySurface.calibrate_surface,
+    "volatility_asv": volatility.compute,
+    "volatility_svi": volatility_svi.compute,
+    "zabr_analytics": zabr_analytics.compute,
+    "zabr_calibration": zabr_calibrate,
+    "hw_distribution": hw_distribution,
+    "batch": batch.compute,
+}
+
+
+def handle(request):
+    """Run one request and build its response line."""
+    request_id = request.get("id")
+    method = request.get("method")
+    handler = HANDLERS.get(method)
+    if handler is None:
+        return {
+            "id": request_id,
+            "status": "error",
+            "data": None,
+            "error": f"Unknown method: {method}"
+        }
+
+    try:
+        data = handler(request.get("params") or {})
+        if request.get("format") == "columnar":
+            return {"id": request_id, "status": "success", "format": "columnar",
+                    "payload": columnarFormat.encode(data)}
+        return {"id": request_id, "status": "success", "data": data, "error": None}
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return {"id": request_id, "status": "error", "data": None, "error": str(e)}
+
+
+def write_response(stream_out, response):
+    """Write one response line, followed by its binary payload if it has one."""
+    payload = response.pop("payload", None)
+    if payload is not None:
+        response["bytes"] = len(payload)
+    stream_out.write(json.dumps(response, default=columnarFormat.to_json_compatible) + "\n")
+    stream_out.flush()
+    if payload is not None:
+        stream_out.buffer.write(payload)
+        stream_out.buffer.flush()
+
+
+def serve(stream_in, stream_out):
+    """Answer JSON-line requests from stream_in until it is closed."""
+    for line in stream_in:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {"id": None, "status": "error", "data": None,
+                        "error": f"Invalid request: {e}"}
+        else:
+            response = handle(request)
+        write_response(stream_out, response)
+
+
+def main():
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    # Tell the parent the imports are done and requests can be sent
+    protocol_out.write(json.dumps({"id": None, "status": "ready", "pid": os.getpid()}) + "\n")
+    protocol_out.flush()
+
+    serve(sys.stdin, protocol_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,13 @@
 
 import sys
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import Dict, List, Union, Tuple
 import numpy as np
 from xsigmamodules.Util import (
     sabrPdeAnalytics,
     density_smoothing_type,
     blackScholes,
-    bachelier,
     zabrMixtureAnalytics,
     zabrClassicalAnalytics,
     volatility_type,
@@ -20,6 +19,9 @@ from xsigmamodules.Util import (
 )
 from xsigmamodules.Math import normalDistribution
 from xsigmamodules.util.numpy_support import numpyToXsigma
+from common.volatilityCompute import pde_implied_volatility
+from common.calibrationCache import calibration_cache
+from common.warmStart import warm_start_store
 
 @dataclass
 @dataclass
@@ -35,6 +37,8 @@ class ZabrParams:
     calibration_type: str
     dt: float = None  # Add dt attribute
     nd: float = None  # Add nd attribute
+    warm_start: bool = False  # Seed from the previous calibration of instrument
+    instrument: str = "default"
     
 
     @classmethod
@@ -66,6 +70,28 @@ class ZabrParams:
             return cls(**params)
         except ValueError as e:
             raise ValueError(f"Error parsing argument {param_names[i]}: {e}")
+
+    @classmethod
+    def from_dict(cls, values: Dict) -> 'ZabrParams':
+        """Build parameters from a JSON request, ignoring unknown keys."""
+        params = {
+            'forward': float(values['forward']),
+            'expiry': float(values['expiry']),
+            'alpha': float(values['alpha']),
+            'beta': float(values['beta']),
+            'vol_of_vol': float(values['vol_of_vol']),
+            'rho': float(values['rho']),
+            'shift': float(values.get('shift', 0.0)),
+            'gamma': float(values.get('gamma', 1.0)),
+            'calibration_type': str(values.get('calibration_type', 'classical')),
+        }
+        if params['calibration_type'] == 'pde':
+            params['dt'] = float(values['dt'])
+            params['nd'] = float(values['nd'])
+        params['warm_start'] = str(values.get('warm_start', False)).lower() in ('true', '1')
+        params['instrument'] = str(values.get('instrument', 'default'))
+        return cls(**params)
+
 class ZabrCalibrator:
     def __init__(self, params: ZabrParams):
         self.params = params
@@ -76,6 +102,19 @@ class ZabrCalibrator:
             0.004958582, 0.005357513, 0.008505604
         ])
 
+    def calibration_inputs(self, **extra) -> Dict:
+        """Everything a calibration depends on, as a calibration cache key."""
+        return {
+            # warm_start/instrument only choose the seed, which is passed in extra
+            "params": {
+                name: value for name, value in asdict(self.params).items()
+                if name not in ("warm_start", "instrument")
+            },
+            "strikes_market": self.strikes_market,
+            "vol_market": self.vol_market,
+            **extra
+        }
+
     def calibrate_classical(self) -> Dict:
         """Perform ZABR Classical calibration."""
         try:
@@ -95,8 +134,13 @@ class ZabrCalibrator:
             ])
 
             # Perform calibration
-            obj_calibrated = zabrAnalytics.calibrate(
-                obj_init, self.vol_market, strikes_replaced, N, strikes
+            obj_calibrated = calibration_cache.get_or_calibrate(
+                "zabr_classical",
+                self.calibration_inputs(N=N, grid=strikes),
+                lambda: zabrAnalytics.calibrate(
+                    obj_init, self.vol_market, strikes_replaced, N, strikes
+                ),
+                zabrClassicalAnalytics
             )
 
             # Calculate model values
@@ -138,21 +182,17 @@ class ZabrCalibrator:
             )
 
             # Perform calibration
-            obj_pde = sabrPdeAnalyticsClassic.calibrate(
-                self.vol_market, self.strikes_market, obj_pde_init
+            obj_pde = calibration_cache.get_or_calibrate(
+                "sabr_pde",
+                self.calibration_inputs(N=N),
+                lambda: sabrPdeAnalyticsClassic.calibrate(
+                    self.vol_market, self.strikes_market, obj_pde_init
+                ),
+                sabrPdeAnalyticsClassic
             )
 
             # Calculate implied volatilities
-            vol_model = np.zeros_like(self.strikes_market)
-            for i, k in enumerate(self.strikes_market):
-                is_call = 1.0 if k > self.params.forward else -1.0
-                p = obj_pde.price(k, True, density_smoothing_type.LINEAR)
-                p = p - max(is_call * (self.params.forward - k), 0.0)
-                if p > 0:
-                    vol_model[i] = bachelier.implied_volatility(
-                        self.params.forward, k, self.params.expiry,
-                        p, 1.0, is_call
-                    )
+            vol_model = pde_implied_volatility(obj_pde, self.strikes_market)
 
             return {
                 "status": "success",
@@ -172,8 +212,17 @@ class ZabrCalibrator:
     def calibrate_mixture(self) -> Dict:
         """Perform ZABR Mixture calibration."""
         try:
-            # Initialize mixture object
-            obj_init = zabrMixtureAnalytics(
+            # Initialize mixture object, from the previous calibration of the
+            # instrument at the same expiry and forward when warm-starting (the
+            # seed object carries both into the calibration)
+            seed = None
+            seed_context = {"forward": float(self.params.forward)}
+            if self.params.warm_start:
+                seed = warm_start_store.lookup(
+                    "zabr_mixture", self.params.instrument, self.params.expiry, zabrMixtureAnalytics,
+                    seed_context,
+                )
+            obj_init = seed.model if seed else zabrMixtureAnalytics(
                 self.params.expiry, self.params.forward,
                 0.0132, 0.2, 1.25, 0.2, 0.0001,
                 0.197, -0.444, 1, True
@@ -189,9 +238,25 @@ class ZabrCalibrator:
             )
 
             # Perform calibration
-            obj_calibrated = zabrAnalytics.calibrate(
-                obj_init, self.vol_market, self.strikes_market,
-                N, strikes
+            calibration_inputs = self.calibration_inputs(
+                N=N, grid=strikes, initial_guess=seed.key if seed else "default"
+            )
+            calibration_report = {"warm_start": seed is not None}
+            obj_calibrated = calibration_cache.get_or_calibrate(
+                "zabr_mixture",
+                calibration_inputs,
+                lambda: warm_start_store.run("zabr_mixture", seed, lambda: zabrAnalytics.calibrate(
+                    obj_init, self.vol_market, self.strikes_market,
+                    N, strikes
+                ), calibration_report),
+                zabrMixtureAnalytics
+            )
+            # warm_start_store.run only fills in timings on a cache miss
+            calibration_report["cached"] = "calibration_ms" not in calibration_report
+            warm_start_store.record(
+                "zabr_mixture", self.params.instrument, self.params.expiry, obj_calibrated,
+                zabrMixtureAnalytics, calibration_cache.key("zabr_mixture", calibration_inputs),
+                seed_context,
             )
 
             # Calculate model values
@@ -208,31 +273,36 @@ class ZabrCalibrator:
                     "strikes": strikes.tolist(),
                     "model_vols": output.tolist(),
                     "market_strikes": self.strikes_market.tolist(),
-                    "market_vols": self.vol_market.tolist()
+                    "market_vols": self.vol_market.tolist(),
+                    "calibration": calibration_report
                 }
             }
 
         except Exception as e:
             return {"status": "error", "data": None, "error": str(e)}
 
-def main():
-    try:
-        params = ZabrParams.from_argv(sys.argv)
-        calibrator = ZabrCalibrator(params)
+def run_calibration(params: ZabrParams) -> Dict:
+    """Dispatch to the ZabrCalibrator method for params.calibration_type."""
+    calibrator = ZabrCalibrator(params)
 
-        calibration_methods = {
-            "classical": calibrator.calibrate_classical,
-            "pde": calibrator.calibrate_pde,
-            "mixture": calibrator.calibrate_mixture
-        }
+    calibration_methods = {
+        "classical": calibrator.calibrate_classical,
+        "pde": calibrator.calibrate_pde,
+        "mixture": calibrator.calibrate_mixture
+    }
 
-        if params.calibration_type not in calibration_methods:
-            raise ValueError(
-                f"Invalid calibration type: {params.calibration_type}. "
-                f"Must be one of: {', '.join(calibration_methods.keys())}"
-            )
+    if params.calibration_type not in calibration_methods:
+        raise ValueError(
+            f"Invalid calibration type: {params.calibration_type}. "
+            f"Must be one of: {', '.join(calibration_methods.keys())}"
+        )
+
+    return calibration_methods[params.calibration_type]()
 
-        result = calibration_methods[params.calibration_type]()
+def main():
+    try:
+        params = ZabrParams.from_argv(sys.argv)
+        result = run_calibration(params)
         print(json.dumps(result))
 
     except Exception as e:
@@ -0,0 +1,74 @@
+'use strict';
+
+const { runTask } = require('./pythonWorkerPool');
+const { wantsColumnar, sendColumnar } = require('./columnarFormat');
+
+const BATCH_KINDS = ['analytical_sigma_volatility', 'volatility', 'zabr'];
+// Keep in sync with MAX_BATCH_SIZE in service/Python/batch.py
+const MAX_BATCH_SIZE = 10000;
+// A full batch is thousands of model evaluations in one worker call
+const BATCH_TIMEOUT_MS = 120000;
+
+function badRequest(message) {
+  const error = new Error(message);
+  error.status = 400;
+  return error;
+}
+
+function validateBatchParams(params) {
+  const { kind, parameter_sets: parameterSets, strikes } = params;
+
+  if (!BATCH_KINDS.includes(kind)) {
+    throw badRequest(`kind must be one of: ${BATCH_KINDS.join(', ')}`);
+  }
+  if (!Array.isArray(parameterSets) || parameterSets.length === 0) {
+    throw badRequest('parameter_sets must be a non-empty array');
+  }
+  if (parameterSets.length > MAX_BATCH_SIZE) {
+    throw badRequest(`At most ${MAX_BATCH_SIZE} parameter sets per batch`);
+  }
+  parameterSets.forEach((values, i) => {
+    if (values === null || typeof values !== 'object' || Array.isArray(values)) {
+      throw badRequest(`parameter_sets[${i}] must be an object`);
+    }
+  });
+  if (strikes !== undefined) {
+    if (!Array.isArray(strikes) || strikes.length === 0 || strikes.some((k) => typeof k !== 'number')) {
+      throw badRequest('strikes must be a non-empty array of numbers');
+    }
+  }
+}
+
+/**
+ * Evaluate many parameter sets on one shared strike grid in a single worker call
+ */
+exports.runBatch = async function(req, res) {
+  try {
+    const params = req.body || {};
+    validateBatchParams(params);
+
+    console.log(`Running ${params.kind} batch of ${params.parameter_sets.length} parameter sets`);
+
+    if (wantsColumnar(req)) {
+      const payload = await runTask('batch', params, { timeoutMs: BATCH_TIMEOUT_MS, format: 'columnar' });
+      return sendColumnar(res, payload);
+    }
+
+    const result = await runTask('batch', params, { timeoutMs: BATCH_TIMEOUT_MS });
+    return res.json({
+      status: 'success',
+      data: result,
+      error: null
+    });
+  } catch (error) {
+    if (!error.status) {
+      error.status = 500;
+    }
+    console.error('[Error]', error);
+    res.status(error.status).json({
+      status: 'error',
+      data: null,
+      error: error.message
+    });
+  }
+};
@@ -0,0 +1,106 @@
+'use strict';
+
+const os = require('os');
+
+/**
+ * Binary columnar results from the Python workers.
+ *
+ * Layout (see service/Python/common/columnarFormat.py): 4-byte magic
+ * "XSC1", uint32 LE header length, JSON header {data, arrays}, zero padding
+ * to 8 bytes, then little-endian float64 buffers at 8-byte aligned offsets.
+ * Inside data, {"$array": i} stands for the i-th buffer.
+ */
+
+const MAGIC = 'XSC1';
+const ALIGNMENT = 8;
+const CONTENT_TYPE = 'application/vnd.xsigma.columnar';
+const LITTLE_ENDIAN = os.endianness() === 'LE';
+
+function padding(size) {
+  return (ALIGNMENT - (size % ALIGNMENT)) % ALIGNMENT;
+}
+
+function float64View(buffer, start, length) {
+  const byteOffset = buffer.byteOffset + start;
+  if (LITTLE_ENDIAN && byteOffset % ALIGNMENT === 0) {
+    return new Float64Array(buffer.buffer, byteOffset, length);
+  }
+  // Pooled Buffers can start at any offset, and typed arrays use the
+  // platform byte order, so copy in those cases
+  const values = new Float64Array(length);
+  for (let i = 0; i < length; i++) {
+    values[i] = buffer.readDoubleLE(start + i * 8);
+  }
+  return values;
+}
+
+function reshape(values, shape) {
+  if (shape.length <= 1) {
+    return values;
+  }
+  const [rows, ...rest] = shape;
+  const rowLength = rest.reduce((a, b) => a * b, 1);
+  return Array.from({ length: rows }, (_, i) =>
+    reshape(values.subarray(i * rowLength, (i + 1) * rowLength), rest)
+  );
+}
+
+/**
+ * Decode a columnar payload; arrays become Float64Array views over buffer
+ * (nested arrays of row views for 2-D and higher)
+ * @param {Buffer} buffer - Payload as sent by the worker
+ * @returns {Object} The handler's data
+ */
+function decode(buffer) {
+  if (buffer.length < 8 || buffer.toString('latin1', 0, 4) !== MAGIC) {
+    throw new Error('Not a columnar payload');
+  }
+  const headerLength = buffer.readUInt32LE(4);
+  const header = JSON.parse(buffer.toString('utf8', 8, 8 + headerLength));
+  const start = 8 + headerLength + padding(8 + headerLength);
+
+  const arrays = header.arrays.map(({ offset, shape }) => {
+    const length = shape.reduce((a, b) => a * b, 1);
+    return reshape(float64View(buffer, start + offset, length), shape);
+  });
+
+  const walk = (value) => {
+    if (Array.isArray(value)) {
+      return value.map(walk);
+    }
+    if (value !== null && typeof value === 'object') {
+      const keys = Object.keys(value);
+      if (keys.length === 1 && keys[0] === '$array') {
+        return arrays[value.$array];
+      }
+      const result = {};
+      keys.forEach((key) => { result[key] = walk(value[key]); });
+      return result;
+    }
+    return value;
+  };
+  return walk(header.data);
+}
+
+/**
+ * Whether the client asked for the binary columnar format
+ */
+function wantsColumnar(req) {
+  const accept = (req.get && req.get('Accept')) || '';
+  return accept.includes(CONTENT_TYPE);
+}
+
+/**
+ * Forward a worker payload to the client without decoding it
+ */
+function sendColumnar(res, payload) {
+  res.set('Content-Type', CONTENT_TYPE);
+  return res.end(payload);
+}
+
+module.exports = {
+  CONTENT_TYPE,
+  decode,
+  wantsColumnar,
+  sendColumnar
+};
@@ -2,6 +2,7 @@
 'use strict';
 
 const dotenv = require('dotenv');
+const os = require('os');
 const path = require('path');
 
 // Load environment variables from .env file
@@ -25,7 +26,33 @@ const CONFIG = {
       ? 'C:/dev/build_ninja_avx2_python_sphinx/lib/python3.11/site-packages/xsigmamodules'
       : '/usr/local/lib/python3.11/site-packages/xsigmamodules'),
     PYTHON_SERVICE_PATH: process.env.PYTHON_SERVICE_PATH || path.join(__dirname, 'Python'),
-    PYTHON_COMMON_PATH: process.env.PYTHON_COMMON_PATH || path.join(__dirname, 'Python', 'common')
+    PYTHON_COMMON_PATH: process.env.PYTHON_COMMON_PATH || path.join(__dirname, 'Python', 'common'),
+    // Shared by the Python result caches (baseline curves, calibrations, ...)
+    CACHE_DIR: process.env.XSIGMA_CACHE_DIR || path.join(os.tmpdir(), 'xsigma-cache'),
+    // On-disk budget for calibrated models shared by all Python processes
+    CALIBRATION_CACHE_MB: parseInt(process.env.XSIGMA_CALIBRATION_CACHE_MB, 10) || 256,
+    // Pool processes per HJM/FX script run; half the CPUs so that an HJM and
+    // an FX run together do not oversubscribe the host
+    SIMULATION_WORKERS: parseInt(process.env.XSIGMA_SIMULATION_WORKERS, 10) || Math.max(1, Math.floor(os.cpus().length / 2)),
+    // How often long HJM/FX runs checkpoint their progress for resume=true
+    CHECKPOINT_SECONDS: parseFloat(process.env.XSIGMA_CHECKPOINT_SECONDS) || 30,
+    // Pre-forked compute workers shared by all endpoints
+    WORKER_POOL: {
+      SIZE: parseInt(process.env.PYTHON_WORKER_POOL_SIZE, 10) || os.cpus().length,
+      MAX_QUEUE_DEPTH: parseInt(process.env.PYTHON_WORKER_QUEUE_DEPTH, 10) || 100,
+      // Maximum concurrent jobs per endpoint; "default" applies to the rest
+      ENDPOINT_CONCURRENCY: {
+        default: parseInt(process.env.PYTHON_WORKER_POOL_SIZE, 10) || os.cpus().length,
+        asv_calibration: 2,
+        // Fans out to its own process pool
+        asv_surface_calibration: 1,
+        zabr_calibration: 2,
+        // One batch can occupy a worker for a long time
+        batch: 2,
+        hjm: 1,
+        fx_mhjm: 1
+      }
+    }
   },
   VALID_COMPUTATION_TYPES: ['volatility_asv', 'density', 'volatility_svi'],
   REQUIRED_PARAMS: [
@@ -33,6 +60,11 @@ const CONFIG = {
     'beta', 'rho', 'volvol', 'computationType'
   ],
   NUMERIC_PARAMS: ['n', 'spot', 'expiry', 'r', 'q', 'beta', 'rho', 'volvol'],
+  // Passed through to the calibration when present
+  OPTIONAL_PARAMS: ['warm_start', 'instrument', 'solver', 'solver_settings'],
+  // Calibration backends accepted from requests (common/solverOptions.py
+  // VERIFIED_SOLVERS); lm and nlopt wait for their bindings to be verified
+  SUPPORTED_SOLVERS: ['ceres'],
   // New detailed parameter validation rules
   PARAM_RULES: {
     n: { type: 'integer', min: 1, max: 10000, description: 'Number of points for calculation' },
@@ -90,6 +122,18 @@ function validateParams(params) {
       throw new Error(`Parameter ${param} must be one of: ${rules.enum.join(', ')} (${rules.description})`);
     }
   }
+  validateSolver(params.solver);
+}
+
+/**
+ * Reject calibration solvers that are not supported yet
+ * @param {string|undefined} solver - Requested solver, if any
+ * @throws {Error} If the solver is not supported
+ */
+function validateSolver(solver) {
+  if (solver !== undefined && !CONFIG.SUPPORTED_SOLVERS.includes(solver)) {
+    throw new Error(`Parameter solver must be one of: ${CONFIG.SUPPORTED_SOLVERS.join(', ')}`);
+  }
 }
 
 // Helper function to get Python process environment
@@ -105,6 +149,10 @@ function getPythonEnv() {
     ...process.env,
     PYTHONPATH: pythonPaths,
     XSIGMA_DATA_ROOT: CONFIG.PYTHON.DATA_ROOT,
+    XSIGMA_CACHE_DIR: CONFIG.PYTHON.CACHE_DIR,
+    XSIGMA_CALIBRATION_CACHE_MB: String(CONFIG.PYTHON.CALIBRATION_CACHE_MB),
+    XSIGMA_CHECKPOINT_SECONDS: String(CONFIG.PYTHON.CHECKPOINT_SECONDS),
+    XSIGMA_SIMULATION_WORKERS: String(CONFIG.PYTHON.SIMULATION_WORKERS),
     PYTHONUNBUFFERED: '1'
   };
 }
@@ -112,5 +160,6 @@ function getPythonEnv() {
 module.exports = {
   CONFIG,
   validateParams,
+  validateSolver,
   getPythonEnv
 };
\ No newline at end of file
@@ -3,8 +3,10 @@
 
 const path = require('path');
 const fs = require('fs');
+const readline = require('readline');
 const { spawn } = require('child_process');
 const { CONFIG, getPythonEnv } = require('./config');
+const { limitConcurrency } = require('./pythonWorkerPool');
 
 exports.getHjmCalibration = async function(req, res) {
   try {
@@ -39,75 +41,164 @@ exports.getHjmCalibration = async function(req, res) {
     // Increase timeout for test 2
     const timeout = req.query.test === '2' ? 120000 : CONFIG.PYTHON.TIMEOUT_MS;
 
-    // Create Python process using centralized configuration
-    const pythonProcess = spawn(CONFIG.PYTHON.EXECUTABLE, [pythonScriptPath, test.toString()], {
-      env: getPythonEnv(),
-      cwd: path.dirname(pythonScriptPath),
-      stdio: ['pipe', 'pipe', 'pipe']
-    });
+    // Stored parameters for the valuation date are reused unless asked otherwise
+    const args = [test.toString()];
+    if (String(req.query.recalibrate) === 'true') {
+      args.push('--recalibrate');
+    }
+    if (req.query.expiries !== undefined) {
+      const expiries = String(req.query.expiries);
+      if (!/^\d+(,\d+)*$/.test(expiries)) {
+        const error = new Error('expiries must be comma-separated expiry indices, e.g. 0,2,5');
+        error.status = 400;
+        throw error;
+      }
+      args.push('--expiries', expiries);
+    }
+    // Continue from the checkpoint of an identical request that timed out
+    if (String(req.query.resume) === 'true') {
+      args.push('--resume');
+    }
 
-    let dataString = '';
-    let errorString = '';
+    if (String(req.query.stream) === 'true') {
+      return streamHjmScript(req, res, pythonScriptPath, args, timeout);
+    }
 
-    pythonProcess.stdout.on('data', (data) => {
-      const output = data.toString();
-      console.log('Python stdout:', output);
-      dataString += output;
-    });
+    // Queue behind other simulations so bursts do not fork unbounded processes
+    const result = await limitConcurrency('hjm', () =>
+      runHjmScript(pythonScriptPath, args, timeout)
+    );
+    const { event, total_ms: totalMs, ...response } = result;
+    return res.json(response);
+  } catch (error) {
+    if (!error.status) {
+      error.status = 500;
+    }
+    throw error;
+  }
+};
 
-    pythonProcess.stderr.on('data', (data) => {
-      const error = data.toString();
-      console.error('Python stderr:', error);
-      errorString += error;
-    });
+/**
+ * Run HJM.py with the NDJSON events forwarded to the client as they arrive.
+ * The run is killed if the client disconnects before the result event.
+ */
+async function streamHjmScript(req, res, pythonScriptPath, args, timeout) {
+  let child = null;
+  let finished = false;
+  const cancel = () => {
+    if (!finished && child) {
+      console.log('Client disconnected, cancelling HJM run');
+      child.kill();
+    }
+  };
+  res.on('close', cancel);
+
+  res.status(200);
+  res.set('Content-Type', 'application/x-ndjson');
+  res.set('Cache-Control', 'no-cache');
+  res.flushHeaders();
 
-    await new Promise((resolve, reject) => {
-      pythonProcess.on('close', (code) => {
-        console.log('Python process exited with code:', code);
-        if (code !== 0) {
-          const error = new Error(
-            `Python process exited with code ${code}\n` +
-            `Error: ${errorString}`
-          );
-          error.status = 500;
-          reject(error);
-        } else {
-          resolve();
+  try {
+    await limitConcurrency('hjm', () => {
+      // The client may have gone while the request was queued
+      if (res.writableEnded || res.destroyed) {
+        return null;
+      }
+      return runHjmScript(pythonScriptPath, args, timeout, {
+        onSpawn: (process) => { child = process; },
+        onEvent: (event) => {
+          if (!res.destroyed) {
+            res.write(JSON.stringify(event) + '\n');
+          }
         }
       });
+    });
+  } catch (error) {
+    if (!res.destroyed) {
+      res.write(JSON.stringify({ event: 'result', status: 'error', data: null, error: error.message }) + '\n');
+    }
+  } finally {
+    finished = true;
+    res.end();
+  }
+}
 
-      pythonProcess.on('error', (error) => {
-        console.error('Failed to start Python process:', error);
-        error.status = 500;
-        reject(new Error(`Failed to start XSigma Python process: ${error.message}`));
-      });
+/**
+ * Run HJM.py and resolve with its final result event.
+ * stdout carries one JSON event per line (see common/progressEvents.py);
+ * options.onEvent receives every event and options.onSpawn the process.
+ */
+function runHjmScript(pythonScriptPath, args, timeout, options = {}) {
+  // Create Python process using centralized configuration
+  const pythonProcess = spawn(CONFIG.PYTHON.EXECUTABLE, [pythonScriptPath, ...args], {
+    env: getPythonEnv(),
+    cwd: path.dirname(pythonScriptPath),
+    stdio: ['pipe', 'pipe', 'pipe']
+  });
+  if (options.onSpawn) {
+    options.onSpawn(pythonProcess);
+  }
 
-      setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error(`Python process timed out after ${timeout/1000} seconds`));
-      }, timeout);
-    });
+  let result = null;
+  let errorString = '';
 
+  readline.createInterface({ input: pythonProcess.stdout }).on('line', (line) => {
+    let event;
     try {
-      // Find the last valid JSON in the output
-      const jsonMatch = dataString.match(/\{[\s\S]*\}/g);
-      if (!jsonMatch) {
-        throw new Error('No valid JSON found in output');
-      }
-      const lastJson = jsonMatch[jsonMatch.length - 1];
-      const result = JSON.parse(lastJson);
-      return res.json(result);
+      event = JSON.parse(line);
     } catch (e) {
-      console.error('Failed to parse Python output:', e);
-      console.error('Raw output:', dataString);
-      const error = new Error(`Invalid Python output: ${e.toString()}\nRaw output: ${dataString}`);
-      error.status = 500;
-      throw error;
+      console.log('Python stdout:', line);
+      return;
     }
-  } catch (error) {
-    if (!error.status) {
-      error.status = 500;
+    if (event.event === 'result') {
+      result = event;
+    } else {
+      console.log('HJM event:', line);
     }
-    throw error;
-  }
-};
\ No newline at end of file
+    if (options.onEvent) {
+      options.onEvent(event);
+    }
+  });
+
+  pythonProcess.stderr.on('data', (data) => {
+    const error = data.toString();
+    console.error('Python stderr:', error);
+    errorString += error;
+  });
+
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      pythonProcess.kill();
+      const error = new Error(`Python process timed out after ${timeout/1000} seconds`);
+      error.status = 504;
+      reject(error);
+    }, timeout);
+
+    pythonProcess.on('close', (code, signal) => {
+      clearTimeout(timer);
+      console.log('Python process exited with code:', code);
+      if (code !== 0) {
+        const error = new Error(
+          `Python process exited with code ${code}${signal ? ` (${signal})` : ''}\n` +
+          `Error: ${errorString}`
+        );
+        error.status = 500;
+        reject(error);
+      } else if (!result) {
+        const error = new Error(`No result event in Python output\nError: ${errorString}`);
+        error.status = 500;
+        reject(error);
+      } else {
+        resolve(result);
+      }
+    });
+
+    pythonProcess.on('error', (error) => {
+      clearTimeout(timer);
+      console.error('Failed to start Python process:', error);
+      const startError = new Error(`Failed to start XSigma Python process: ${error.message}`);
+      startError.status = 500;
+      reject(startError);
+    });
+  });
+}
@@ -0,0 +1,216 @@
+'use strict';
+
+const path = require('path');
+const { spawn } = require('child_process');
+const { CONFIG, getPythonEnv } = require('./config');
+
+const WORKER_SCRIPT = path.join(__dirname, 'Python', 'compute_worker.py');
+
+function createError(message, status = 500, name = 'PythonWorkerError') {
+  const error = new Error(message);
+  error.name = name;
+  error.status = status;
+  return error;
+}
+
+/**
+ * Long-lived Python process running compute_worker.py.
+ * Requests are written to stdin as JSON lines and matched to the
+ * responses on stdout by id, so numpy and xsigmamodules are only
+ * imported once instead of once per HTTP request. A columnar response
+ * line is followed by its binary payload, which is resolved as a Buffer.
+ */
+class PythonWorker {
+  constructor(name = 'worker') {
+    this.name = name;
+    this.process = null;
+    this.pending = new Map();
+    this.nextId = 1;
+    this.resetStdout();
+  }
+
+  resetStdout() {
+    this.lineChunks = [];
+    // Header line of the columnar payload being received, and its chunks
+    this.payloadHeader = null;
+    this.payloadChunks = [];
+    this.payloadLength = 0;
+  }
+
+  start() {
+    if (this.process) {
+      return;
+    }
+
+    const child = spawn(CONFIG.PYTHON.EXECUTABLE, [WORKER_SCRIPT], {
+      env: getPythonEnv(),
+      cwd: path.dirname(WORKER_SCRIPT),
+      stdio: ['pipe', 'pipe', 'pipe']
+    });
+
+    this.resetStdout();
+    // Events of a stopped child must not touch the framing state or the
+    // pending requests of its replacement
+    child.stdout.on('data', (chunk) => {
+      if (this.process === child) {
+        this.handleData(chunk);
+      }
+    });
+
+    child.stderr.on('data', (data) => {
+      console.error(`[Python ${this.name} stderr]:`, data.toString());
+    });
+
+    child.on('exit', (code, signal) => {
+      console.log(`[Python ${this.name}] exited with code ${code}${signal ? ` (${signal})` : ''}`);
+      if (this.process !== child) {
+        return;
+      }
+      this.process = null;
+      this.rejectAll(createError(`Python worker exited with code ${code}`));
+    });
+
+    // A write to a child that already exited fails with EPIPE; without a
+    // listener that error would take down the whole server
+    child.stdin.on('error', (error) => {
+      console.error(`[Python ${this.name}] stdin error:`, error);
+      if (this.process !== child) {
+        return;
+      }
+      this.process = null;
+      child.kill();
+      this.rejectAll(createError(`Python worker stdin failed: ${error.message}`));
+    });
+
+    child.on('error', (error) => {
+      console.error(`[Python ${this.name}] failed to start:`, error);
+      if (this.process !== child) {
+        return;
+      }
+      this.process = null;
+      this.rejectAll(createError(`Failed to start XSigma Python worker: ${error.message}`));
+    });
+
+    this.process = child;
+  }
+
+  stop() {
+    if (this.process) {
+      const child = this.process;
+      this.process = null;
+      child.kill();
+      // Requests sent to the killed child will never be answered
+      this.rejectAll(createError('Python worker was restarted'));
+      this.resetStdout();
+    }
+  }
+
+  handleData(chunk) {
+    while (chunk.length) {
+      if (this.payloadHeader) {
+        // Collect chunks and concatenate once, so large payloads are copied once
+        const needed = this.payloadHeader.bytes - this.payloadLength;
+        const part = chunk.subarray(0, needed);
+        this.payloadChunks.push(part);
+        this.payloadLength += part.length;
+        chunk = chunk.subarray(part.length);
+        if (this.payloadLength === this.payloadHeader.bytes) {
+          const message = { ...this.payloadHeader, data: Buffer.concat(this.payloadChunks, this.payloadLength) };
+          this.payloadHeader = null;
+          this.payloadChunks = [];
+          this.payloadLength = 0;
+          this.handleMessage(message);
+        }
+        continue;
+      }
+
+      const newline = chunk.indexOf(0x0a);
+      if (newline === -1) {
+        this.lineChunks.push(chunk);
+        return;
+      }
+      this.lineChunks.push(chunk.subarray(0, newline));
+      const line = Buffer.concat(this.lineChunks).toString('utf8');
+      this.lineChunks = [];
+      chunk = chunk.subarray(newline + 1);
+      this.handleLine(line);
+    }
+  }
+
+  handleLine(line) {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (e) {
+      console.log(`[Python ${this.name} stdout]:`, line);
+      return;
+    }
+
+    if (message.status === 'ready') {
+      console.log(`[Python ${this.name}] ready (pid ${message.pid})`);
+      return;
+    }
+
+    if (message.format === 'columnar' && message.bytes > 0) {
+      this.payloadHeader = message;
+      return;
+    }
+
+    this.handleMessage(message);
+  }
+
+  handleMessage(message) {
+    const entry = this.pending.get(message.id);
+    if (!entry) {
+      return;
+    }
+    this.pending.delete(message.id);
+    clearTimeout(entry.timer);
+
+    if (message.status === 'success') {
+      entry.resolve(message.data);
+    } else {
+      entry.reject(createError(message.error || 'Python worker request failed'));
+    }
+  }
+
+  rejectAll(error) {
+    for (const entry of this.pending.values()) {
+      clearTimeout(entry.timer);
+      entry.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  /**
+   * Send one request to the worker
+   * @param {string} method - Handler name in compute_worker.HANDLERS
+   * @param {Object} params - JSON-serializable parameters
+   * @param {number} timeoutMs - Time allowed before the worker is restarted
+   * @param {string} [format] - 'columnar' to receive the data as a binary payload
+   * @returns {Promise<Object|Buffer>} The handler's data, or its columnar payload
+   */
+  call(method, params, timeoutMs = CONFIG.PYTHON.TIMEOUT_MS, format = undefined) {
+    this.start();
+
+    return new Promise((resolve, reject) => {
+      const id = this.nextId++;
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(createError(
+          `Python process timed out after ${timeoutMs / 1000} seconds`, 504, 'TimeoutError'
+        ));
+        // The worker answers requests one at a time, so a stuck request
+        // would block everything queued behind it
+        this.stop();
+      }, timeoutMs);
+
+      this.pending.set(id, { resolve, reject, timer });
+      this.process.stdin.write(JSON.stringify({ id, method, params, format }) + '\n');
+    });
+  }
+}
+
+module.exports = {
+  PythonWorker
+};
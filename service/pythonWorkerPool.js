@@ -0,0 +1,177 @@
+'use strict';
+
+const { CONFIG } = require('./config');
+const { PythonWorker } = require('./pythonWorker');
+
+/**
+ * Raised when a request cannot be queued; surfaced to clients as HTTP 429
+ */
+class QueueFullError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = 'QueueFullError';
+    this.status = 429;
+  }
+}
+
+/**
+ * Raised for queued requests when the pool is stopped; surfaced to clients
+ * as HTTP 503
+ */
+class PoolStoppedError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = 'PoolStoppedError';
+    this.status = 503;
+  }
+}
+
+/**
+ * Fixed pool of pre-forked Python workers with per-endpoint concurrency
+ * limits and a bounded admission queue.
+ *
+ * Jobs are either worker tasks (run on an idle PythonWorker) or exclusive
+ * jobs (a function that spawns its own process, e.g. the HJM and FX
+ * simulations). Both count against their endpoint's limit, so a burst of
+ * requests waits in the queue or is rejected instead of forking one
+ * interpreter per request.
+ */
+class PythonWorkerPool {
+  constructor({ size, maxQueueDepth, endpointConcurrency }) {
+    this.size = size;
+    this.maxQueueDepth = maxQueueDepth;
+    this.endpointConcurrency = endpointConcurrency;
+    this.workers = [];
+    this.idle = [];
+    this.queue = [];
+    this.active = {};
+  }
+
+  start() {
+    if (this.workers.length) {
+      return;
+    }
+    for (let i = 0; i < this.size; i++) {
+      const worker = new PythonWorker(`worker ${i + 1}`);
+      worker.start();
+      this.workers.push(worker);
+      this.idle.push(worker);
+    }
+    console.log(`Python worker pool started with ${this.size} workers`);
+  }
+
+  stop() {
+    this.workers.forEach((worker) => worker.stop());
+    this.workers = [];
+    this.idle = [];
+    // Queued jobs would otherwise wait forever for a worker
+    const queued = this.queue;
+    this.queue = [];
+    queued.forEach((job) => job.reject(new PoolStoppedError('Python worker pool stopped, retry later')));
+  }
+
+  limitFor(endpoint) {
+    const limits = this.endpointConcurrency;
+    return limits[endpoint] !== undefined ? limits[endpoint] : limits.default;
+  }
+
+  enqueue(job) {
+    if (this.queue.length >= this.maxQueueDepth) {
+      return Promise.reject(new QueueFullError(
+        `Server busy: ${this.queue.length} requests already queued, retry later`
+      ));
+    }
+    return new Promise((resolve, reject) => {
+      this.queue.push({ ...job, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  /**
+   * Run a compute_worker handler on the next idle worker
+   */
+  run(method, params, options = {}) {
+    this.start();
+    return this.enqueue({
+      endpoint: options.endpoint || method,
+      execute: (worker) => worker.call(method, params, options.timeoutMs, options.format),
+      needsWorker: true
+    });
+  }
+
+  /**
+   * Run fn() once the endpoint is below its concurrency limit
+   */
+  runExclusive(endpoint, fn) {
+    return this.enqueue({ endpoint, execute: fn, needsWorker: false });
+  }
+
+  dispatch() {
+    for (let i = 0; i < this.queue.length; i++) {
+      const job = this.queue[i];
+      if ((this.active[job.endpoint] || 0) >= this.limitFor(job.endpoint)) {
+        continue;
+      }
+      if (job.needsWorker && !this.idle.length) {
+        continue;
+      }
+
+      this.queue.splice(i, 1);
+      i--;
+
+      const worker = job.needsWorker ? this.idle.shift() : null;
+      this.active[job.endpoint] = (this.active[job.endpoint] || 0) + 1;
+
+      Promise.resolve()
+        .then(() => job.execute(worker))
+        .then(job.resolve, job.reject)
+        .finally(() => {
+          this.active[job.endpoint]--;
+          // A worker of a stopped pool must not come back as idle
+          if (worker && this.workers.includes(worker)) {
+            this.idle.push(worker);
+          }
+          this.dispatch();
+        });
+    }
+  }
+
+  stats() {
+    return {
+      size: this.workers.length,
+      idle: this.idle.length,
+      queued: this.queue.length,
+      active: { ...this.active }
+    };
+  }
+}
+
+const sharedPool = new PythonWorkerPool({
+  size: CONFIG.PYTHON.WORKER_POOL.SIZE,
+  maxQueueDepth: CONFIG.PYTHON.WORKER_POOL.MAX_QUEUE_DEPTH,
+  endpointConcurrency: CONFIG.PYTHON.WORKER_POOL.ENDPOINT_CONCURRENCY
+});
+
+/**
+ * Run a compute_worker handler on the shared pool
+ */
+function runTask(method, params, options = {}) {
+  return sharedPool.run(method, params, options);
+}
+
+/**
+ * Run a job that manages its own Python process under the shared
+ * pool's endpoint limits and queue
+ */
+function limitConcurrency(endpoint, fn) {
+  return sharedPool.runExclusive(endpoint, fn);
+}
+
+module.exports = {
+  PythonWorkerPool,
+  QueueFullError,
+  PoolStoppedError,
+  pool: sharedPool,
+  runTask,
+  limitConcurrency
+};
@@ -1,9 +1,6 @@
 'use strict';
 
-const path = require('path');
-const fs = require('fs');
-const { spawn } = require('child_process');
-const { CONFIG, getPythonEnv } = require('./config');
+const { runTask } = require('./pythonWorkerPool');
 
 exports.getVolatilityData_asv = async function(req, res) {
   try {
@@ -20,96 +17,13 @@ exports.getVolatilityData_asv = async function(req, res) {
       call: parseFloat(req.query.call || 0.0001)
     };
 
-    // Get absolute paths
-    const projectRoot = path.resolve(__dirname, '..');
-    const pythonScriptPath = path.join(projectRoot, 'service', 'Python', 'volatility.py');
-    
-    // Verify Python script exists
-    if (!fs.existsSync(pythonScriptPath)) {
-      console.error('Python script not found at:', pythonScriptPath);
-      const error = new Error(`Python script not found at: ${pythonScriptPath}`);
-      error.status = 500;
-      throw error;
-    }
-
-    console.log('Executing volatility_asv with:');
-    console.log('XSigma Python Path:', CONFIG.PYTHON.EXECUTABLE);
-    console.log('Script Path:', pythonScriptPath);
-    console.log('Parameters:', params);
-
-    // Create Python process using centralized configuration
-    const pythonProcess = spawn(
-      CONFIG.PYTHON.EXECUTABLE, 
-      [pythonScriptPath, JSON.stringify(params)], 
-      {
-        env: getPythonEnv(),
-        cwd: path.dirname(pythonScriptPath),
-        stdio: ['pipe', 'pipe', 'pipe']
-      }
-    );
-
-    let dataString = '';
-    let errorString = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      const output = data.toString();
-      console.log('Python stdout:', output);
-      dataString += output;
-    });
+    console.log('Executing volatility_asv on the Python worker with parameters:', params);
 
-    pythonProcess.stderr.on('data', (data) => {
-      const error = data.toString();
-      console.error('Python stderr:', error);
-      errorString += error;
+    const result = await runTask('volatility_asv', params);
+    return res.json({
+      status: 'success',
+      data: result
     });
-
-    await new Promise((resolve, reject) => {
-      pythonProcess.on('close', (code) => {
-        console.log('Python process exited with code:', code);
-        if (code !== 0) {
-          const error = new Error(
-            `Python process exited with code ${code}\n` +
-            `Error: ${errorString}`
-          );
-          error.status = 500;
-          reject(error);
-        } else {
-          resolve();
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        console.error('Failed to start Python process:', error);
-        error.status = 500;
-        reject(new Error(`Failed to start XSigma Python process: ${error.message}`));
-      });
-
-      // Add timeout
-      setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error('Python process timed out after 30 seconds'));
-      }, 30000);
-    });
-
-    try {
-      // Find the last valid JSON in the output
-      const jsonMatch = dataString.match(/\{[\s\S]*\}/g);
-      if (!jsonMatch) {
-        throw new Error('No valid JSON found in output');
-      }
-      const lastJson = jsonMatch[jsonMatch.length - 1];
-      const result = JSON.parse(lastJson);
-      return res.json({
-        status: 'success',
-        data: result
-      });
-    } catch (e) {
-      console.error('Failed to parse Python output:', e);
-      console.error('Raw output:', dataString);
-      const error = new Error(`Invalid Python output: ${e.toString()}\nRaw output: ${dataString}`);
-      error.status = 500;
-      throw error;
-    }
   } catch (error) {
     if (!error.status) {
       error.status = 500;
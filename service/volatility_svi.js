@@ -1,9 +1,6 @@
 'use strict';
 
-const path = require('path');
-const fs = require('fs');
-const { spawn } = require('child_process');
-const { CONFIG, getPythonEnv } = require('./config');
+const { runTask } = require('./pythonWorkerPool');
 
 // Parameter validation rules
 const PARAM_RULES = {
@@ -45,92 +42,12 @@ exports.getVolatilityDataSvi = async function(req, res) {
     // Extract parameters from request
     const params = processParameters(req.query);
 
-    // Get absolute paths
-    const projectRoot = path.resolve(__dirname, '..');
-    const pythonScriptPath = path.join(projectRoot, 'service', 'Python', 'volatility_svi.py');
-    
-    // Verify Python script exists
-    if (!fs.existsSync(pythonScriptPath)) {
-      console.error('Python script not found at:', pythonScriptPath);
-      throw new Error(`Python script not found at: ${pythonScriptPath}`);
-    }
+    console.log('Executing volatility_svi on the Python worker with parameters:', params);
 
-    console.log('Executing with:', {
-      pythonPath: CONFIG.PYTHON.EXECUTABLE,
-      scriptPath: pythonScriptPath,
-      params: params
-    });
-
-    // Create Python process using centralized configuration
-    const pythonProcess = spawn(
-      CONFIG.PYTHON.EXECUTABLE, 
-      [pythonScriptPath, JSON.stringify(params)], 
-      {
-        env: getPythonEnv(),
-        cwd: path.dirname(pythonScriptPath),
-        stdio: ['pipe', 'pipe', 'pipe']
-      }
-    );
-
-    let dataString = '';
-    let errorString = '';
-
-    // Handle stdout data
-    pythonProcess.stdout.on('data', (data) => {
-      const output = data.toString();
-      console.log('Python stdout:', output);
-      dataString += output;
-    });
-
-    // Handle stderr data
-    pythonProcess.stderr.on('data', (data) => {
-      const error = data.toString();
-      console.error('Python stderr:', error);
-      errorString += error;
-    });
-
-    // Wait for process completion
-    await new Promise((resolve, reject) => {
-      // Handle process completion
-      pythonProcess.on('close', (code) => {
-        console.log('Python process exited with code:', code);
-        if (code !== 0) {
-          reject(new Error(`Python process failed with code ${code}\nError: ${errorString}`));
-          return;
-        }
-
-        try {
-          // Find the last valid JSON in the output
-          const jsonMatch = dataString.match(/\{[\s\S]*\}/g);
-          if (!jsonMatch) {
-            throw new Error('No valid JSON found in output');
-          }
-          const lastJson = jsonMatch[jsonMatch.length - 1];
-          const result = JSON.parse(lastJson);
-          
-          res.json({
-            status: 'success',
-            data: result
-          });
-          resolve();
-        } catch (e) {
-          console.error('Failed to parse Python output:', e);
-          console.error('Raw output:', dataString);
-          reject(new Error(`Invalid Python output: ${e.toString()}\nRaw output: ${dataString}`));
-        }
-      });
-
-      // Handle process errors
-      pythonProcess.on('error', (error) => {
-        console.error('Failed to start Python process:', error);
-        reject(new Error(`Failed to start Python process: ${error.message}`));
-      });
-
-      // Set timeout using CONFIG
-      setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error(`Python process timed out after ${CONFIG.PYTHON.TIMEOUT_MS / 1000} seconds`));
-      }, CONFIG.PYTHON.TIMEOUT_MS);
+    const result = await runTask('volatility_svi', params);
+    res.json({
+      status: 'success',
+      data: result
     });
 
   } catch (error) {
@@ -1,9 +1,6 @@
 'use strict';
 
-const path = require('path');
-const fs = require('fs');
-const { spawn } = require('child_process');
-const { CONFIG, getPythonEnv } = require('./config');
+const { runTask } = require('./pythonWorkerPool');
 
 exports.getVolatilityData_classical = async function(req, res) {
   try {
@@ -119,98 +116,13 @@ exports.getVolatilityData_pde = async function(req, res) {
 };
 
 async function executePythonScript(params, res) {
-  // Get absolute paths
-  const projectRoot = path.resolve(__dirname, '..');
-  const pythonScriptPath = path.join(projectRoot, 'service', 'Python', 'zabr_analytics.py');
-  
-  // Verify Python script exists
-  if (!fs.existsSync(pythonScriptPath)) {
-    throw createError(`Python script not found at: ${pythonScriptPath}`, 500);
-  }
-
-  console.log('Executing with:');
-  console.log('XSigma Python Path:', CONFIG.PYTHON.EXECUTABLE);
-  console.log('Script Path:', pythonScriptPath);
-  console.log('Working Directory:', path.dirname(pythonScriptPath));
-  console.log('Parameters:', params);
-
-  // Create Python process using the centralized configuration
-  const pythonProcess = spawn(
-    CONFIG.PYTHON.EXECUTABLE, 
-    [pythonScriptPath, JSON.stringify(params)], 
-    {
-      env: getPythonEnv(),
-      cwd: path.dirname(pythonScriptPath),
-      stdio: ['pipe', 'pipe', 'pipe']
-    }
-  );
-
-  let dataString = '';
-  let errorString = '';
+  console.log('Computing ZABR analytics on the Python worker with parameters:', params);
 
-  pythonProcess.stdout.on('data', (data) => {
-    const output = data.toString();
-    console.log('Python stdout:', output);
-    dataString += output;
+  const result = await runTask('zabr_analytics', params);
+  return res.json({
+    status: 'success',
+    data: result
   });
-
-  pythonProcess.stderr.on('data', (data) => {
-    const error = data.toString();
-    console.error('Python stderr:', error);
-    errorString += error;
-  });
-
-  await new Promise((resolve, reject) => {
-    pythonProcess.on('close', (code) => {
-      console.log('Python process exited with code:', code);
-      if (code !== 0) {
-        reject(createError(
-          `Python process exited with code ${code}\nError: ${errorString}`,
-          500
-        ));
-      } else {
-        resolve();
-      }
-    });
-
-    pythonProcess.on('error', (error) => {
-      console.error('Failed to start Python process:', error);
-      reject(createError(`Failed to start XSigma Python process: ${error.message}`, 500));
-    });
-
-    // Add timeout using CONFIG
-    setTimeout(() => {
-      pythonProcess.kill();
-      reject(createError(`Python process timed out after ${CONFIG.PYTHON.TIMEOUT_MS / 1000} seconds`, 504));
-    }, CONFIG.PYTHON.TIMEOUT_MS);
-  });
-
-  try {
-    // Find the last valid JSON in the output
-    const jsonMatch = dataString.match(/\{[\s\S]*\}/g);
-    if (!jsonMatch) {
-      throw new Error('No valid JSON found in output');
-    }
-    const lastJson = jsonMatch[jsonMatch.length - 1];
-    const result = JSON.parse(lastJson);
-    return res.json({
-      status: 'success',
-      data: result
-    });
-  } catch (e) {
-    console.error('Failed to parse Python output:', e);
-    console.error('Raw output:', dataString);
-    throw createError(
-      `Invalid Python output: ${e.toString()}\nRaw output: ${dataString}`,
-      500
-    );
-  }
-}
-
-function createError(message, status = 500) {
-  const error = new Error(message);
-  error.status = status;
-  return error;
 }
 
 function handleError(error, res) {
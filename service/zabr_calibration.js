@@ -1,9 +1,6 @@
 'use strict';
 
-const path = require('path');
-const fs = require('fs');
-const { spawn } = require('child_process');
-const { CONFIG, getPythonEnv } = require('./config');
+const { runTask } = require('./pythonWorkerPool');
 
 exports.getZabrCalibration = async function(req, res) {
   try {
@@ -20,7 +17,9 @@ exports.getZabrCalibration = async function(req, res) {
       gamma = 1.0,
       calibration_type = 'classical',
       dt = 5.0,
-      nd = 3.5
+      nd = 3.5,
+      warm_start = 'false',
+      instrument = 'default'
     } = req.query;
 
     // Parse params and create object
@@ -36,12 +35,15 @@ exports.getZabrCalibration = async function(req, res) {
       gamma: parseFloat(gamma),
       calibration_type: calibration_type,
       dt: parseFloat(dt),
-      nd: parseFloat(nd)
+      nd: parseFloat(nd),
+      warm_start: String(warm_start) === 'true',
+      instrument: String(instrument)
     };
 
     // Validate numeric parameters
+    const nonNumeric = ['calibration_type', 'warm_start', 'instrument'];
     for (const [key, value] of Object.entries(params)) {
-      if (key !== 'calibration_type' && isNaN(value)) {
+      if (!nonNumeric.includes(key) && isNaN(value)) {
         return res.status(400).json({
           status: 'error',
           error: `Invalid numeric value for parameter: ${key}`
@@ -80,90 +82,16 @@ exports.getZabrCalibration = async function(req, res) {
       });
     }
 
-    // Get absolute paths
-    const projectRoot = path.resolve(__dirname, '..');
-    const pythonScriptPath = path.join(projectRoot, 'service', 'Python', 'zabr_calibration.py');
-    
-    // Verify Python script exists
-    if (!fs.existsSync(pythonScriptPath)) {
-      console.error('Python script not found at:', pythonScriptPath);
-      throw new Error(`Python script not found at: ${pythonScriptPath}`);
-    }
-
-    console.log('Executing zabr_calibration with parameters:', params);
-    console.log('Using Python executable:', CONFIG.PYTHON.EXECUTABLE);
-
-    // Create Python process using centralized configuration
-    const pythonProcess = spawn(
-      CONFIG.PYTHON.EXECUTABLE, 
-      [pythonScriptPath, JSON.stringify(params)], 
-      {
-        env: getPythonEnv(),
-        cwd: path.dirname(pythonScriptPath),
-        stdio: ['pipe', 'pipe', 'pipe']
-      }
-    );
-
-    let dataString = '';
-    let errorString = '';
+    console.log('Executing zabr_calibration on the Python worker with parameters:', params);
 
-    pythonProcess.stdout.on('data', (data) => {
-      const str = data.toString();
-      console.log('[Python stdout]:', str);
-      dataString += str;
+    const result = await runTask('zabr_calibration', params);
+    return res.json({
+      status: 'success',
+      data: result
     });
-
-    pythonProcess.stderr.on('data', (data) => {
-      const str = data.toString();
-      console.error('[Python stderr]:', str);
-      errorString += str;
-    });
-
-    // Wait for process completion
-    await new Promise((resolve, reject) => {
-      const timeout = setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error(`Python process timed out after ${CONFIG.PYTHON.TIMEOUT_MS}ms`));
-      }, CONFIG.PYTHON.TIMEOUT_MS);
-
-      pythonProcess.on('close', (code) => {
-        clearTimeout(timeout);
-        console.log('[Python process] exited with code:', code);
-        
-        if (code !== 0) {
-          reject(new Error(`Python process exited with code ${code}\nError: ${errorString}`));
-        } else {
-          resolve();
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        clearTimeout(timeout);
-        console.error('[Python process] failed to start:', error);
-        reject(new Error(`Failed to start Python process: ${error.message}`));
-      });
-    });
-
-    try {
-      // Find and parse JSON output
-      const jsonMatch = dataString.match(/\{[\s\S]*\}/);
-      if (!jsonMatch) {
-        throw new Error('No valid JSON found in Python output');
-      }
-
-      const result = JSON.parse(jsonMatch[0]);
-      
-      if (result.error) {
-        throw new Error(result.error);
-      }
-
-      return res.json(result);
-    } catch (e) {
-      throw new Error(`Failed to parse Python output: ${e.toString()}\nOutput: ${dataString}`);
-    }
   } catch (error) {
     console.error('[Error]', error);
-    res.status(500).json({
+    res.status(error.status || 500).json({
       status: 'error',
       error: error.message
     });